@@ -0,0 +1,115 @@
+"""Microbenchmarks for decoding Tuya Cloud status responses.
+
+Compares the previous path (SDK `.json()`, the SDK's debug log copy, a
+dict built from the result list and per-value decoding in the snapshot)
+with the decoding layer in decode.py.
+
+Usage:
+    python benchmarks/bench_decode.py [--number N]
+"""
+import argparse
+import copy
+import importlib.util
+import json
+import timeit
+from pathlib import Path
+
+DECODE_PATH = (
+    Path(__file__).resolve().parent.parent
+    / "custom_components"
+    / "tuya_iot_power_stations"
+    / "decode.py"
+)
+
+# Load decode.py on its own, the package itself needs Home Assistant
+_spec = importlib.util.spec_from_file_location("tuya_decode", DECODE_PATH)
+decode = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(decode)
+
+STATUS = {
+    "battery_percentage": 87,
+    "total_input_power": 215,
+    "total_output_power": 64,
+    "ac_output_power": 48,
+    "dc_output_power": 0,
+    "usb1_output_power": 5,
+    "usb2_output_power": 0,
+    "usb3_output_power": 0,
+    "usb4_output_power": 0,
+    "usb_c1_output_power": 11,
+    "usb_c2_output_power": 0,
+    "temp_current": 27,
+    "charge_energy": 15234,
+    "discharge_energy": 12876,
+    "switch_ac": True,
+    "switch_dc": False,
+    "switch_usb": True,
+    "switch_buzzer": False,
+    "usb_status": True,
+    "ac_voltage_freq": "230V/50Hz",
+    "error_code": 0,
+    "input_type": "ac",
+    "led_mode": "off",
+    "ac_off_time_set": "never",
+    "dc_off_time_set": "never",
+    "led_off_time_set": "never",
+    "device_standby_time_set": "never",
+    "display_off_time_set": "5min",
+}
+
+BODY = json.dumps({
+    "result": [{"code": code, "value": value} for code, value in STATUS.items()],
+    "success": True,
+    "t": 1760000000000,
+    "tid": "8f0c3bd2a9a011f0a3b6d2f5e1c4a7b9",
+}).encode()
+
+
+def legacy_path(body: bytes) -> dict:
+    """Decode a status response the way the integration did before."""
+    response = json.loads(body)
+    # tuya_connector formats every response for its debug log
+    json.dumps(copy.deepcopy(response), ensure_ascii=False, indent=2)
+    if not response.get("success"):
+        return {}
+    status = {item["code"]: item["value"] for item in response.get("result", [])}
+    return {code: decode.decode_value(code, value) for code, value in status.items()}
+
+
+def stdlib_path(body: bytes) -> dict:
+    """Decoding layer with the standard library JSON decoder."""
+    response = decode.TuyaResponse.from_dict(json.loads(body))
+    return decode.decode_status(response.result) if response.success else {}
+
+
+def fast_path(body: bytes) -> dict:
+    """Decoding layer with the fastest available JSON decoder."""
+    response = decode.TuyaResponse.from_json(body)
+    return decode.decode_status(response.result) if response.success else {}
+
+
+def main() -> None:
+    """Run the benchmarks and print the time per response."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000, help="responses per run")
+    args = parser.parse_args()
+
+    assert legacy_path(BODY) == stdlib_path(BODY) == fast_path(BODY)
+
+    print(f"Status response: {len(BODY)} bytes, {len(STATUS)} data points")
+    print(f"JSON decoder: {'orjson' if decode.orjson else 'json (orjson not installed)'}")
+
+    baseline = None
+    for name, func in (
+        ("legacy (SDK path)", legacy_path),
+        ("decode.py, json", stdlib_path),
+        ("decode.py, fast", fast_path),
+    ):
+        best = min(timeit.repeat(lambda: func(BODY), number=args.number, repeat=5))
+        per_call = best / args.number * 1e6
+        baseline = baseline or per_call
+        print(f"{name:<20} {per_call:8.2f} µs/response  {baseline / per_call:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
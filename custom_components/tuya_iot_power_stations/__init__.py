@@ -1,20 +1,35 @@
 """Tuya IoT Smart Portable Power Stations for Home Assistant."""
 import asyncio
 import logging
+import time
+from pathlib import Path
 
+from homeassistant.components import persistent_notification
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.util import dt as dt_util
 
 from .api import TwoEPowerStationAPI
-from .const import DOMAIN, PLATFORMS
-from .coordinator import TwoEPowerStationCoordinator
+from .const import (
+    CONF_HUB,
+    CONF_RECORD_TRAFFIC,
+    DEFAULT_RECORD_TRAFFIC,
+    DOMAIN,
+    TRAFFIC_DIR,
+)
+from .hub import PowerStationHub
+from .live import async_setup_live
+from .scheduler import Priority, async_get_scheduler
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Tuya IoT Power Stations component."""
+    await async_setup_services(hass)
+    async_setup_live(hass)
     return True
 
 
@@ -22,45 +37,85 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Tuya IoT Power Stations from a config entry."""
     _LOGGER.info("Setting up integration %s", DOMAIN)
 
+    scheduler = async_get_scheduler(hass)
+
+    # Duration of each setup phase in milliseconds, logged at the end
+    timings: dict[str, int] = {}
+    phase_started = time.perf_counter()
+
+    def end_phase(name: str) -> None:
+        nonlocal phase_started
+        now = time.perf_counter()
+        timings[name] = round((now - phase_started) * 1000)
+        phase_started = now
+
+    # Project entries have no device ID, the API client serves all stations
+    device_id = entry.data.get("device_id", "")
+    target = device_id or f"project {entry.data['access_id'][:8]}"
+
+    # Optionally record all Tuya traffic for offline replay
+    record_path: Path | None = None
+    if entry.options.get(CONF_RECORD_TRAFFIC, DEFAULT_RECORD_TRAFFIC):
+        recording = device_id or f"project-{entry.data['access_id'][:8]}"
+        record_path = Path(hass.config.path(
+            TRAFFIC_DIR,
+            f"{recording}-{dt_util.utcnow():%Y%m%d-%H%M%S}.jsonl.gz",
+        ))
+
     # Create API client with Tuya credentials
-    api = await hass.async_add_executor_job(
+    api = await scheduler.async_run(
+        Priority.POLL,
         TwoEPowerStationAPI,
         entry.data["access_id"],
         entry.data["access_secret"],
-        entry.data["device_id"],
+        device_id,
         entry.data.get("endpoint", "https://openapi.tuyaeu.com"),
+        record_path,
     )
+    end_phase("client")
 
     # Test connection
-    connection_ok, error_msg = await hass.async_add_executor_job(api.test_connection)
+    connection_ok, error_msg = await scheduler.async_run(Priority.POLL, api.test_connection)
     if not connection_ok:
-        api.close()
+        await hass.async_add_executor_job(api.close)
         raise ConfigEntryNotReady(
-            f"Failed to connect to Tuya Cloud for device {entry.data['device_id']}: {error_msg}"
+            f"Failed to connect to Tuya Cloud for {target}: {error_msg}"
         )
+    end_phase("connection test")
 
-    # Get update interval from options or use default
-    update_interval = entry.options.get("scan_interval", 30)
-
-    # Create coordinator for data updates
-    coordinator = TwoEPowerStationCoordinator(hass, api, update_interval)
-
-    # Get initial data
-    await coordinator.async_config_entry_first_refresh()
-
-    # Store coordinator in hass.data
+    # Create the station coordinators and get initial data
+    hub = PowerStationHub(hass, entry, api)
+    try:
+        await hub.async_setup()
+    except Exception:
+        hub.async_unload()
+        await hass.async_add_executor_job(api.close)
+        raise
+    end_phase("first refresh")
+
+    # Store hub in hass.data
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = coordinator
+    hass.data[DOMAIN][entry.entry_id] = hub
 
-    # Load platforms (sensor, switch, etc.)
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Load only the platforms the stations have data points for
+    hub.platforms = hub.required_platforms
+    await hass.config_entries.async_forward_entry_setups(entry, hub.platforms)
+    end_phase("platforms")
 
     # Register options update listener
     entry.async_on_unload(entry.add_update_listener(update_listener))
 
-    # Check for new devices in background
-    hass.async_create_task(check_for_new_devices(hass, entry))
+    # Check for new devices in background, project entries add them themselves
+    if not entry.data.get(CONF_HUB):
+        hass.async_create_task(check_for_new_devices(hass, entry))
 
+    _LOGGER.info(
+        "Set up %s in %d ms (%s), platforms: %s",
+        entry.title,
+        sum(timings.values()),
+        ", ".join(f"{name} {duration} ms" for name, duration in timings.items()),
+        ", ".join(hub.platforms),
+    )
     return True
 
 
@@ -70,11 +125,12 @@ async def check_for_new_devices(hass: HomeAssistant, entry: ConfigEntry) -> None
     await asyncio.sleep(10)
 
     try:
-        coordinator = hass.data[DOMAIN][entry.entry_id]
-        api = coordinator.api
+        api = hass.data[DOMAIN][entry.entry_id].api
 
         # Get all devices from project
-        all_devices = await hass.async_add_executor_job(api.get_all_devices)
+        all_devices = await async_get_scheduler(hass).async_run(
+            Priority.BACKGROUND, api.get_all_devices
+        )
         if not all_devices:
             return
 
@@ -83,6 +139,8 @@ async def check_for_new_devices(hass: HomeAssistant, entry: ConfigEntry) -> None
             e.data.get("device_id") 
             for e in hass.config_entries.async_entries(DOMAIN)
         }
+        for hub in hass.data[DOMAIN].values():
+            configured_device_ids.update(hub.stations)
 
         new_devices = [
             d for d in all_devices 
@@ -96,7 +154,8 @@ async def check_for_new_devices(hass: HomeAssistant, entry: ConfigEntry) -> None
                 device_name = device.get("name", device_id)
                 
                 # Create persistent notification for discovered device
-                hass.components.persistent_notification.async_create(
+                persistent_notification.async_create(
+                    hass,
                     title="New Tuya IoT Device Detected",
                     message=(
                         f"Found new device '{device_name}' (ID: {device_id}). "
@@ -112,13 +171,14 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     _LOGGER.info("Unloading integration %s", DOMAIN)
 
-    # Unload all platforms
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    # Unload the platforms that were set up
+    hub = hass.data[DOMAIN][entry.entry_id]
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, hub.platforms)
 
     if unload_ok:
         # Close API connection
-        coordinator = hass.data[DOMAIN][entry.entry_id]
-        coordinator.api.close()
+        await hass.async_add_executor_job(hub.api.close)
+        hub.async_unload()
 
         # Remove from hass.data
         hass.data[DOMAIN].pop(entry.entry_id)
@@ -127,5 +187,12 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Handle options update."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Handle options update.
+
+    Tuning options are applied to the running stations. The entry is only
+    reloaded when credentials, the endpoint or options that add or remove
+    entities change.
+    """
+    hub = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if hub is None or not await hub.async_apply_options():
+        await hass.config_entries.async_reload(entry.entry_id)
@@ -1,12 +1,21 @@
 """API client for Tuya IoT Power Stations."""
+import copy
 import logging
+import time
+from collections.abc import Iterator
+from pathlib import Path
 from typing import Any
 
-from tuya_connector import TuyaOpenAPI
+from .decode import TuyaResponse, decode_status
+from .transport import Transport, open_transport
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class DeviceOfflineError(ConnectionError):
+    """Raised when Tuya Cloud reports that the device is offline."""
+
+
 class TwoEPowerStationAPI:
     """Class to interact with Tuya IoT Power Station via Tuya Cloud API."""
 
@@ -16,46 +25,136 @@ class TwoEPowerStationAPI:
         access_secret: str,
         device_id: str,
         endpoint: str = "https://openapi.tuyaeu.com",
+        record_path: Path | None = None,
     ) -> None:
         """Initialize API client.
 
         Args:
             access_id: Tuya Cloud Access ID
             access_secret: Tuya Cloud Access Secret
-            device_id: Device ID in Tuya Cloud
-            endpoint: Tuya Cloud API endpoint (default EU)
+            device_id: Device ID in Tuya Cloud (empty for a project client)
+            endpoint: Tuya Cloud API endpoint (default EU), or a replay:// URL
+                of a traffic recording
+            record_path: Record all requests and responses to this file
         """
         self.device_id = device_id
         self.access_id = access_id
         self.access_secret = access_secret
         self.endpoint = endpoint
 
-        # Use official tuya-connector-python SDK
-        self.api = TuyaOpenAPI(endpoint, access_id, access_secret)
-        self.api.connect()
+        # Round-trip time of the last status request (seconds)
+        self.latency: float | None = None
+
+        self.transport: Transport = open_transport(
+            endpoint, access_id, access_secret, record_path
+        )
+        self._owns_transport = True
         _LOGGER.debug("Tuya API initialized - Endpoint: %s", endpoint)
 
+    def for_device(self, device_id: str) -> "TwoEPowerStationAPI":
+        """Return a client for another device that shares this connection.
+
+        Args:
+            device_id: Device ID in the same Tuya project
+
+        Returns:
+            Client whose requests go through this client's transport
+        """
+        view = copy.copy(self)
+        view.device_id = device_id
+        view.latency = None
+        view._owns_transport = False
+        return view
+
     def close(self) -> None:
-        """Close connection."""
-        # Tuya SDK does not require explicit closing
+        """Close connection and finish a traffic recording."""
+        if self._owns_transport:
+            self.transport.close()
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+    ) -> TuyaResponse:
+        """Send a request through the transport."""
+        return self.transport.request(method, path, params, body)
 
     def get_device_status(self) -> dict[str, Any]:
         """Get device status.
 
         Returns:
-            Dictionary with status of all data points
+            Dictionary with typed values of all data points
         """
-        response = self.api.get(f"/v1.0/devices/{self.device_id}/status")
-        if not response.get("success"):
-            error_msg = response.get("msg", "Unknown error")
-            if "device is offline" in error_msg.lower() or response.get("code") == 2001:
-                _LOGGER.warning("Device offline: %s", error_msg)
+        started = time.monotonic()
+        response = self._request("GET", f"/v1.0/devices/{self.device_id}/status")
+        self.latency = time.monotonic() - started
+
+        if not response.success:
+            if response.offline:
+                _LOGGER.warning("Device offline: %s", response.msg)
             else:
                 _LOGGER.error("Error getting status: %s", response)
             return {}
 
-        # Convert status list to dictionary
-        return {item["code"]: item["value"] for item in response.get("result", [])}
+        # Convert status list to typed values by code
+        return decode_status(response.result)
+
+    def get_devices_status(self, device_ids: list[str]) -> dict[str, dict[str, Any]]:
+        """Get the status of several devices in a single request.
+
+        Args:
+            device_ids: Devices to fetch (at most 20)
+
+        Returns:
+            Typed data point values by device ID, devices without an answer
+            are missing
+        """
+        started = time.monotonic()
+        response = self._request(
+            "GET",
+            "/v1.0/iot-03/devices/status",
+            {"device_ids": ",".join(device_ids)},
+        )
+        self.latency = time.monotonic() - started
+
+        if not response.success:
+            _LOGGER.error("Error getting status of %d devices: %s", len(device_ids), response)
+            return {}
+
+        return {
+            item["id"]: decode_status(item.get("status"))
+            for item in response.result or []
+        }
+
+    def get_device_properties(self, codes: list[str]) -> dict[str, Any] | None:
+        """Get selected data points from the device shadow.
+
+        Args:
+            codes: Data points to fetch
+
+        Returns:
+            Dictionary with typed values of the requested data points, empty if the device is
+            offline or there is an error, None if the project cannot use the
+            shadow API (callers should fall back to get_device_status)
+        """
+        started = time.monotonic()
+        response = self._request(
+            "GET",
+            f"/v2.0/cloud/thing/{self.device_id}/shadow/properties",
+            {"codes": ",".join(codes)},
+        )
+        self.latency = time.monotonic() - started
+
+        if not response.success:
+            if response.offline:
+                _LOGGER.warning("Device offline: %s", response.msg)
+                return {}
+            _LOGGER.warning("Shadow properties are not available: %s", response)
+            return None
+
+        return decode_status((response.result or {}).get("properties"))
 
     def get_device_info(self) -> dict[str, Any]:
         """Get device info.
@@ -67,14 +166,14 @@ class TwoEPowerStationAPI:
             PermissionError: If no access to device (code 1106)
             ConnectionError: If other connection error
         """
-        response = self.api.get(f"/v1.0/devices/{self.device_id}")
+        response = self._request("GET", f"/v1.0/devices/{self.device_id}")
         _LOGGER.debug("Device info response: %s", response)
 
-        if response.get("success"):
-            return response.get("result", {})
+        if response.success:
+            return response.result or {}
 
-        error_code = response.get("code")
-        error_msg = response.get("msg", "Unknown error")
+        error_code = response.code
+        error_msg = response.msg
 
         if error_code == 1106:
             _LOGGER.error(
@@ -100,19 +199,80 @@ class TwoEPowerStationAPI:
         Returns:
             True if command successful
         """
-        commands = {"commands": [{"code": code, "value": value}]}
-        response = self.api.post(f"/v1.0/devices/{self.device_id}/commands", commands)
-
-        success = response.get("success", False)
-        if not success:
-            error_msg = response.get("msg", "Unknown error")
-            if "device is offline" in error_msg.lower() or response.get("code") == 2001:
-                _LOGGER.warning("Could not send command %s (device offline): %s", code, error_msg)
+        try:
+            return self.send_commands({code: value})
+        except DeviceOfflineError:
+            return False
+
+    def send_commands(self, commands: dict[str, Any]) -> bool:
+        """Send several commands to device in a single request.
+
+        Args:
+            commands: Command values by code (data point)
+
+        Returns:
+            True if all commands were accepted, False if they were rejected
+
+        Raises:
+            DeviceOfflineError: If the device is offline and commands can be retried
+        """
+        payload = {"commands": [{"code": code, "value": value} for code, value in commands.items()]}
+        response = self._request(
+            "POST", f"/v1.0/devices/{self.device_id}/commands", body=payload
+        )
+
+        if not response.success:
+            codes = ", ".join(commands)
+            if response.offline:
+                _LOGGER.warning("Could not send command %s (device offline): %s", codes, response.msg)
+                raise DeviceOfflineError(response.msg)
             else:
-                _LOGGER.error("Error sending command %s: %s", code, response)
+                _LOGGER.error("Error sending command %s: %s", codes, response)
+
+        return response.success
+
+    def iter_device_logs(
+        self,
+        start_ms: int,
+        end_ms: int,
+        codes: list[str] | None = None,
+        page_size: int = 100,
+    ) -> Iterator[list[dict[str, Any]]]:
+        """Stream data point reports from the device log page by page.
+
+        Args:
+            start_ms: Window start (Unix time in milliseconds)
+            end_ms: Window end (Unix time in milliseconds)
+            codes: Data points to fetch (all if not set)
+            page_size: Number of log records per request (max 100)
+
+        Yields:
+            Lists of log records with code, value and event_time
+        """
+        # See https://developer.tuya.com/en/docs/cloud/device-management?id=K9g6rfntdz78a
+        params: dict[str, Any] = {
+            "type": 7,  # Data point report
+            "start_time": start_ms,
+            "end_time": end_ms,
+            "size": page_size,
+        }
+        if codes:
+            params["codes"] = ",".join(codes)
+
+        while True:
+            response = self._request("GET", f"/v1.0/devices/{self.device_id}/logs", params)
+            if not response.success:
+                _LOGGER.error("Error getting device logs: %s", response)
+                return
 
-        return success
+            result = response.result or {}
+            logs = result.get("logs", [])
+            if logs:
+                yield logs
 
+            if not result.get("has_next") or not result.get("next_row_key"):
+                return
+            params["start_row_key"] = result["next_row_key"]
 
     def get_all_devices(self) -> list[dict[str, Any]]:
         """Get list of all devices available for this project.
@@ -122,12 +282,12 @@ class TwoEPowerStationAPI:
         """
         # Endpoint to get device list by project
         # See https://developer.tuya.com/en/docs/iot/list-devices?id=K9j6y60m66v1f
-        response = self.api.get("/v1.0/devices")
-        if not response.get("success"):
+        response = self._request("GET", "/v1.0/devices")
+        if not response.success:
             _LOGGER.error("Error getting device list: %s", response)
             return []
 
-        return response.get("result", {}).get("list", [])
+        return (response.result or {}).get("list", [])
 
 
     def test_connection(self) -> tuple[bool, str]:
@@ -137,7 +297,11 @@ class TwoEPowerStationAPI:
             Tuple of (success: bool, error_message: str)
         """
         try:
-            self.get_device_info()
+            if self.device_id:
+                self.get_device_info()
+            elif not self.get_all_devices():
+                # A project client needs at least one device it can see
+                return (False, "No devices found in the Tuya project")
             return (True, "")
         except PermissionError as err:
             error_msg = (
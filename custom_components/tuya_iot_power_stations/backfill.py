@@ -0,0 +1,207 @@
+"""Gap backfill from Tuya device logs for Tuya IoT Power Stations."""
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, UnitOfPower, UnitOfTemperature
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import TwoEPowerStationAPI
+from .const import (
+    BACKFILL_BATCH_HOURS,
+    BACKFILL_MAX_AGE,
+    BACKFILL_SAVE_DELAY,
+    DOMAIN,
+)
+from .scheduler import Priority, async_get_scheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Data points that can be recovered, with sensor unique ID suffix and unit.
+# Cumulative energy counters are not listed: the recorder adds the whole
+# increase to the first hour after the gap, so their totals stay correct.
+BACKFILL_DATA_POINTS = {
+    "battery_percentage": ("battery", PERCENTAGE),
+    "total_input_power": ("input_power", UnitOfPower.WATT),
+    "total_output_power": ("output_power", UnitOfPower.WATT),
+    "ac_output_power": ("ac_power", UnitOfPower.WATT),
+    "dc_output_power": ("dc_power", UnitOfPower.WATT),
+    "temp_current": ("temperature", UnitOfTemperature.CELSIUS),
+}
+
+
+@dataclass
+class _HourBucket:
+    """Running min/max/mean of the samples reported within one hour."""
+
+    total: float = 0.0
+    count: int = 0
+    minimum: float = float("inf")
+    maximum: float = float("-inf")
+
+    def add(self, value: float) -> None:
+        """Add a sample."""
+        self.total += value
+        self.count += 1
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+
+class GapBackfill:
+    """Detect polling gaps and recover them as long-term statistics."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        api: TwoEPowerStationAPI,
+        key: str,
+    ) -> None:
+        """Initialize backfill.
+
+        Args:
+            hass: Home Assistant instance
+            entry: Config entry of the station
+            api: API client to read device logs with
+            key: Station key (unique ID prefix of its entities)
+        """
+        self.hass = hass
+        self.entry = entry
+        self.api = api
+        self.key = key
+        self.last_seen: datetime | None = None
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{key}.backfill"
+        )
+
+    async def async_load(self) -> None:
+        """Load the time of the last sample received before the restart."""
+        if (stored := await self._store.async_load()) and stored.get("last_seen"):
+            self.last_seen = dt_util.parse_datetime(stored["last_seen"])
+
+    @callback
+    def async_sample_received(self, now: datetime, gap_threshold: timedelta) -> None:
+        """Record a successful poll and start a backfill if a gap just ended.
+
+        Args:
+            now: Time of the successful poll
+            gap_threshold: Minimum silence that counts as a gap
+        """
+        last_seen, self.last_seen = self.last_seen, now
+        self._store.async_delay_save(self._data_to_save, BACKFILL_SAVE_DELAY)
+
+        if last_seen is None or now - last_seen < gap_threshold:
+            return
+
+        # Only whole hours are imported, partial hours already have statistics
+        start = max(last_seen, now - BACKFILL_MAX_AGE)
+        start = start.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        end = now.replace(minute=0, second=0, microsecond=0)
+        if end <= start:
+            return
+
+        _LOGGER.info(
+            "Detected data gap for device %s from %s to %s, backfilling from device logs",
+            self.api.device_id, last_seen, now,
+        )
+        self.entry.async_create_background_task(
+            self.hass,
+            self.async_backfill(start, end),
+            f"{DOMAIN} backfill {self.api.device_id}",
+        )
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return data to persist."""
+        return {"last_seen": self.last_seen.isoformat() if self.last_seen else None}
+
+    async def async_backfill(self, start: datetime, end: datetime) -> None:
+        """Page through device logs for [start, end) and import hourly statistics."""
+        if "recorder" not in self.hass.config.components:
+            return
+
+        registry = er.async_get(self.hass)
+        entity_ids = {
+            code: entity_id
+            for code, (suffix, _unit) in BACKFILL_DATA_POINTS.items()
+            if (
+                entity_id := registry.async_get_entity_id(
+                    "sensor", DOMAIN, f"{self.key}_{suffix}"
+                )
+            )
+        }
+        if not entity_ids:
+            return
+
+        buckets: dict[str, dict[datetime, _HourBucket]] = {code: {} for code in entity_ids}
+        pages = self.api.iter_device_logs(
+            int(start.timestamp() * 1000),
+            int(end.timestamp() * 1000),
+            list(entity_ids),
+        )
+
+        scheduler = async_get_scheduler(self.hass)
+        try:
+            # Stream the pages so only the hourly accumulators stay in memory
+            while (
+                page := await scheduler.async_run(Priority.BACKGROUND, next, pages, None)
+            ) is not None:
+                for log in page:
+                    try:
+                        value = float(log["value"])
+                        when = dt_util.utc_from_timestamp(log["event_time"] / 1000)
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                    if log.get("code") not in buckets or not start <= when < end:
+                        continue
+                    hour = when.replace(minute=0, second=0, microsecond=0)
+                    buckets[log["code"]].setdefault(hour, _HourBucket()).add(value)
+        except Exception as err:
+            _LOGGER.error("Error reading device logs for backfill: %s", err)
+            return
+
+        for code, hours in buckets.items():
+            if hours:
+                self._import_statistics(code, entity_ids[code], hours)
+
+    def _import_statistics(
+        self, code: str, entity_id: str, hours: dict[datetime, _HourBucket]
+    ) -> None:
+        """Import recovered hourly statistics in batches."""
+        # Imported lazily, recorder is an optional after-dependency
+        from homeassistant.components.recorder.models import (
+            StatisticData,
+            StatisticMetaData,
+        )
+        from homeassistant.components.recorder.statistics import async_import_statistics
+
+        metadata = StatisticMetaData(
+            has_mean=True,
+            has_sum=False,
+            name=None,
+            source="recorder",
+            statistic_id=entity_id,
+            unit_of_measurement=BACKFILL_DATA_POINTS[code][1],
+        )
+        statistics = [
+            StatisticData(
+                start=hour,
+                mean=bucket.total / bucket.count,
+                min=bucket.minimum,
+                max=bucket.maximum,
+            )
+            for hour, bucket in sorted(hours.items())
+        ]
+
+        for index in range(0, len(statistics), BACKFILL_BATCH_HOURS):
+            async_import_statistics(
+                self.hass, metadata, statistics[index:index + BACKFILL_BATCH_HOURS]
+            )
+
+        _LOGGER.info("Backfilled %d hours of %s", len(statistics), entity_id)
@@ -1,16 +1,20 @@
 """Binary sensors for Tuya IoT Power Stations."""
 import logging
+from functools import partial
 
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
     BinarySensorEntity,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
+from .coordinator import TwoEPowerStationCoordinator
+from .entity import PowerStationCoordinatorEntity, async_add_station_entities
+from .hub import async_setup_stations
+from .models import StationSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,19 +25,30 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up binary sensors from config entry."""
-    coordinator = hass.data[DOMAIN][entry.entry_id]
+    @callback
+    def async_add_station(coordinator: TwoEPowerStationCoordinator) -> None:
+        """Add the binary sensors of a station, and new ones as data points appear."""
+        async_add_station_entities(
+            coordinator, async_add_entities, partial(_station_binary_sensors, coordinator, entry)
+        )
 
+    async_setup_stations(hass, entry, async_add_station)
+
+
+def _station_binary_sensors(
+    coordinator: TwoEPowerStationCoordinator, entry: ConfigEntry, data: StationSnapshot
+) -> list[PowerStationCoordinatorEntity]:
+    """Return the binary sensors the station's data points support."""
     entities = []
 
     # USB Status (Read-only status)
-    if "usb_status" in coordinator.data:
+    if "usb_status" in data:
         entities.append(PowerStationUSBStatusSensor(coordinator, entry))
 
-    if entities:
-        async_add_entities(entities)
+    return entities
 
 
-class PowerStationBinarySensorBase(CoordinatorEntity, BinarySensorEntity):
+class PowerStationBinarySensorBase(PowerStationCoordinatorEntity, BinarySensorEntity):
     """Base class for Tuya IoT Power Station binary sensors."""
 
     def __init__(self, coordinator, entry: ConfigEntry) -> None:
@@ -41,11 +56,11 @@ class PowerStationBinarySensorBase(CoordinatorEntity, BinarySensorEntity):
         super().__init__(coordinator)
         self._entry = entry
         
-        # Get device name from entry title
-        device_name = entry.title
+        # Station name, the entry title for device entries
+        device_name = coordinator.station_name
         
         self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
+            "identifiers": {(DOMAIN, coordinator.unique_prefix)},
             "name": device_name,
             "manufacturer": "Tuya",
             "model": "Portable Power Station",
@@ -62,13 +77,14 @@ class PowerStationUSBStatusSensor(PowerStationBinarySensorBase):
     """USB Output Status binary sensor."""
 
     _attr_name = "USB Output Status"
+    _dp_codes = frozenset({"usb_status"})
     _attr_device_class = BinarySensorDeviceClass.POWER
     _attr_icon = "mdi:usb-port"
 
     @property
     def unique_id(self) -> str:
         """Return unique ID."""
-        return f"{self._entry.entry_id}_usb_status"
+        return f"{self.coordinator.unique_prefix}_usb_status"
 
     @property
     def is_on(self) -> bool:
@@ -0,0 +1,282 @@
+"""Temporary high-rate burst polling for Tuya IoT Power Stations."""
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    BURST_BUFFER_SAMPLES,
+    BURST_MAX_RATE,
+    BURST_MIN_DURATION,
+    BURST_SAVE_DELAY,
+    CONF_BURST_BUDGET,
+    CONF_EXPORT_FORMAT,
+    DEFAULT_BURST_BUDGET,
+    DEFAULT_EXPORT_FORMAT,
+    DOMAIN,
+    EVENT_BURST_FINISHED,
+    EXPORT_DIR,
+    SLOW_DP_CODES,
+)
+from .export import Row, open_writer
+from .scheduler import Priority
+
+if TYPE_CHECKING:
+    from .coordinator import TwoEPowerStationCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+
+@dataclass
+class BurstSession:
+    """A running burst of one station."""
+
+    station: "TwoEPowerStationCoordinator"
+    interval: float
+    until: float  # Unix time
+    # Unix time and telemetry values of each burst sample
+    samples: deque[tuple[float, dict[str, Any]]] = field(
+        default_factory=lambda: deque(maxlen=BURST_BUFFER_SAMPLES)
+    )
+    task: asyncio.Task | None = None
+
+    @property
+    def planned_requests(self) -> int:
+        """Requests the burst will still make."""
+        return max(0, math.ceil((self.until - time.time()) / self.interval))
+
+
+class BurstController:
+    """Poll stations of an entry at a high rate for a bounded time.
+
+    Burst requests are counted against a daily request budget of the entry
+    (its Tuya project), and all bursts together are limited to a share of
+    the scheduler rate. A burst that does not fit into what is left of the
+    budget is shortened, or refused if it would be shorter than
+    BURST_MIN_DURATION. Live stream requests of the entry's stations count
+    against the same budget. Like live samples, burst samples never go into the
+    coordinator: entities, the recorder and the rules keep their regular
+    poll rate. The samples are kept in a buffer of their own and written to
+    an export file when the burst ends.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize controller.
+
+        Args:
+            hass: Home Assistant instance
+            entry: Config entry whose stations burst
+        """
+        self.hass = hass
+        self.entry = entry
+        self.sessions: dict[str, BurstSession] = {}
+        self.used = 0
+        self._day: date | None = None
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.burst"
+        )
+
+    async def async_load(self) -> None:
+        """Load the requests already used today."""
+        if (stored := await self._store.async_load()) and stored.get("day"):
+            self._day = date.fromisoformat(stored["day"])
+            self.used = stored["used"]
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return data to persist."""
+        return {"day": self._day.isoformat() if self._day else None, "used": self.used}
+
+    @property
+    def budget(self) -> int:
+        """Burst requests allowed per day."""
+        return self.entry.options.get(CONF_BURST_BUDGET, DEFAULT_BURST_BUDGET)
+
+    @property
+    def request_rate(self) -> float:
+        """Requests per second of the running bursts."""
+        return sum(1 / session.interval for session in self.sessions.values())
+
+    def remaining(self, replaced: str | None = None) -> int:
+        """Requests left today that running bursts have not planned yet.
+
+        Args:
+            replaced: Device ID whose running burst is about to be replaced
+                and does not count as planned
+        """
+        today = dt_util.now().date()
+        if today != self._day:
+            self._day = today
+            self.used = 0
+        planned = sum(
+            session.planned_requests
+            for device_id, session in self.sessions.items()
+            if device_id != replaced
+        )
+        return max(0, self.budget - self.used - planned)
+
+    @callback
+    def async_use_request(self) -> bool:
+        """Count a live stream request against today's budget.
+
+        Returns:
+            False if the budget is spent and the request must not be made
+        """
+        if self.remaining() < 1:
+            return False
+        self.used += 1
+        self._store.async_delay_save(self._data_to_save, BURST_SAVE_DELAY)
+        return True
+
+    @callback
+    def async_start(
+        self, station: "TwoEPowerStationCoordinator", duration: float, interval: float
+    ) -> BurstSession:
+        """Start or replace the burst of a station.
+
+        Args:
+            station: Station to poll at the burst rate
+            duration: Requested burst length in seconds
+            interval: Seconds between burst polls
+
+        Returns:
+            The running burst, possibly shorter than requested
+
+        Raises:
+            HomeAssistantError: If the rate or the budget leave no room, the
+                running burst of the station then goes on
+        """
+        device_id = station.api.device_id
+        other_rate = sum(
+            hub.burst.request_rate for hub in self.hass.data.get(DOMAIN, {}).values()
+        )
+        if running := self.sessions.get(device_id):
+            other_rate -= 1 / running.interval
+        if other_rate + 1 / interval > BURST_MAX_RATE:
+            raise HomeAssistantError(
+                f"Burst of {station.station_name} refused: running bursts already use "
+                f"{other_rate:.1f} of {BURST_MAX_RATE:.1f} requests per second"
+            )
+
+        remaining = self.remaining(replaced=device_id)
+        requests = math.ceil(duration / interval)
+        if requests > remaining:
+            duration = remaining * interval
+            if duration < BURST_MIN_DURATION:
+                raise HomeAssistantError(
+                    f"Burst of {station.station_name} refused: {remaining} of "
+                    f"{self.budget} burst requests left today"
+                )
+            _LOGGER.warning(
+                "Shortening burst of %s to %d seconds, %d burst requests left today",
+                station.station_name, duration, remaining,
+            )
+
+        self.async_cancel(device_id)
+        session = self.sessions[device_id] = BurstSession(
+            station, interval, time.time() + duration
+        )
+        session.task = self.entry.async_create_background_task(
+            self.hass, self._async_run(session), f"{DOMAIN} burst {device_id}"
+        )
+        _LOGGER.info(
+            "Polling %s every %s seconds for %d seconds",
+            station.station_name, interval, duration,
+        )
+        return session
+
+    @callback
+    def async_cancel(self, device_id: str) -> None:
+        """Stop the burst of a station, if it has one."""
+        if (session := self.sessions.pop(device_id, None)) and session.task:
+            session.task.cancel()
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop all bursts of the entry."""
+        for device_id in list(self.sessions):
+            self.async_cancel(device_id)
+
+    async def _async_run(self, session: BurstSession) -> None:
+        """Sample the station at the burst interval until the burst ends."""
+        station = session.station
+        try:
+            while (started := time.time()) < session.until:
+                self.used += 1
+                self._store.async_delay_save(self._data_to_save, BURST_SAVE_DELAY)
+                try:
+                    values = await self._async_sample(station)
+                except Exception as err:
+                    _LOGGER.debug("Burst sample of %s failed: %s", station.station_name, err)
+                else:
+                    if values:
+                        session.samples.append((time.time(), values))
+                await asyncio.sleep(max(0.0, session.interval - (time.time() - started)))
+        finally:
+            if self.sessions.get(station.api.device_id) is session:
+                del self.sessions[station.api.device_id]
+            _LOGGER.info(
+                "Burst of %s ended with %d samples", station.station_name, len(session.samples)
+            )
+            if session.samples:
+                self.hass.async_create_task(self._async_save_samples(session))
+
+    @staticmethod
+    async def _async_sample(station: "TwoEPowerStationCoordinator") -> dict[str, Any]:
+        """Fetch the telemetry data points of a station."""
+        codes = [code for code in station.data or () if code not in SLOW_DP_CODES]
+        values = None
+        if codes:
+            values = await station.scheduler.async_run(
+                Priority.LIVE, station.api.get_device_properties, codes
+            )
+        if values is None:
+            # Shadow API not available for this project, or nothing known yet
+            values = await station.scheduler.async_run(
+                Priority.LIVE, station.api.get_device_status
+            )
+        return {code: value for code, value in values.items() if code not in SLOW_DP_CODES}
+
+    async def _async_save_samples(self, session: BurstSession) -> None:
+        """Write the samples of a finished burst to an export file."""
+        device_id = session.station.api.device_id
+        rows: list[Row] = [
+            (sampled_at, device_id, code, value)
+            for sampled_at, values in session.samples
+            for code, value in values.items()
+        ]
+        base = Path(self.hass.config.path(
+            EXPORT_DIR, f"{device_id}-burst-{dt_util.now():%Y%m%d-%H%M%S}"
+        ))
+        export_format = self.entry.options.get(CONF_EXPORT_FORMAT, DEFAULT_EXPORT_FORMAT)
+
+        def write() -> Path:
+            writer = open_writer(base, export_format)
+            try:
+                writer.write(rows)
+            finally:
+                writer.close()
+            return writer.path
+
+        try:
+            path = await self.hass.async_add_executor_job(write)
+        except OSError as err:
+            _LOGGER.error("Error saving burst samples of %s: %s", device_id, err)
+            return
+
+        self.hass.bus.async_fire(
+            EVENT_BURST_FINISHED,
+            {"device_id": device_id, "samples": len(session.samples), "file": str(path)},
+        )
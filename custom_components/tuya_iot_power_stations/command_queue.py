@@ -0,0 +1,202 @@
+"""Durable per-device command queue for Tuya IoT Power Stations."""
+import asyncio
+import logging
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+
+from .api import TwoEPowerStationAPI
+from .const import (
+    COMMAND_QUEUE_MAX_AGE,
+    COMMAND_QUEUE_SAVE_DELAY,
+    COMMAND_RETRY_BASE_DELAY,
+    COMMAND_RETRY_MAX_DELAY,
+    DOMAIN,
+    SIGNAL_QUEUE_UPDATED,
+)
+from .scheduler import Priority, async_get_scheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+
+class CommandQueue:
+    """Deliver commands to a device, keeping them across outages and restarts.
+
+    Pending writes are keyed by data point, so a newer write to the same data
+    point replaces the older one. While the device is offline new writes only
+    join the queue; the queue is retried with exponential backoff and replayed
+    as a single batch when the device answers a poll and no retry is pending.
+    One batch is in flight at a time, later writes wait for it and go out
+    with the next one.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        api: TwoEPowerStationAPI,
+        key: str,
+    ) -> None:
+        """Initialize command queue.
+
+        Args:
+            hass: Home Assistant instance
+            entry: Config entry of the station
+            api: API client to send commands with
+            key: Station key (unique ID prefix of its entities)
+        """
+        self.hass = hass
+        self.entry = entry
+        self.api = api
+        self.key = key
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._attempts = 0
+        self._lock = asyncio.Lock()
+        self._last_accepted = False
+        self._unsub_retry: CALLBACK_TYPE | None = None
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{key}.commands"
+        )
+
+    @property
+    def depth(self) -> int:
+        """Number of data point writes waiting for delivery."""
+        return len(self._pending)
+
+    @property
+    def oldest_age(self) -> float | None:
+        """Age of the oldest pending write in seconds."""
+        if not self._pending:
+            return None
+        return time.time() - min(item["queued_at"] for item in self._pending.values())
+
+    @property
+    def replay_due(self) -> bool:
+        """Whether writes wait with neither a batch in flight nor a retry pending."""
+        return bool(self._pending) and not self._lock.locked() and self._unsub_retry is None
+
+    async def async_load(self) -> None:
+        """Restore writes that were pending before the restart."""
+        if stored := await self._store.async_load():
+            self._pending = stored.get("pending", {})
+            self._drop_expired()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel the retry timer."""
+        if self._unsub_retry:
+            self._unsub_retry()
+            self._unsub_retry = None
+
+    async def async_send(self, commands: dict[str, Any]) -> bool:
+        """Queue commands and try to deliver them.
+
+        Waits for a batch in flight and then sends the writes with the next
+        one, unless that batch already carried them.
+
+        Returns:
+            True if the commands were delivered, False if queued or rejected
+        """
+        now = time.time()
+        for code, value in commands.items():
+            self._pending[code] = {"value": value, "queued_at": now}
+        self._changed()
+
+        # Device is known to be offline, wait for the retry or the next poll
+        if self._unsub_retry:
+            _LOGGER.debug("Device offline, queued %s", commands)
+            return False
+
+        async with self._lock:
+            if not any(
+                code in self._pending and self._pending[code]["value"] == value
+                for code, value in commands.items()
+            ):
+                # The batch in flight carried the same values
+                return self._last_accepted
+            if self._unsub_retry:
+                # That batch failed, the writes wait for its retry
+                return False
+            return await self._async_send_batch()
+
+    async def async_flush(self) -> bool:
+        """Send all pending writes as one batch, after a batch in flight.
+
+        Returns:
+            True if the batch was delivered
+        """
+        async with self._lock:
+            return await self._async_send_batch()
+
+    async def _async_send_batch(self) -> bool:
+        """Send all pending writes as one batch, with the lock held."""
+        self._drop_expired()
+        if not self._pending:
+            return False
+
+        self.async_shutdown()
+        batch = {code: item["value"] for code, item in self._pending.items()}
+        try:
+            accepted = await async_get_scheduler(self.hass).async_run(
+                Priority.COMMAND, self.api.send_commands, batch
+            )
+        except Exception as err:
+            # Device offline or transport error, keep the writes and retry
+            self._schedule_retry(err)
+            return False
+
+        self._attempts = 0
+        self._last_accepted = accepted
+        # Keep writes that were superseded while the batch was in flight,
+        # their senders wait for the lock and send them next
+        for code, value in batch.items():
+            if code in self._pending and self._pending[code]["value"] == value:
+                del self._pending[code]
+        self._changed()
+
+        if not accepted:
+            _LOGGER.error("Device rejected commands %s, dropping them", batch)
+        return accepted
+
+    def _schedule_retry(self, err: Exception) -> None:
+        """Retry the queue later with exponential backoff."""
+        delay = min(COMMAND_RETRY_BASE_DELAY * 2 ** self._attempts, COMMAND_RETRY_MAX_DELAY)
+        self._attempts += 1
+        _LOGGER.info(
+            "Could not deliver %d queued command(s) to %s (%s), retrying in %ss",
+            len(self._pending), self.api.device_id, err, delay,
+        )
+        self._unsub_retry = async_call_later(self.hass, delay, self._async_retry)
+
+    async def _async_retry(self, _now: Any) -> None:
+        """Handle the retry timer."""
+        self._unsub_retry = None
+        await self.async_flush()
+
+    def _drop_expired(self) -> None:
+        """Forget writes that are too old to replay safely."""
+        cutoff = time.time() - COMMAND_QUEUE_MAX_AGE.total_seconds()
+        expired = [code for code, item in self._pending.items() if item["queued_at"] < cutoff]
+        for code in expired:
+            _LOGGER.warning(
+                "Dropping command %s=%s for %s, device was offline for too long",
+                code, self._pending.pop(code)["value"], self.api.device_id,
+            )
+        if expired:
+            self._changed()
+
+    def _changed(self) -> None:
+        """Persist the queue and notify the diagnostic sensors."""
+        self._store.async_delay_save(
+            lambda: {"pending": self._pending}, COMMAND_QUEUE_SAVE_DELAY
+        )
+        async_dispatcher_send(
+            self.hass, SIGNAL_QUEUE_UPDATED.format(self.key)
+        )
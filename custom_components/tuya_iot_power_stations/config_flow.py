@@ -1,5 +1,7 @@
 """Config flow for Tuya IoT Power Stations integration."""
+import asyncio
 import logging
+import time
 from typing import Any
 
 import voluptuous as vol
@@ -9,7 +11,50 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 
 from .api import TwoEPowerStationAPI
-from .const import DOMAIN
+from .scheduler import Priority, async_get_scheduler
+from .const import (
+    CONF_BACKFILL,
+    CONF_BURST_BUDGET,
+    CONF_BATTERY_CAPACITY,
+    CONF_FLEET_DEVICE,
+    CONF_HUB,
+    CONF_LOOP_WATCHDOG,
+    CONF_EXPORT,
+    CONF_EXPORT_FORMAT,
+    CONF_METRICS,
+    CONF_MQTT_BRIDGE,
+    CONF_RECORD_TRAFFIC,
+    CONF_ROLLING_STATS,
+    CONF_ROLLING_WINDOW,
+    CONF_RULE_HYSTERESIS,
+    CONF_RULE_SOC_LOW,
+    CONF_RULE_TEMP_HIGH,
+    CONF_RULE_USB_ON_INPUT,
+    CONF_SCAN_INTERVAL,
+    CONF_SLOW_POLL_FACTOR,
+    CONF_STALE_GRACE,
+    DEFAULT_BACKFILL,
+    DEFAULT_BURST_BUDGET,
+    DEFAULT_BATTERY_CAPACITY,
+    DEFAULT_FLEET_DEVICE,
+    DEFAULT_LOOP_WATCHDOG,
+    DEFAULT_EXPORT,
+    DEFAULT_EXPORT_FORMAT,
+    DEFAULT_METRICS,
+    DEFAULT_MQTT_BRIDGE,
+    DEFAULT_RECORD_TRAFFIC,
+    DEFAULT_ROLLING_STATS,
+    DEFAULT_ROLLING_WINDOW,
+    DEFAULT_RULE_HYSTERESIS,
+    DEFAULT_RULE_SOC_LOW,
+    DEFAULT_RULE_TEMP_HIGH,
+    DEFAULT_RULE_USB_ON_INPUT,
+    DEFAULT_SLOW_POLL_FACTOR,
+    DEFAULT_STALE_GRACE,
+    DOMAIN,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_PARQUET,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,21 +66,103 @@ TUYA_ENDPOINTS = {
     "India": "https://openapi.tuyain.com",
 }
 
+# Region choice that probes every endpoint and keeps the fastest one
+AUTO_ENDPOINT = "Auto"
+
 STEP_USER_DATA_SCHEMA = vol.Schema({
     vol.Required("access_id"): str,
     vol.Required("access_secret"): str,
-    vol.Required("device_id"): str,
-    vol.Required("endpoint", default="Europe"): vol.In(list(TUYA_ENDPOINTS.keys())),
+    # Empty adds every power station of the project as one hub entry
+    vol.Optional("device_id", default=""): str,
+    vol.Required("endpoint", default=AUTO_ENDPOINT): vol.In(
+        [AUTO_ENDPOINT, *TUYA_ENDPOINTS.keys()]
+    ),
 })
 
 
+def probe_endpoint(data: dict[str, Any], endpoint_url: str, device_id: str) -> float:
+    """Measure how fast an endpoint answers for the device.
+
+    Args:
+        data: Data from user
+        endpoint_url: Tuya Cloud API endpoint to probe
+        device_id: Device ID that must be visible on the endpoint, empty to
+            require any device of the project
+
+    Returns:
+        Round-trip time of the device info (or device list) request in seconds
+
+    Raises:
+        PermissionError: If the endpoint knows the device but denies access
+        ConnectionError: If the endpoint does not authenticate or hold the device
+    """
+    api = TwoEPowerStationAPI(
+        access_id=data["access_id"],
+        access_secret=data["access_secret"],
+        device_id=device_id,
+        endpoint=endpoint_url,
+    )
+
+    try:
+        started = time.monotonic()
+        if device_id:
+            api.get_device_info()
+        elif not api.get_all_devices():
+            raise ConnectionError(f"No project devices on {endpoint_url}")
+        return time.monotonic() - started
+    finally:
+        api.close()
+
+
+async def async_find_fastest_endpoint(
+    hass: HomeAssistant, data: dict[str, Any], device_id: str
+) -> str:
+    """Probe all regional endpoints concurrently and return the fastest one.
+
+    Only endpoints that authenticate and hold the device are considered.
+
+    Raises:
+        PermissionError: If the device was found but access was denied everywhere
+        ConnectionError: If no endpoint could be used
+    """
+    endpoints = list(TUYA_ENDPOINTS.values())
+    scheduler = async_get_scheduler(hass)
+    results = await asyncio.gather(
+        *(
+            scheduler.async_run(Priority.VERIFY, probe_endpoint, data, url, device_id)
+            for url in endpoints
+        ),
+        return_exceptions=True,
+    )
+
+    latencies: dict[str, float] = {}
+    permission_denied = False
+    for url, result in zip(endpoints, results):
+        if isinstance(result, PermissionError):
+            permission_denied = True
+        elif isinstance(result, Exception):
+            _LOGGER.debug("Endpoint %s is not usable: %s", url, result)
+        else:
+            latencies[url] = result
+
+    if not latencies:
+        target = f"device {device_id}" if device_id else "the project devices"
+        if permission_denied:
+            raise PermissionError(f"Permission denied for {target}")
+        raise ConnectionError(f"No Tuya endpoint holds {target}")
+
+    _LOGGER.debug("Endpoint round-trip times: %s", latencies)
+    return min(latencies, key=latencies.get)
+
+
 def validate_input(hass: HomeAssistant, data: dict[str, Any], device_id: str | None = None) -> dict[str, Any]:
     """Validate user input.
 
     Args:
         hass: Home Assistant instance
         data: Data from user
-        device_id: Device ID to validate (if not passed, taken from data)
+        device_id: Device ID to validate (if not passed, taken from data);
+            empty validates a project hub entry
 
     Returns:
         Dictionary with connection information
@@ -45,7 +172,7 @@ def validate_input(hass: HomeAssistant, data: dict[str, Any], device_id: str | N
     """
     # Get endpoint URL from region name
     endpoint_url = TUYA_ENDPOINTS.get(data["endpoint"], data["endpoint"])
-    target_device_id = device_id or data["device_id"]
+    target_device_id = device_id if device_id is not None else data.get("device_id", "")
 
     api = TwoEPowerStationAPI(
         access_id=data["access_id"],
@@ -59,6 +186,14 @@ def validate_input(hass: HomeAssistant, data: dict[str, Any], device_id: str | N
     if not success:
         raise Exception(error_msg or f"Failed to connect to Tuya Cloud for device {target_device_id}")
 
+    if not target_device_id:
+        return {
+            "title": f"Tuya Project ({data['access_id'][:8]})",
+            "device_info": {},
+            "endpoint": endpoint_url,
+            "device_id": "",
+        }
+
     # Get device info
     device_info = api.get_device_info()
 
@@ -89,13 +224,19 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 ]
                 
                 if not device_ids:
-                    errors["device_id"] = "invalid_device_id"
-                    raise Exception("No device IDs provided")
+                    return await self._async_create_project_entry(user_input)
 
                 # Process the first device to validate credentials and endpoint
                 first_device_id = device_ids[0]
-                info = await self.hass.async_add_executor_job(
-                    validate_input, self.hass, user_input, first_device_id
+
+                # Detect the fastest regional endpoint that holds the device
+                if user_input["endpoint"] == AUTO_ENDPOINT:
+                    user_input["endpoint"] = await async_find_fastest_endpoint(
+                        self.hass, user_input, first_device_id
+                    )
+
+                info = await async_get_scheduler(self.hass).async_run(
+                    Priority.VERIFY, validate_input, self.hass, user_input, first_device_id
                 )
 
                 # Store endpoint URL instead of region name for all entries
@@ -146,7 +287,31 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             data_schema=STEP_USER_DATA_SCHEMA,
             errors=errors,
             description_placeholders={
-                "setup_info": "1. Register at https://iot.tuya.com\n2. Create Cloud Project\n3. Link API: Industry Solutions -> Smart Home\n4. Add device to project\n5. Copy Access ID, Access Secret and Device ID (multiple allowed via comma)"
+                "setup_info": "1. Register at https://iot.tuya.com\n2. Create Cloud Project\n3. Link API: Industry Solutions -> Smart Home\n4. Add device to project\n5. Copy Access ID, Access Secret and Device ID (multiple allowed via comma, leave empty to add all stations of the project)"
+            },
+        )
+
+    async def _async_create_project_entry(self, user_input: dict[str, Any]) -> FlowResult:
+        """Create a hub entry for all power stations of the Tuya project."""
+        if user_input["endpoint"] == AUTO_ENDPOINT:
+            user_input["endpoint"] = await async_find_fastest_endpoint(
+                self.hass, user_input, ""
+            )
+
+        info = await async_get_scheduler(self.hass).async_run(
+            Priority.VERIFY, validate_input, self.hass, user_input, ""
+        )
+
+        await self.async_set_unique_id(f"project_{user_input['access_id']}")
+        self._abort_if_unique_id_configured()
+
+        return self.async_create_entry(
+            title=info["title"],
+            data={
+                "access_id": user_input["access_id"],
+                "access_secret": user_input["access_secret"],
+                "endpoint": info["endpoint"],
+                CONF_HUB: True,
             },
         )
 
@@ -171,18 +336,92 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         if user_input is not None:
             return self.async_create_entry(title="", data=user_input)
 
+        options = self.config_entry.options
+
         # Get default scan interval from current options or data (for older versions)
-        current_scan_interval = self.config_entry.options.get(
-            "scan_interval", 
-            self.config_entry.data.get("scan_interval", 30)
+        current_scan_interval = options.get(
+            CONF_SCAN_INTERVAL,
+            self.config_entry.data.get(CONF_SCAN_INTERVAL, 30)
         )
 
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema({
                 vol.Optional(
-                    "scan_interval",
+                    CONF_SCAN_INTERVAL,
                     default=current_scan_interval,
                 ): vol.All(vol.Coerce(int), vol.Range(min=10, max=300)),
+                vol.Optional(
+                    CONF_SLOW_POLL_FACTOR,
+                    default=options.get(CONF_SLOW_POLL_FACTOR, DEFAULT_SLOW_POLL_FACTOR),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=60)),
+                vol.Optional(
+                    CONF_STALE_GRACE,
+                    default=options.get(CONF_STALE_GRACE, DEFAULT_STALE_GRACE),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+                vol.Optional(
+                    CONF_BACKFILL,
+                    default=options.get(CONF_BACKFILL, DEFAULT_BACKFILL),
+                ): bool,
+                vol.Optional(
+                    CONF_BATTERY_CAPACITY,
+                    default=options.get(CONF_BATTERY_CAPACITY, DEFAULT_BATTERY_CAPACITY),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=100000)),
+                vol.Optional(
+                    CONF_FLEET_DEVICE,
+                    default=options.get(CONF_FLEET_DEVICE, DEFAULT_FLEET_DEVICE),
+                ): bool,
+                vol.Optional(
+                    CONF_RULE_SOC_LOW,
+                    default=options.get(CONF_RULE_SOC_LOW, DEFAULT_RULE_SOC_LOW),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=99)),
+                vol.Optional(
+                    CONF_RULE_TEMP_HIGH,
+                    default=options.get(CONF_RULE_TEMP_HIGH, DEFAULT_RULE_TEMP_HIGH),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=90)),
+                vol.Optional(
+                    CONF_RULE_USB_ON_INPUT,
+                    default=options.get(CONF_RULE_USB_ON_INPUT, DEFAULT_RULE_USB_ON_INPUT),
+                ): bool,
+                vol.Optional(
+                    CONF_RULE_HYSTERESIS,
+                    default=options.get(CONF_RULE_HYSTERESIS, DEFAULT_RULE_HYSTERESIS),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=50)),
+                vol.Optional(
+                    CONF_ROLLING_STATS,
+                    default=options.get(CONF_ROLLING_STATS, DEFAULT_ROLLING_STATS),
+                ): bool,
+                vol.Optional(
+                    CONF_ROLLING_WINDOW,
+                    default=options.get(CONF_ROLLING_WINDOW, DEFAULT_ROLLING_WINDOW),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1440)),
+                vol.Optional(
+                    CONF_METRICS,
+                    default=options.get(CONF_METRICS, DEFAULT_METRICS),
+                ): bool,
+                vol.Optional(
+                    CONF_MQTT_BRIDGE,
+                    default=options.get(CONF_MQTT_BRIDGE, DEFAULT_MQTT_BRIDGE),
+                ): bool,
+                vol.Optional(
+                    CONF_EXPORT,
+                    default=options.get(CONF_EXPORT, DEFAULT_EXPORT),
+                ): bool,
+                vol.Optional(
+                    CONF_EXPORT_FORMAT,
+                    default=options.get(CONF_EXPORT_FORMAT, DEFAULT_EXPORT_FORMAT),
+                ): vol.In([EXPORT_FORMAT_PARQUET, EXPORT_FORMAT_CSV]),
+                vol.Optional(
+                    CONF_BURST_BUDGET,
+                    default=options.get(CONF_BURST_BUDGET, DEFAULT_BURST_BUDGET),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=100000)),
+                vol.Optional(
+                    CONF_RECORD_TRAFFIC,
+                    default=options.get(CONF_RECORD_TRAFFIC, DEFAULT_RECORD_TRAFFIC),
+                ): bool,
+                vol.Optional(
+                    CONF_LOOP_WATCHDOG,
+                    default=options.get(CONF_LOOP_WATCHDOG, DEFAULT_LOOP_WATCHDOG),
+                ): bool,
             }),
         )
@@ -1,4 +1,5 @@
 """Константи для інтеграції Tuya IoT Power Stations."""
+from datetime import timedelta
 
 DOMAIN = "tuya_iot_power_stations"
 
@@ -7,3 +8,183 @@ UPDATE_INTERVAL = 30
 
 # Платформи
 PLATFORMS = ["switch", "select", "binary_sensor", "sensor"]
+
+# Data points a platform needs to be set up, platforms not listed always are
+PLATFORM_DP_CODES = {
+    "switch": frozenset({"switch_ac", "switch_dc", "switch_usb", "switch_buzzer"}),
+    "select": frozenset({
+        "led_mode",
+        "ac_off_time_set",
+        "dc_off_time_set",
+        "led_off_time_set",
+        "device_standby_time_set",
+        "display_off_time_set",
+    }),
+    "binary_sensor": frozenset({"usb_status"}),
+}
+
+# Smoothing factor for the API latency diagnostic (exponential moving average)
+LATENCY_SMOOTHING = 0.2
+
+# Options
+CONF_SCAN_INTERVAL = "scan_interval"
+CONF_BACKFILL = "backfill"
+CONF_BATTERY_CAPACITY = "battery_capacity"
+CONF_FLEET_DEVICE = "fleet_device"
+CONF_RULE_SOC_LOW = "rule_soc_low"
+CONF_RULE_TEMP_HIGH = "rule_temp_high"
+CONF_RULE_USB_ON_INPUT = "rule_usb_on_input"
+CONF_RULE_HYSTERESIS = "rule_hysteresis"
+CONF_SLOW_POLL_FACTOR = "slow_poll_factor"
+CONF_RECORD_TRAFFIC = "record_traffic"
+CONF_LOOP_WATCHDOG = "loop_watchdog"
+CONF_STALE_GRACE = "stale_grace"
+CONF_METRICS = "metrics"
+CONF_MQTT_BRIDGE = "mqtt_bridge"
+CONF_EXPORT = "export"
+CONF_EXPORT_FORMAT = "export_format"
+CONF_ROLLING_STATS = "rolling_stats"
+CONF_ROLLING_WINDOW = "rolling_window"
+CONF_BURST_BUDGET = "burst_budget"
+
+DEFAULT_BACKFILL = False
+DEFAULT_BATTERY_CAPACITY = 0  # Learn capacity from data
+DEFAULT_FLEET_DEVICE = False
+DEFAULT_RULE_SOC_LOW = 0  # Disabled
+DEFAULT_RULE_TEMP_HIGH = 0  # Disabled
+DEFAULT_RULE_USB_ON_INPUT = False
+DEFAULT_RULE_HYSTERESIS = 5
+DEFAULT_SLOW_POLL_FACTOR = 10  # Full poll every N polls
+DEFAULT_RECORD_TRAFFIC = False
+DEFAULT_LOOP_WATCHDOG = False
+DEFAULT_STALE_GRACE = 120  # Seconds last-known values are served, 0 = off
+DEFAULT_METRICS = False
+DEFAULT_MQTT_BRIDGE = False
+DEFAULT_EXPORT = False
+DEFAULT_EXPORT_FORMAT = "parquet"
+DEFAULT_ROLLING_STATS = False
+DEFAULT_ROLLING_WINDOW = 15  # Minutes
+DEFAULT_BURST_BUDGET = 2000  # Burst requests per day and entry
+
+# Options that add or remove entities or change the transport, applied by a
+# reload; all other options are applied to the running stations
+RELOAD_OPTIONS = frozenset({
+    CONF_FLEET_DEVICE, CONF_LOOP_WATCHDOG, CONF_RECORD_TRAFFIC, CONF_ROLLING_STATS
+})
+
+# Data point freshness attribute (not recorded)
+ATTR_LAST_REPORTED = "last_reported"
+
+# Gap backfill from device logs (Tuya keeps 7 days of logs)
+BACKFILL_MAX_AGE = timedelta(days=7)
+BACKFILL_BATCH_HOURS = 24
+BACKFILL_SAVE_DELAY = 60
+
+# Runtime estimator
+ESTIMATOR_TIME_CONSTANT = 6 * 3600  # Memory of the capacity regression (seconds)
+ESTIMATOR_POWER_TIME_CONSTANT = 120  # Memory of the power average (seconds)
+ESTIMATOR_MIN_ENERGY_SPAN = 20  # Energy spread (Wh) needed to trust the capacity
+ESTIMATOR_MIN_POWER = 5  # Net power (W) below which the battery counts as idle
+
+# Fleet aggregate device
+DATA_FLEET = f"{DOMAIN}_fleet"
+SIGNAL_FLEET_UPDATED = f"{DOMAIN}_fleet_updated"
+SIGNAL_FLEET_RELEASED = f"{DOMAIN}_fleet_released"  # Owner entry unloaded
+FLEET_RESUM_INTERVAL = 500  # Updates between full re-sums of the totals
+
+# Rarely changing settings, polled in the slow tier or after a command
+SLOW_DP_CODES = frozenset({
+    "ac_off_time_set",
+    "dc_off_time_set",
+    "led_off_time_set",
+    "device_standby_time_set",
+    "display_off_time_set",
+    "led_mode",
+    "switch_buzzer",
+})
+
+# Load shedding rules
+OUTPUT_SWITCH_CODES = ("switch_ac", "switch_dc", "switch_usb")
+RULE_INPUT_PRESENT_POWER = 5  # Input power (W) that counts as "input present"
+EVENT_RULE_TRIGGERED = f"{DOMAIN}_rule_triggered"
+
+# Durable command queue
+COMMAND_QUEUE_MAX_AGE = timedelta(hours=6)  # Older writes are not replayed
+COMMAND_QUEUE_SAVE_DELAY = 1
+COMMAND_RETRY_BASE_DELAY = 15  # Seconds, doubled after each failed attempt
+COMMAND_RETRY_MAX_DELAY = 600
+SIGNAL_QUEUE_UPDATED = f"{DOMAIN}_queue_updated_{{}}"
+
+# Request scheduler (shared by all stations)
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+SCHEDULER_RATE = 5  # Sustained requests per second
+SCHEDULER_BURST = 10
+SCHEDULER_CONCURRENCY = 4
+
+# Staggered poll phases
+DATA_PHASES = f"{DOMAIN}_phases"
+PHASE_MIN_DELAY = 1  # Seconds, closer slots are skipped to the next interval
+
+# Traffic recordings, relative to the configuration directory
+TRAFFIC_DIR = f"{DOMAIN}/traffic"
+
+# Services
+SERVICE_PROFILE = "profile"
+SERVICE_EXPORT = "export"
+SERVICE_BURST = "burst"
+ATTR_DURATION = "duration"
+ATTR_INTERVAL = "interval"
+ATTR_DEVICE_IDS = "device_ids"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_FORMAT = "format"
+
+# Profiles, relative to the configuration directory
+PROFILE_DIR = f"{DOMAIN}/profiles"
+PROFILE_TOP_FUNCTIONS = 15
+
+# Event loop watchdog (shared by all stations)
+DATA_WATCHDOG = f"{DOMAIN}_watchdog"
+SIGNAL_WATCHDOG_UPDATED = f"{DOMAIN}_watchdog_updated"
+WATCHDOG_HEARTBEAT = 0.05  # Seconds between event loop heartbeats
+WATCHDOG_THRESHOLD = 0.1  # Seconds a callback may hold the loop before it is reported
+WATCHDOG_STACK_DEPTH = 8  # Frames of the blocking stack to log
+
+# OpenMetrics exporter (shared by all entries that enable it)
+DATA_METRICS = f"{DOMAIN}_metrics"
+METRICS_URL = f"/api/{DOMAIN}/metrics"
+
+# Rolling statistics sensors
+ROLLING_DP_CODES = ("total_output_power", "total_input_power", "temp_current")
+ROLLING_RESUM_INTERVAL = 64  # Minimum updates between recomputations of the running sums
+ROLLING_COLLAPSE_RATIO = 1e-3  # Variance drop on eviction that forces a recomputation
+
+# Live stream over the websocket API, seconds between samples
+WS_LIVE_SUBSCRIBE = f"{DOMAIN}/live/subscribe"
+LIVE_DEFAULT_INTERVAL = 2
+LIVE_MIN_INTERVAL = 1
+LIVE_MAX_INTERVAL = 10
+
+# Telemetry export, relative to the configuration directory
+EXPORT_DIR = f"{DOMAIN}/exports"
+EXPORT_FORMAT_PARQUET = "parquet"
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_CHUNK_ROWS = 5000  # Rows buffered before they are written
+EXPORT_FLUSH_INTERVAL = timedelta(minutes=5)
+
+# Burst polling, the budget is counted per entry (Tuya project)
+BURST_MAX_RATE = SCHEDULER_RATE / 2  # Requests per second of all bursts together
+BURST_MIN_DURATION = 10  # Seconds, shorter bursts are refused
+BURST_BUFFER_SAMPLES = 1000  # Samples kept per burst
+BURST_SAVE_DELAY = 30
+EVENT_BURST_FINISHED = f"{DOMAIN}_burst_finished"
+
+# MQTT bridge, topics are <base>/<device id>/<code>[/set]
+MQTT_BASE_TOPIC = DOMAIN
+MQTT_COMMAND_DP_CODES = PLATFORM_DP_CODES["switch"] | PLATFORM_DP_CODES["select"]
+
+# Project hub entries (all power stations of a Tuya project)
+CONF_HUB = "hub"
+HUB_BATCH_SIZE = 20  # Devices per batched status request
+HUB_DISCOVERY_INTERVAL = timedelta(minutes=10)
+SIGNAL_STATION_ADDED = f"{DOMAIN}_station_added_{{}}"
@@ -1,68 +1,364 @@
 """DataUpdateCoordinator for Tuya IoT Power Stations."""
 import logging
+import time
+from collections.abc import Mapping
 from datetime import timedelta
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
 from .api import TwoEPowerStationAPI
-from .const import DOMAIN, UPDATE_INTERVAL
+from .backfill import GapBackfill
+from .command_queue import CommandQueue
+from .estimator import RuntimeEstimator
+from .fleet import StationContribution, async_get_fleet
+from .live import LiveSampler
+from .models import StationSnapshot
+from .rolling import RollingStats
+from .rules import RuleEngine
+from .scheduler import (
+    PhasedRefreshMixin,
+    Priority,
+    async_get_phase_planner,
+    async_get_scheduler,
+)
+from .watchdog import async_get_watchdog
+from .const import (
+    CONF_BACKFILL,
+    CONF_BATTERY_CAPACITY,
+    CONF_LOOP_WATCHDOG,
+    CONF_ROLLING_STATS,
+    CONF_ROLLING_WINDOW,
+    CONF_SCAN_INTERVAL,
+    CONF_SLOW_POLL_FACTOR,
+    CONF_STALE_GRACE,
+    DEFAULT_BACKFILL,
+    DEFAULT_BATTERY_CAPACITY,
+    DEFAULT_LOOP_WATCHDOG,
+    DEFAULT_ROLLING_STATS,
+    DEFAULT_ROLLING_WINDOW,
+    DEFAULT_SLOW_POLL_FACTOR,
+    DEFAULT_STALE_GRACE,
+    DOMAIN,
+    EVENT_RULE_TRIGGERED,
+    LATENCY_SMOOTHING,
+    ROLLING_DP_CODES,
+    SLOW_DP_CODES,
+    UPDATE_INTERVAL,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class TwoEPowerStationCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+class TwoEPowerStationCoordinator(PhasedRefreshMixin, DataUpdateCoordinator[StationSnapshot]):
     """Coordinator to update data from Tuya IoT Power Station."""
 
     def __init__(
         self,
         hass: HomeAssistant,
+        entry: ConfigEntry,
         api: TwoEPowerStationAPI,
         update_interval: int = UPDATE_INTERVAL,
+        *,
+        polled: bool = True,
+        unique_prefix: str | None = None,
+        station_name: str | None = None,
     ) -> None:
         """Initialize coordinator.
 
         Args:
             hass: Home Assistant instance
+            entry: Config entry of the station
             api: API client to interact with power station
             update_interval: Update interval in seconds
+            polled: Poll on its own; project stations are fed by the batched
+                project poll and only refresh themselves after commands
+            unique_prefix: Prefix of entity unique IDs and storage keys
+                (defaults to the entry ID)
+            station_name: Device name (defaults to the entry title)
         """
+        self.entry = entry
         self.api = api
+        self.scheduler = async_get_scheduler(hass)
+        self.unique_prefix = unique_prefix or entry.entry_id
+        self.station_name = station_name or entry.title
+        self.poll_interval = timedelta(seconds=update_interval)
+
+        # Poll at this station's own phase of the interval
+        self.phases = async_get_phase_planner(hass)
+        self.phase_key = self.unique_prefix
+        self._unregister_phase = (
+            self.phases.async_register(self.phase_key) if polled else lambda: None
+        )
+
+        # Next poll verifies a command and runs ahead of regular polls
+        self._verify_requested = False
+
+        # Polling tiers: telemetry every poll, settings every N-th poll
+        self.slow_poll_factor = entry.options.get(
+            CONF_SLOW_POLL_FACTOR, DEFAULT_SLOW_POLL_FACTOR
+        )
+        self._tiered = True
+        self._slow_poll_due = True
+        self._fast_polls = 0
+
+        # Freshness: last-known values are served for a grace period after
+        # failed polls, and each data point remembers when it was reported
+        self.stale_grace = entry.options.get(CONF_STALE_GRACE, DEFAULT_STALE_GRACE)
+        self.reported_at: dict[str, float] = {}
+        self.last_success_at: float | None = None
+
+        # Failed polls since start, including those within the grace period
+        self.poll_errors = 0
+
+        # Time to empty / time to full, updated with every sample
+        self.estimator = RuntimeEstimator(
+            entry.options.get(CONF_BATTERY_CAPACITY, DEFAULT_BATTERY_CAPACITY)
+        )
+        self.fleet = async_get_fleet(hass)
+
+        # Durable queue for commands to the device
+        self.commands = CommandQueue(hass, entry, api, self.unique_prefix)
+
+        # Load shedding rules, evaluated on every sample
+        self.rules = RuleEngine.from_options(entry.options)
+
+        # Optional windowed min/max/mean/std of telemetry, updated per sample
+        self.rolling: RollingStats | None = None
+        if entry.options.get(CONF_ROLLING_STATS, DEFAULT_ROLLING_STATS):
+            self.rolling = RollingStats(
+                ROLLING_DP_CODES,
+                entry.options.get(CONF_ROLLING_WINDOW, DEFAULT_ROLLING_WINDOW) * 60,
+            )
+
+        # Recovers polling gaps from the device log
+        self.backfill: GapBackfill | None = None
+        if entry.options.get(CONF_BACKFILL, DEFAULT_BACKFILL):
+            self.backfill = GapBackfill(hass, entry, api, self.unique_prefix)
+
+        # High-rate samples for live stream subscribers, outside the polls
+        self.live = LiveSampler(self)
+
+        # Smoothed round-trip time of status requests (milliseconds)
+        self.latency_ms: float | None = None
+
+        # Optional event loop and executor watchdog, shared by all stations
+        self.watchdog = async_get_watchdog(hass)
+        if entry.options.get(CONF_LOOP_WATCHDOG, DEFAULT_LOOP_WATCHDOG):
+            self.watchdog.async_acquire(entry.entry_id)
 
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=update_interval),
+            update_interval=self.poll_interval if polled else None,
+            # Listeners run on every poll: derived and diagnostic entities
+            # change without a data point changing, data point entities skip
+            # unchanged snapshots themselves
+            always_update=True,
+        )
+
+    async def async_load(self) -> None:
+        """Load persisted state before the first refresh."""
+        await self.commands.async_load()
+        if self.backfill:
+            await self.backfill.async_load()
+
+    @callback
+    def async_unload(self) -> None:
+        """Release shared resources when the entry is unloaded."""
+        self.commands.async_shutdown()
+        self.live.async_stop()
+        self._unregister_phase()
+        self.watchdog.async_release(self.entry.entry_id)
+
+        # Leave the fleet totals
+        self.fleet.async_remove_station(self.unique_prefix)
+
+    async def async_apply_options(self, options: Mapping[str, Any]) -> None:
+        """Apply changed tuning options to the running station.
+
+        Args:
+            options: New config entry options
+        """
+        interval = timedelta(seconds=options.get(CONF_SCAN_INTERVAL, UPDATE_INTERVAL))
+        if interval != self.poll_interval:
+            self.poll_interval = interval
+            if self.update_interval is not None:
+                self.update_interval = interval
+                if self._listeners:
+                    self._schedule_refresh()
+
+        self.stale_grace = options.get(CONF_STALE_GRACE, DEFAULT_STALE_GRACE)
+        self.slow_poll_factor = options.get(
+            CONF_SLOW_POLL_FACTOR, DEFAULT_SLOW_POLL_FACTOR
+        )
+        self._slow_poll_due = (
+            self._slow_poll_due or self._fast_polls >= self.slow_poll_factor - 1
+        )
+
+        self.estimator.set_capacity(
+            options.get(CONF_BATTERY_CAPACITY, DEFAULT_BATTERY_CAPACITY)
+        )
+
+        rules = RuleEngine.from_options(options)
+        rules.restore_state(self.rules)
+        self.rules = rules
+
+        if self.rolling:
+            self.rolling.set_window(
+                options.get(CONF_ROLLING_WINDOW, DEFAULT_ROLLING_WINDOW) * 60
+            )
+
+        if not options.get(CONF_BACKFILL, DEFAULT_BACKFILL):
+            self.backfill = None
+        elif self.backfill is None:
+            # Polling went on meanwhile, so the stored time of the last sample
+            # is not loaded: it would look like a gap
+            self.backfill = GapBackfill(self.hass, self.entry, self.api, self.unique_prefix)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all entities, timed while the watchdog runs."""
+        if not self.watchdog.running:
+            super().async_update_listeners()
+            return
+
+        started = time.perf_counter()
+        super().async_update_listeners()
+        self.watchdog.async_record_callback(
+            f"state update of {self.station_name}", time.perf_counter() - started
+        )
+
+    async def async_send_command(self, code: str, value: Any) -> bool:
+        """Send a command to the device and refresh its state."""
+        return await self.async_send_commands({code: value})
+
+    async def async_send_commands(self, commands: dict[str, Any]) -> bool:
+        """Send commands through the durable queue and refresh the state.
+
+        Returns:
+            True if delivered now, False if queued for retry or rejected
+        """
+        delivered = await self.commands.async_send(commands)
+        if delivered:
+            self._verify_requested = True
+            if not SLOW_DP_CODES.isdisjoint(commands):
+                self._slow_poll_due = True
+            await self.async_request_refresh()
+        return delivered
+
+    async def _async_replay_commands(self) -> None:
+        """Replay the command queue and refresh the state."""
+        if await self.commands.async_flush():
+            self._verify_requested = True
+            self._slow_poll_due = True
+            await self.async_request_refresh()
+
+    def stale_limit(self, code: str) -> float:
+        """Return the age in seconds after which a data point is stale.
+
+        A data point is expected once per poll (or once per full poll for
+        settings), the grace period comes on top.
+        """
+        period = self.poll_interval.total_seconds()
+        if self._tiered and code in SLOW_DP_CODES:
+            period *= self.slow_poll_factor
+        return period + self.stale_grace
+
+    def stale_at(self, codes: frozenset[str]) -> float | None:
+        """Return the Unix time the last of the data points goes stale.
+
+        None if staleness is disabled or none of the data points was reported.
+        """
+        if not self.stale_grace:
+            return None
+        return max(
+            (
+                self.reported_at[code] + self.stale_limit(code)
+                for code in codes
+                if code in self.reported_at
+            ),
+            default=None,
         )
 
-    async def _async_update_data(self) -> dict[str, Any]:
+    def is_fresh(self, codes: frozenset[str]) -> bool:
+        """Return whether any of the data points is within its staleness limit."""
+        stale_at = self.stale_at(codes)
+        return stale_at is None or time.time() <= stale_at
+
+    def last_reported(self, codes: frozenset[str]) -> float | None:
+        """Return the Unix time the newest of the data points was reported."""
+        return max(
+            (self.reported_at[code] for code in codes if code in self.reported_at),
+            default=None,
+        )
+
+    def _in_grace(self) -> bool:
+        """Whether last-known values may still be served after a failed poll."""
+        return (
+            bool(self.stale_grace)
+            and self.data is not None
+            and self.last_success_at is not None
+            and time.time() - self.last_success_at <= self.stale_grace
+        )
+
+    def _mark_reported(self, codes: Any) -> None:
+        """Record that the device just reported these data points."""
+        now = time.time()
+        for code in codes:
+            self.reported_at[code] = now
+
+    async def _async_update_data(self) -> StationSnapshot:
         """Fetch updated data from power station.
 
+        A failed poll keeps serving the last snapshot during the stale grace
+        period, so a flaky cloud does not flap every entity to unavailable.
+
         Returns:
-            Dictionary with all device data (all Tuya data points)
+            Snapshot with all device data (all Tuya data points)
+
+        Raises:
+            UpdateFailed: If update fails after the grace period
+        """
+        try:
+            return await self._async_poll()
+        except UpdateFailed as err:
+            self.poll_errors += 1
+            if self.rolling:
+                self.rolling.expire(time.time())
+            if self._in_grace():
+                _LOGGER.debug(
+                    "Serving last-known values of %s after failed poll: %s",
+                    self.station_name, err,
+                )
+                return self.data
+            self._publish_fleet(None)
+            raise
+
+    async def _async_poll(self) -> StationSnapshot:
+        """Fetch the status and build the new snapshot.
 
         Raises:
             UpdateFailed: If update fails
         """
         try:
-            # Tuya SDK is not async, so we run in executor
-            status = await self.hass.async_add_executor_job(
-                self.api.get_device_status
-            )
+            # Tuya SDK is not async, so we run in executor via the scheduler
+            priority = Priority.VERIFY if self._verify_requested else Priority.POLL
+            self._verify_requested = False
+            status = await self._async_fetch_status(priority)
 
             if not status:
                 # API returns {} if device is offline or there is an error
                 # This is already logged in api.py
                 raise UpdateFailed("Received empty status from device")
 
-            # Log received data points for debugging
-            _LOGGER.debug("Received status from Tuya: %s", status)
-
             # Return the entire status - it contains all data points from Tuya
             # Each sensor/switch will take its own data point
-            return status
+            return self._process_status(status)
 
         except UpdateFailed:
             raise
@@ -72,3 +368,153 @@ class TwoEPowerStationCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             else:
                 _LOGGER.error("Error updating data: %s", err)
             raise UpdateFailed(f"Error updating data: {err}") from err
+
+    @callback
+    def async_handle_status(self, status: dict[str, Any] | None) -> None:
+        """Take a status fetched by the batched project poll.
+
+        Args:
+            status: Typed data point values, empty or None if the device did
+                not answer
+        """
+        if not status:
+            self.poll_errors += 1
+            if self.rolling:
+                self.rolling.expire(time.time())
+            if self._in_grace():
+                self.async_set_updated_data(self.data)
+                return
+            self._publish_fleet(None)
+            self.async_set_update_error(
+                UpdateFailed(f"No status for device {self.api.device_id}")
+            )
+            return
+
+        self._mark_reported(status)
+        snapshot = self._process_status(status)
+        self.async_set_updated_data(snapshot)
+
+    def _process_status(self, status: dict[str, Any]) -> StationSnapshot:
+        """Turn a fetched status into a snapshot and run the per-sample work."""
+        # Log received data points for debugging
+        _LOGGER.debug("Received status from Tuya: %s", status)
+
+        now = time.time()
+        if self.stale_grace and self.data:
+            # Keep serving data points this poll missed until they are stale
+            retained = {
+                code: value
+                for code, value in self.data.items()
+                if code not in status
+                and now - self.reported_at.get(code, 0) <= self.stale_limit(code)
+            }
+            if retained:
+                status = {**retained, **status}
+        self.last_success_at = now
+
+        # Decode once, entities only read the typed snapshot
+        snapshot = StationSnapshot.build(status, self.data, now)
+
+        self._update_latency()
+        self._update_estimator(snapshot)
+        if self.rolling:
+            self.rolling.add_sample(now, snapshot)
+        self._publish_fleet(snapshot)
+        self._evaluate_rules(snapshot)
+
+        # Device answers again, replay commands queued while it was offline
+        if self.commands.replay_due:
+            self.entry.async_create_background_task(
+                self.hass,
+                self._async_replay_commands(),
+                f"{DOMAIN} replay {self.api.device_id}",
+            )
+
+        if self.backfill:
+            self.backfill.async_sample_received(
+                dt_util.utcnow(), 3 * self.poll_interval
+            )
+
+        return snapshot
+
+    async def _async_fetch_status(self, priority: Priority) -> dict[str, Any]:
+        """Fetch the fast tier, or every data point when the slow tier is due.
+
+        Fast polls only ask the device shadow for telemetry data points and
+        merge them into the previous snapshot. A full poll also picks up
+        settings and data points that appeared since the last one.
+        """
+        if self._tiered and not self._slow_poll_due and self.data:
+            fast_codes = [code for code in self.data if code not in SLOW_DP_CODES]
+            properties = await self.scheduler.async_run(
+                priority, self.api.get_device_properties, fast_codes
+            )
+            if properties is not None:
+                self._mark_reported(properties)
+                self._fast_polls += 1
+                self._slow_poll_due = self._fast_polls >= self.slow_poll_factor - 1
+                return {**self.data, **properties} if properties else {}
+
+            # Shadow API not available for this project, always poll everything
+            self._tiered = False
+
+        status = await self.scheduler.async_run(priority, self.api.get_device_status)
+        if status:
+            self._mark_reported(status)
+            self._fast_polls = 0
+            self._slow_poll_due = self.slow_poll_factor <= 1
+        return status
+
+    def _update_latency(self) -> None:
+        """Fold the last request round-trip time into the smoothed latency."""
+        if self.api.latency is None:
+            return
+
+        latency_ms = self.api.latency * 1000
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms += LATENCY_SMOOTHING * (latency_ms - self.latency_ms)
+
+    def _update_estimator(self, snapshot: StationSnapshot) -> None:
+        """Feed the runtime estimator with the new sample."""
+        if snapshot.soc is None:
+            return
+
+        self.estimator.add_sample(
+            time.time(), snapshot.soc, snapshot.output_power, snapshot.input_power
+        )
+
+    def _publish_fleet(self, snapshot: StationSnapshot | None) -> None:
+        """Report this station's contribution to the fleet totals."""
+        if snapshot is None:
+            contribution = StationContribution()
+        else:
+            contribution = StationContribution(
+                online=True,
+                soc=self.estimator.soc,
+                capacity=self.estimator.capacity,
+                input_power=snapshot.input_power,
+                output_power=snapshot.output_power,
+            )
+        self.fleet.async_update_station(self.unique_prefix, contribution)
+
+    def _evaluate_rules(self, snapshot: StationSnapshot) -> None:
+        """Run rules on the new sample and send the resulting commands."""
+        for rule_name, commands in self.rules.evaluate(snapshot):
+            self.hass.bus.async_fire(
+                EVENT_RULE_TRIGGERED,
+                {"device_id": self.api.device_id, "rule": rule_name, "commands": commands},
+            )
+            self.entry.async_create_background_task(
+                self.hass,
+                self._async_send_rule_commands(rule_name, commands),
+                f"{DOMAIN} rule {rule_name}",
+            )
+
+    async def _async_send_rule_commands(
+        self, rule_name: str, commands: dict[str, Any]
+    ) -> None:
+        """Send all commands of a fired rule as one batch."""
+        if not await self.async_send_commands(commands):
+            _LOGGER.warning("Rule %s commands were not delivered yet", rule_name)
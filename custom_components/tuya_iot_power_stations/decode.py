@@ -0,0 +1,115 @@
+"""Fast decoding of Tuya Cloud responses for Tuya IoT Power Stations.
+
+Kept free of Home Assistant imports so it can be benchmarked standalone.
+"""
+import json
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any, NamedTuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ships with Home Assistant
+    orjson = None
+
+# Tuya error codes
+CODE_DEVICE_OFFLINE = 2001
+CODE_TOKEN_INVALID = 1010
+
+# How each known data point is decoded, everything else is kept as reported
+INT_DP_CODES = frozenset({"battery_percentage"})
+FLOAT_DP_CODES = frozenset({
+    "total_input_power",
+    "total_output_power",
+    "ac_output_power",
+    "dc_output_power",
+    "usb1_output_power",
+    "usb2_output_power",
+    "usb3_output_power",
+    "usb4_output_power",
+    "usb_c1_output_power",
+    "usb_c2_output_power",
+    "temp_current",
+    "charge_energy",
+    "discharge_energy",
+})
+BOOL_DP_CODES = frozenset({
+    "switch_ac",
+    "switch_dc",
+    "switch_usb",
+    "switch_buzzer",
+    "usb_status",
+})
+
+
+def _to_int(value: Any) -> int:
+    """Convert to int, also from float strings such as "55.0"."""
+    return int(float(value))
+
+
+_DECODERS: dict[str, Callable[[Any], Any]] = {
+    **dict.fromkeys(INT_DP_CODES, _to_int),
+    **dict.fromkeys(FLOAT_DP_CODES, float),
+    **dict.fromkeys(BOOL_DP_CODES, bool),
+}
+
+loads: Callable[[bytes | str], Any] = orjson.loads if orjson else json.loads
+
+
+class TuyaResponse(NamedTuple):
+    """Envelope of a Tuya Cloud response."""
+
+    success: bool
+    code: int | None
+    msg: str
+    result: Any
+
+    @classmethod
+    def from_json(cls, content: bytes) -> "TuyaResponse":
+        """Parse a response body."""
+        return cls.from_dict(loads(content))
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any] | None) -> "TuyaResponse":
+        """Wrap a response already parsed by the SDK."""
+        if not data:
+            return cls(False, None, "Empty response", None)
+        return cls(
+            bool(data.get("success")),
+            data.get("code"),
+            data.get("msg") or "Unknown error",
+            data.get("result"),
+        )
+
+    @property
+    def offline(self) -> bool:
+        """Whether the request failed because the device is offline."""
+        return self.code == CODE_DEVICE_OFFLINE or "device is offline" in self.msg.lower()
+
+
+def decode_value(code: str, value: Any) -> Any:
+    """Convert a raw data point value to its Python type."""
+    if (decoder := _DECODERS.get(code)) is None:
+        return value
+    try:
+        return decoder(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def decode_status(items: Iterable[Mapping[str, Any]] | None) -> dict[str, Any]:
+    """Turn a list of {code, value} items into typed values by code in one pass."""
+    status: dict[str, Any] = {}
+    if not items:
+        return status
+
+    decoders = _DECODERS
+    for item in items:
+        code = item["code"]
+        value = item["value"]
+        if (decoder := decoders.get(code)) is not None:
+            try:
+                value = decoder(value)
+            except (TypeError, ValueError):
+                pass
+        status[code] = value
+    return status
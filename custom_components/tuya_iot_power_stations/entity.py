@@ -0,0 +1,150 @@
+"""Base entity for Tuya IoT Power Stations."""
+import time
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .const import ATTR_LAST_REPORTED
+from .coordinator import TwoEPowerStationCoordinator
+from .models import StationSnapshot
+
+
+class PowerStationCoordinatorEntity(CoordinatorEntity[TwoEPowerStationCoordinator]):
+    """Coordinator entity that skips state writes when its data is unchanged.
+
+    Entities listing the data points their state depends on in `_dp_codes`
+    are only written when one of those data points changed in the new
+    snapshot or availability changed. Entities without `_dp_codes` are
+    written on every coordinator update.
+
+    Such entities also go unavailable on their own once none of their data
+    points was reported within its staleness limit, checked by a timer at
+    that deadline so it also happens between polls. They carry the time of
+    the last report as an attribute.
+    """
+
+    _dp_codes: frozenset[str] | None = None
+    _unrecorded_attributes = frozenset({ATTR_LAST_REPORTED})
+
+    def __init__(self, coordinator: TwoEPowerStationCoordinator) -> None:
+        """Initialize entity."""
+        super().__init__(coordinator)
+        self._seen_version: int | None = None
+        self._written_available: bool | None = None
+        self._unsub_stale: CALLBACK_TYPE | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Start watching the data points for staleness."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._async_cancel_stale_check)
+        self._async_schedule_stale_check()
+
+    @property
+    def available(self) -> bool:
+        """Return if the last update succeeded and the data points are fresh."""
+        if not super().available:
+            return False
+        return self._dp_codes is None or self.coordinator.is_fresh(self._dp_codes)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return when the entity's data points were last reported."""
+        if self._dp_codes is None:
+            return None
+        reported = self.coordinator.last_reported(self._dp_codes)
+        if reported is None:
+            return None
+        return {ATTR_LAST_REPORTED: dt_util.utc_from_timestamp(reported).isoformat()}
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if the entity's data points or availability changed."""
+        self._async_schedule_stale_check()
+        data = self.coordinator.data
+        available = self.available
+        seen_version, self._seen_version = self._seen_version, data.version if data else None
+
+        if (
+            self._dp_codes is not None
+            and data is not None
+            and seen_version is not None
+            and available == self._written_available
+            and (
+                data.version == seen_version
+                or (data.version == seen_version + 1 and self._dp_codes.isdisjoint(data.changed))
+            )
+        ):
+            return
+
+        self._written_available = available
+        super()._handle_coordinator_update()
+
+    @callback
+    def _async_schedule_stale_check(self) -> None:
+        """Check availability again when the data points go stale."""
+        if self._dp_codes is None or self._unsub_stale is not None:
+            return
+        stale_at = self.coordinator.stale_at(self._dp_codes)
+        if stale_at is None or (delay := stale_at - time.time()) < 0:
+            # Stale already, the next report makes the entity available again
+            return
+        # A second late, so the data points are past their limit when it runs
+        self._unsub_stale = async_call_later(self.hass, delay + 1, self._async_stale_check)
+
+    @callback
+    def _async_stale_check(self, _now: Any) -> None:
+        """Write the state if the data points went stale since the last write."""
+        self._unsub_stale = None
+        available = self.available
+        if available != self._written_available:
+            self._written_available = available
+            self.async_write_ha_state()
+        # Reports since scheduling moved the deadline
+        self._async_schedule_stale_check()
+
+    @callback
+    def _async_cancel_stale_check(self) -> None:
+        """Stop the staleness timer."""
+        if self._unsub_stale is not None:
+            self._unsub_stale()
+            self._unsub_stale = None
+
+
+@callback
+def async_add_station_entities(
+    coordinator: TwoEPowerStationCoordinator,
+    async_add_entities: AddEntitiesCallback,
+    build: Callable[[StationSnapshot], list[PowerStationCoordinatorEntity]],
+) -> None:
+    """Add the entities of a station now and whenever new data points appear.
+
+    Args:
+        coordinator: Station coordinator
+        async_add_entities: Platform callback to add entities with
+        build: Returns every entity of the platform the snapshot supports;
+            entities added before are skipped by unique ID
+    """
+    added: set[str | None] = set()
+    known_codes: set[str] = set()
+
+    @callback
+    def async_add_new() -> None:
+        """Add the entities of data points that were not reported before."""
+        data = coordinator.data
+        # Only changed data points can be new ones
+        if data is None or (known_codes and data.changed <= known_codes):
+            return
+
+        known_codes.update(data)
+        entities = [entity for entity in build(data) if entity.unique_id not in added]
+        if entities:
+            added.update(entity.unique_id for entity in entities)
+            async_add_entities(entities)
+
+    async_add_new()
+    coordinator.entry.async_on_unload(coordinator.async_add_listener(async_add_new))
@@ -0,0 +1,157 @@
+"""Incremental runtime estimation for Tuya IoT Power Stations."""
+import math
+
+from .const import (
+    ESTIMATOR_MIN_ENERGY_SPAN,
+    ESTIMATOR_MIN_POWER,
+    ESTIMATOR_POWER_TIME_CONSTANT,
+    ESTIMATOR_TIME_CONSTANT,
+)
+
+
+class RuntimeEstimator:
+    """Estimate time to empty and time to full from SOC and power samples.
+
+    Battery capacity is learned with an exponentially weighted linear
+    regression of state of charge against the net energy that flowed out of
+    the battery, which works across charge/discharge switches and despite
+    the 1% resolution of the SOC data point. Power is smoothed with an
+    exponential moving average, which restarts from the new sample when the
+    battery switches between charging and discharging. Every sample only updates a few running
+    sums, so each update costs O(1) and no history is kept.
+    """
+
+    def __init__(
+        self,
+        capacity: float | None = None,
+        time_constant: float = ESTIMATOR_TIME_CONSTANT,
+        power_time_constant: float = ESTIMATOR_POWER_TIME_CONSTANT,
+    ) -> None:
+        """Initialize estimator.
+
+        Args:
+            capacity: Known usable capacity in Wh (learned if not set)
+            time_constant: Memory of the capacity regression in seconds
+            power_time_constant: Memory of the power average in seconds
+        """
+        self._fixed_capacity = bool(capacity)
+        self._time_constant = time_constant
+        self._power_time_constant = power_time_constant
+        self._last_time: float | None = None
+        self._last_power = 0.0
+
+        # Weighted regression sums, x is relative to the latest sample
+        self._weight = 0.0
+        self._sum_x = 0.0
+        self._sum_y = 0.0
+        self._sum_xx = 0.0
+        self._sum_xy = 0.0
+
+        self.soc: float | None = None
+        self.power: float | None = None
+        self.wh_per_percent: float | None = capacity / 100 if capacity else None
+
+    def add_sample(
+        self, timestamp: float, soc: float, output_power: float, input_power: float
+    ) -> None:
+        """Update the model with a new sample.
+
+        Args:
+            timestamp: Sample time (Unix time in seconds)
+            soc: Battery level in percent
+            output_power: Total output power in W
+            input_power: Total input power in W
+        """
+        power = output_power - input_power
+
+        if self._last_time is None:
+            elapsed = 0.0
+            decay = 0.0
+            self.power = power
+        else:
+            elapsed = timestamp - self._last_time
+            if elapsed <= 0:
+                return
+            decay = math.exp(-elapsed / self._time_constant)
+            if power * self.power < 0 and abs(power) >= ESTIMATOR_MIN_POWER:
+                # The average of the other direction says nothing about this one
+                self.power = power
+            else:
+                alpha = 1 - math.exp(-elapsed / self._power_time_constant)
+                self.power += alpha * (power - self.power)
+
+        # Energy discharged since the previous sample (trapezoidal rule, Wh)
+        energy = (self._last_power + power) / 2 * elapsed / 3600
+        self._last_time = timestamp
+        self._last_power = power
+        self.soc = soc
+
+        # Move the origin to the new sample: x -> x - energy
+        self._sum_xx -= 2 * energy * self._sum_x - self._weight * energy * energy
+        self._sum_xy -= energy * self._sum_y
+        self._sum_x -= self._weight * energy
+
+        # Forget old samples and add the new point (0, soc)
+        self._weight = self._weight * decay + 1
+        self._sum_x *= decay
+        self._sum_y = self._sum_y * decay + soc
+        self._sum_xx *= decay
+        self._sum_xy *= decay
+
+        self._update_capacity()
+
+    def _update_capacity(self) -> None:
+        """Refresh the capacity estimate if the regression is well conditioned."""
+        if self._fixed_capacity:
+            return
+
+        mean_x = self._sum_x / self._weight
+        variance = self._sum_xx / self._weight - mean_x * mean_x
+        if variance < ESTIMATOR_MIN_ENERGY_SPAN ** 2:
+            return
+
+        covariance = self._sum_xy / self._weight - mean_x * self._sum_y / self._weight
+        slope = covariance / variance  # percent per discharged Wh
+        if slope < 0:
+            self.wh_per_percent = -1 / slope
+
+    def set_capacity(self, capacity: float | None) -> None:
+        """Use a known capacity, or learn it from the samples if not set.
+
+        Args:
+            capacity: Known usable capacity in Wh
+        """
+        self._fixed_capacity = bool(capacity)
+        if capacity:
+            self.wh_per_percent = capacity / 100
+            return
+
+        # The regression sums were kept up to date, resume learning from them
+        self.wh_per_percent = None
+        if self._weight:
+            self._update_capacity()
+
+    @property
+    def capacity(self) -> float | None:
+        """Estimated usable battery capacity in Wh."""
+        if self.wh_per_percent is None:
+            return None
+        return self.wh_per_percent * 100
+
+    @property
+    def time_to_empty(self) -> float | None:
+        """Estimated minutes until the battery is empty while discharging."""
+        if self.wh_per_percent is None or self.soc is None or self.power is None:
+            return None
+        if self.power < ESTIMATOR_MIN_POWER:
+            return None
+        return self.soc * self.wh_per_percent / self.power * 60
+
+    @property
+    def time_to_full(self) -> float | None:
+        """Estimated minutes until the battery is full while charging."""
+        if self.wh_per_percent is None or self.soc is None or self.power is None:
+            return None
+        if self.power > -ESTIMATOR_MIN_POWER:
+            return None
+        return (100 - self.soc) * self.wh_per_percent / -self.power * 60
@@ -0,0 +1,361 @@
+"""Telemetry export to Parquet or CSV files for Tuya IoT Power Stations."""
+import asyncio
+import contextlib
+import csv
+import json
+import logging
+from datetime import date, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    EXPORT_CHUNK_ROWS,
+    EXPORT_DIR,
+    EXPORT_FLUSH_INTERVAL,
+    EXPORT_FORMAT_PARQUET,
+)
+from .decode import decode_value
+from .scheduler import Priority
+
+if TYPE_CHECKING:
+    from .coordinator import TwoEPowerStationCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# One sample of one data point: Unix time, device ID, code, typed value
+Row = tuple[float, str, str, Any]
+
+# Numbers and booleans go to `value`, everything else to `text`
+COLUMNS = ("time", "device_id", "code", "value", "text")
+
+
+def _split_value(value: Any) -> tuple[float | None, str | None]:
+    """Return the numeric and the text column of a value."""
+    if isinstance(value, (bool, int, float)):
+        return float(value), None
+    if value is None:
+        return None, None
+    if isinstance(value, (dict, list)):
+        return None, json.dumps(value)
+    return None, str(value)
+
+
+def _log_value(code: str, raw: Any) -> Any:
+    """Type a device log value, which reports booleans as strings."""
+    if raw in ("true", "false"):
+        return raw == "true"
+    return decode_value(code, raw)
+
+
+class SampleWriter(Protocol):
+    """Appends rows to an export file. Not thread safe, callers serialize."""
+
+    path: Path
+
+    def write(self, rows: list[Row]) -> None:
+        """Append rows."""
+
+    def close(self) -> None:
+        """Finish the file."""
+
+
+class CsvSampleWriter:
+    """Write rows as CSV with UTC ISO timestamps, appending to existing files."""
+
+    def __init__(self, path: Path) -> None:
+        """Open the file, with a header if it is new."""
+        self.path = path
+        new = not path.exists()
+        self._file = path.open("a", encoding="utf-8", newline="")
+        self._csv = csv.writer(self._file)
+        if new:
+            self._csv.writerow(COLUMNS)
+
+    def write(self, rows: list[Row]) -> None:
+        """Append rows and flush them to disk."""
+        for sampled_at, device_id, code, value in rows:
+            self._csv.writerow((
+                dt_util.utc_from_timestamp(sampled_at).isoformat(),
+                device_id,
+                code,
+                *_split_value(value),
+            ))
+        self._file.flush()
+
+    def close(self) -> None:
+        """Close the file."""
+        self._file.close()
+
+
+class ParquetSampleWriter:
+    """Write rows to a Parquet file, one row group per write.
+
+    The file is only readable after it is closed, Parquet keeps its
+    metadata in the footer.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Create the file.
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        # Imported lazily, pyarrow is optional and large
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self._pa = pa
+        self._schema = pa.schema([
+            ("time", pa.timestamp("ms", tz="UTC")),
+            ("device_id", pa.string()),
+            ("code", pa.string()),
+            ("value", pa.float64()),
+            ("text", pa.string()),
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema, compression="zstd")
+
+    def write(self, rows: list[Row]) -> None:
+        """Append rows as a row group."""
+        values, texts = zip(*(_split_value(row[3]) for row in rows))
+        table = self._pa.table(
+            [
+                [int(row[0] * 1000) for row in rows],
+                [row[1] for row in rows],
+                [row[2] for row in rows],
+                list(values),
+                list(texts),
+            ],
+            schema=self._schema,
+        )
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        """Write the footer and close the file."""
+        self._writer.close()
+
+
+def open_writer(base: Path, export_format: str) -> SampleWriter:
+    """Open an export file, falling back to CSV without pyarrow.
+
+    Args:
+        base: File path without suffix, its directory is created
+        export_format: EXPORT_FORMAT_PARQUET or EXPORT_FORMAT_CSV
+
+    Returns:
+        Writer for the new file
+    """
+    base.parent.mkdir(parents=True, exist_ok=True)
+    if export_format == EXPORT_FORMAT_PARQUET:
+        path = base.with_name(f"{base.name}.parquet")
+        # Parquet files cannot be appended to, continue in a new part
+        part = 1
+        while path.exists():
+            part += 1
+            path = base.with_name(f"{base.name}-{part}.parquet")
+        try:
+            return ParquetSampleWriter(path)
+        except ImportError:
+            _LOGGER.warning("pyarrow is not installed, exporting %s as CSV", base.name)
+    return CsvSampleWriter(base.with_name(f"{base.name}.csv"))
+
+
+class DailyExporter:
+    """Export every sample of a station to one file per local day.
+
+    Changed data points are buffered in memory and written in chunks of at
+    most EXPORT_CHUNK_ROWS rows, and at least every EXPORT_FLUSH_INTERVAL,
+    in the executor. Each write waits for the previous one, so chunks land
+    in order and a day's file is closed before the next day's is opened.
+    A new file is started at midnight.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        station: "TwoEPowerStationCoordinator",
+        export_format: str,
+    ) -> None:
+        """Initialize exporter.
+
+        Args:
+            hass: Home Assistant instance
+            station: Coordinator of the station to export
+            export_format: EXPORT_FORMAT_PARQUET or EXPORT_FORMAT_CSV
+        """
+        self.hass = hass
+        self.station = station
+        self.export_format = export_format
+        self.device_id = station.api.device_id
+        self._rows: list[Row] = []
+        self._day: date | None = None
+        self._version: int | None = None
+        self._writer: SampleWriter | None = None
+        self._writer_day: date | None = None
+        # Last write handed to the executor, the next one waits for it
+        self._write_task: asyncio.Task | None = None
+        self._unsubs: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_start(self) -> None:
+        """Start exporting the station's updates."""
+        self._unsubs.append(self.station.async_add_listener(self._async_sample))
+        self._unsubs.append(async_track_time_interval(
+            self.hass, self._async_flush_interval, EXPORT_FLUSH_INTERVAL
+        ))
+        self._async_sample()
+        _LOGGER.info("Exporting %s to daily %s files", self.station.station_name, self.export_format)
+
+    @callback
+    def async_stop(self) -> None:
+        """Write the buffered rows and close the current file."""
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs.clear()
+        self._async_flush(close=True)
+
+    @callback
+    def _async_sample(self) -> None:
+        """Buffer the data points that changed with the last update."""
+        data = self.station.data
+        if data is None or data.version == self._version:
+            return
+
+        # Everything on the first sample or after a missed snapshot
+        codes = (
+            data.changed
+            if self._version is not None and data.version == self._version + 1
+            else data.keys()
+        )
+        self._version = data.version
+
+        day = dt_util.as_local(dt_util.utc_from_timestamp(data.fetched_at)).date()
+        if day != self._day:
+            self._async_flush()
+            self._day = day
+
+        self._rows.extend(
+            (data.fetched_at, self.device_id, code, data[code])
+            for code in codes
+            if code in data
+        )
+        if len(self._rows) >= EXPORT_CHUNK_ROWS:
+            self._async_flush()
+
+    @callback
+    def _async_flush_interval(self, _now: datetime) -> None:
+        """Write the buffered rows periodically."""
+        self._async_flush()
+
+    @callback
+    def _async_flush(self, close: bool = False) -> None:
+        """Queue the buffered rows of the current day for writing."""
+        rows, self._rows = self._rows, []
+        if rows or close:
+            # Not an entry task, the last write must finish after unload
+            self._write_task = self.hass.async_create_task(
+                self._async_write(self._write_task, rows, self._day, close)
+            )
+
+    async def _async_write(
+        self,
+        previous: asyncio.Task | None,
+        rows: list[Row],
+        day: date | None,
+        close: bool,
+    ) -> None:
+        """Write rows in the executor once the previous write is done."""
+        if previous is not None:
+            with contextlib.suppress(Exception):
+                await previous
+        await self.hass.async_add_executor_job(self._write, rows, day, close)
+
+    def _write(self, rows: list[Row], day: date | None, close: bool) -> None:
+        """Write rows to the file of their day."""
+        try:
+            if self._writer is not None and self._writer_day != day:
+                self._writer.close()
+                self._writer = None
+            if rows and day is not None:
+                if self._writer is None:
+                    self._writer = open_writer(
+                        Path(self.hass.config.path(
+                            EXPORT_DIR, f"{self.device_id}-{day.isoformat()}"
+                        )),
+                        self.export_format,
+                    )
+                    self._writer_day = day
+                self._writer.write(rows)
+            if close and self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        except OSError as err:
+            _LOGGER.error("Error exporting samples of %s: %s", self.device_id, err)
+
+
+async def async_export_range(
+    hass: HomeAssistant,
+    station: "TwoEPowerStationCoordinator",
+    start: datetime,
+    end: datetime,
+    export_format: str,
+) -> tuple[Path, int]:
+    """Export the device log of a station for a time range to one file.
+
+    Log pages are streamed and written in chunks, so memory stays bounded
+    by EXPORT_CHUNK_ROWS however long the range is.
+
+    Args:
+        hass: Home Assistant instance
+        station: Coordinator of the station to export
+        start: Range start
+        end: Range end
+        export_format: EXPORT_FORMAT_PARQUET or EXPORT_FORMAT_CSV
+
+    Returns:
+        Path of the written file and the number of rows
+    """
+    device_id = station.api.device_id
+    base = Path(hass.config.path(
+        EXPORT_DIR,
+        f"{device_id}-{dt_util.as_local(start):%Y%m%d-%H%M%S}"
+        f"-{dt_util.as_local(end):%Y%m%d-%H%M%S}",
+    ))
+    writer = await hass.async_add_executor_job(open_writer, base, export_format)
+
+    pages = station.api.iter_device_logs(
+        int(start.timestamp() * 1000), int(end.timestamp() * 1000)
+    )
+    rows: list[Row] = []
+    count = 0
+    try:
+        while (
+            page := await station.scheduler.async_run(Priority.BACKGROUND, next, pages, None)
+        ) is not None:
+            for log in page:
+                try:
+                    rows.append((
+                        log["event_time"] / 1000,
+                        device_id,
+                        log["code"],
+                        _log_value(log["code"], log["value"]),
+                    ))
+                except (KeyError, TypeError):
+                    continue
+            if len(rows) >= EXPORT_CHUNK_ROWS:
+                await hass.async_add_executor_job(writer.write, rows)
+                count += len(rows)
+                rows = []
+
+        if rows:
+            await hass.async_add_executor_job(writer.write, rows)
+            count += len(rows)
+    finally:
+        await hass.async_add_executor_job(writer.close)
+
+    _LOGGER.info("Exported %d samples of %s to %s", count, device_id, writer.path)
+    return writer.path, count
@@ -0,0 +1,135 @@
+"""Fleet-wide aggregation for Tuya IoT Power Stations."""
+import logging
+from typing import NamedTuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .const import (
+    DATA_FLEET,
+    FLEET_RESUM_INTERVAL,
+    SIGNAL_FLEET_RELEASED,
+    SIGNAL_FLEET_UPDATED,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StationContribution(NamedTuple):
+    """What one station adds to the fleet totals."""
+
+    online: bool = False
+    soc: float | None = None
+    capacity: float | None = None  # Wh
+    input_power: float = 0.0
+    output_power: float = 0.0
+
+
+class FleetAggregator:
+    """Keep fleet totals up to date from per-station deltas.
+
+    Each station update subtracts the station's previous contribution and
+    adds the new one, so an update costs O(1) no matter how many stations
+    exist. Totals are re-summed from scratch every few hundred updates to
+    keep floating point drift bounded.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize aggregator."""
+        self.hass = hass
+        self.owner: str | None = None
+        self._stations: dict[str, StationContribution] = {}
+        self._updates = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        """Zero all totals."""
+        self.station_count = 0
+        self.online_count = 0
+        self.input_power = 0.0
+        self.output_power = 0.0
+        self.stored_energy = 0.0  # Wh, stations with known capacity
+        self.capacity = 0.0  # Wh, stations with known capacity
+        self._soc_sum = 0.0  # Stations without known capacity
+        self._soc_count = 0
+
+    def _apply(self, contribution: StationContribution, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) a station contribution."""
+        self.station_count += sign
+        if not contribution.online:
+            return
+
+        self.online_count += sign
+        self.input_power += sign * contribution.input_power
+        self.output_power += sign * contribution.output_power
+        if contribution.soc is None:
+            return
+        if contribution.capacity:
+            self.stored_energy += sign * contribution.soc / 100 * contribution.capacity
+            self.capacity += sign * contribution.capacity
+        else:
+            self._soc_sum += sign * contribution.soc
+            self._soc_count += sign
+
+    @property
+    def battery_level(self) -> float | None:
+        """Fleet battery level in percent, weighted by capacity where known."""
+        if self.capacity > 0:
+            return self.stored_energy / self.capacity * 100
+        if self._soc_count > 0:
+            return self._soc_sum / self._soc_count
+        return None
+
+    @callback
+    def async_claim(self, entry_id: str) -> bool:
+        """Let one config entry own the fleet device entities."""
+        if self.owner is None:
+            self.owner = entry_id
+        return self.owner == entry_id
+
+    @callback
+    def async_release(self, entry_id: str) -> None:
+        """Give up ownership of the fleet device entities.
+
+        Other entries that enable the fleet device are told, so one of them
+        claims it and adds the entities again.
+        """
+        if self.owner == entry_id:
+            self.owner = None
+            async_dispatcher_send(self.hass, SIGNAL_FLEET_RELEASED, entry_id)
+
+    @callback
+    def async_update_station(self, key: str, contribution: StationContribution) -> None:
+        """Replace the contribution of one station."""
+        previous = self._stations.get(key)
+        if previous == contribution:
+            return
+
+        if previous is not None:
+            self._apply(previous, -1)
+        self._apply(contribution, 1)
+        self._stations[key] = contribution
+
+        self._updates += 1
+        if self._updates % FLEET_RESUM_INTERVAL == 0:
+            self._reset()
+            for station in self._stations.values():
+                self._apply(station, 1)
+
+        async_dispatcher_send(self.hass, SIGNAL_FLEET_UPDATED)
+
+    @callback
+    def async_remove_station(self, key: str) -> None:
+        """Remove a station from the fleet."""
+        if (previous := self._stations.pop(key, None)) is None:
+            return
+        self._apply(previous, -1)
+        async_dispatcher_send(self.hass, SIGNAL_FLEET_UPDATED)
+
+
+@callback
+def async_get_fleet(hass: HomeAssistant) -> FleetAggregator:
+    """Return the fleet aggregator, creating it on first use."""
+    if DATA_FLEET not in hass.data:
+        hass.data[DATA_FLEET] = FleetAggregator(hass)
+    return hass.data[DATA_FLEET]
@@ -0,0 +1,545 @@
+"""Config entry hub for Tuya IoT Power Stations."""
+import asyncio
+import logging
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.dispatcher import (
+    async_dispatcher_connect,
+    async_dispatcher_send,
+)
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .api import TwoEPowerStationAPI
+from .const import (
+    CONF_HUB,
+    CONF_EXPORT,
+    CONF_EXPORT_FORMAT,
+    CONF_METRICS,
+    CONF_MQTT_BRIDGE,
+    CONF_SCAN_INTERVAL,
+    DEFAULT_EXPORT,
+    DEFAULT_EXPORT_FORMAT,
+    DEFAULT_METRICS,
+    DEFAULT_MQTT_BRIDGE,
+    DOMAIN,
+    HUB_BATCH_SIZE,
+    HUB_DISCOVERY_INTERVAL,
+    PLATFORM_DP_CODES,
+    PLATFORMS,
+    RELOAD_OPTIONS,
+    SIGNAL_STATION_ADDED,
+    UPDATE_INTERVAL,
+)
+from .coordinator import TwoEPowerStationCoordinator
+from .fleet import async_get_fleet
+from .burst import BurstController
+from .export import DailyExporter
+from .mqtt_bridge import MqttBridge
+from .scheduler import (
+    PhasedRefreshMixin,
+    Priority,
+    async_get_phase_planner,
+    async_get_scheduler,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# A device of the project is a power station if it reports these
+STATION_DP_CODE = "battery_percentage"
+STATION_POWER_DP_CODES = ("total_input_power", "total_output_power")
+
+
+def is_power_station(status: dict[str, Any]) -> bool:
+    """Return whether a device status looks like a power station."""
+    return STATION_DP_CODE in status and any(
+        code in status for code in STATION_POWER_DP_CODES
+    )
+
+
+def platforms_for(codes: Iterable[str]) -> list[str]:
+    """Return the platforms that have entities for these data points."""
+    codes = set(codes)
+    return [
+        platform
+        for platform in PLATFORMS
+        if platform not in PLATFORM_DP_CODES
+        or not PLATFORM_DP_CODES[platform].isdisjoint(codes)
+    ]
+
+
+class PowerStationHub:
+    """Stations of one config entry.
+
+    A device entry holds a single station that polls itself. A project entry
+    (created without a device ID) holds every power station of the Tuya
+    project: one API client and one token for all of them, one batched
+    status request per HUB_BATCH_SIZE stations per interval. Stations that
+    appear in the project later are added while running, and stations that
+    leave it are removed with their devices.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, api: TwoEPowerStationAPI
+    ) -> None:
+        """Initialize hub.
+
+        Args:
+            hass: Home Assistant instance
+            entry: Config entry of the hub
+            api: API client of the entry, shared by all its stations
+        """
+        self.hass = hass
+        self.entry = entry
+        self.api = api
+        self.stations: dict[str, TwoEPowerStationCoordinator] = {}
+        self.coordinator: ProjectCoordinator | None = None
+
+        # Configuration the stations run with, to tell what an update changed
+        self._data = dict(entry.data)
+        self._options = dict(entry.options)
+
+        # MQTT bridges by device ID, while the option is enabled
+        self.bridges: dict[str, MqttBridge] = {}
+
+        # Daily file exporters by device ID, while the option is enabled
+        self.exporters: dict[str, DailyExporter] = {}
+
+        # Temporary high-rate polling within a daily request budget
+        self.burst = BurstController(hass, entry)
+
+        # Platforms set up for the entry, only those the stations need
+        self.platforms: list[str] = []
+        self._unsub_listeners: list[CALLBACK_TYPE] = []
+
+        # Devices of the project that are not power stations
+        self._ignored: set[str] = set()
+        self._discovery_lock = asyncio.Lock()
+        self._unsub_discovery: CALLBACK_TYPE | None = None
+
+    @property
+    def is_project(self) -> bool:
+        """Whether this entry holds all stations of a Tuya project."""
+        return bool(self.entry.data.get(CONF_HUB))
+
+    @property
+    def update_interval(self) -> int:
+        """Poll interval in seconds."""
+        return self.entry.options.get(CONF_SCAN_INTERVAL, UPDATE_INTERVAL)
+
+    async def async_setup(self) -> None:
+        """Create the stations and fetch their first data.
+
+        Raises:
+            ConfigEntryNotReady: If the first poll fails
+        """
+        await self.burst.async_load()
+
+        if not self.is_project:
+            station = TwoEPowerStationCoordinator(
+                self.hass, self.entry, self.api, self.update_interval
+            )
+            self.stations[self.api.device_id] = station
+            self._async_watch_platforms(station)
+            await station.async_load()
+            await station.async_config_entry_first_refresh()
+            self._async_update_features()
+            return
+
+        self.coordinator = ProjectCoordinator(self.hass, self, self.update_interval)
+        await self.async_discover_stations()
+        if not self.stations:
+            _LOGGER.warning(
+                "No power stations found in Tuya project %s yet", self.entry.title
+            )
+        await self.coordinator.async_config_entry_first_refresh()
+
+        self._unsub_discovery = async_track_time_interval(
+            self.hass, self._async_discovery_interval, HUB_DISCOVERY_INTERVAL
+        )
+        self._async_update_features()
+
+    @callback
+    def _async_update_features(self) -> None:
+        """Start or stop the features the entry options enable."""
+        if self.entry.options.get(CONF_METRICS, DEFAULT_METRICS):
+            # Imported lazily, it loads the optional http after-dependency
+            from .metrics import async_setup_metrics
+
+            async_setup_metrics(self.hass)
+
+        if not self.entry.options.get(CONF_MQTT_BRIDGE, DEFAULT_MQTT_BRIDGE):
+            self._async_stop_bridges()
+        else:
+            for device_id, station in self.stations.items():
+                if device_id not in self.bridges:
+                    bridge = self.bridges[device_id] = MqttBridge(self.hass, station)
+                    self.entry.async_create_background_task(
+                        self.hass, bridge.async_start(), f"{DOMAIN} mqtt {device_id}"
+                    )
+
+        export_format = self.entry.options.get(CONF_EXPORT_FORMAT, DEFAULT_EXPORT_FORMAT)
+        if not self.entry.options.get(CONF_EXPORT, DEFAULT_EXPORT):
+            self._async_stop_exporters()
+            return
+        for device_id, station in self.stations.items():
+            exporter = self.exporters.get(device_id)
+            if exporter is not None and exporter.export_format != export_format:
+                # Finish today's file in the old format
+                exporter.async_stop()
+                exporter = None
+            if exporter is None:
+                exporter = self.exporters[device_id] = DailyExporter(
+                    self.hass, station, export_format
+                )
+                exporter.async_start()
+
+    @callback
+    def _async_stop_bridges(self) -> None:
+        """Stop all MQTT bridges of the entry."""
+        for bridge in self.bridges.values():
+            bridge.async_stop()
+        self.bridges.clear()
+
+    @callback
+    def _async_stop_exporters(self) -> None:
+        """Write out and close the files of all exporters of the entry."""
+        for exporter in self.exporters.values():
+            exporter.async_stop()
+        self.exporters.clear()
+
+    @property
+    def required_platforms(self) -> list[str]:
+        """Platforms needed by the data points of all stations.
+
+        A project entry sets up every platform, stations discovered later
+        get their entities without a reload.
+        """
+        if self.is_project:
+            return list(PLATFORMS)
+        codes: set[str] = set()
+        for station in self.stations.values():
+            if station.data:
+                codes.update(station.data)
+        return platforms_for(codes)
+
+    @callback
+    def _async_watch_platforms(self, station: TwoEPowerStationCoordinator) -> None:
+        """Set up the platforms a station reports data points for later.
+
+        The missing platforms are added to the running entry, and new data
+        points of platforms that are set up get their entities, see
+        entity.async_add_station_entities. Neither reloads the entry.
+        """
+        known_codes: set[str] = set()
+
+        @callback
+        def async_check() -> None:
+            data = station.data
+            if not self.platforms or data is None:
+                return
+            if known_codes and data.changed <= known_codes:
+                return
+
+            known_codes.update(data)
+            missing = [
+                platform for platform in platforms_for(data) if platform not in self.platforms
+            ]
+            if missing:
+                # Listed right away, so other stations do not set them up again
+                self.platforms.extend(missing)
+                _LOGGER.info(
+                    "%s reports data points for %s, setting up the platforms",
+                    station.station_name, missing,
+                )
+                self.hass.async_create_task(
+                    self.hass.config_entries.async_forward_entry_setups(self.entry, missing)
+                )
+
+        self._unsub_listeners.append(station.async_add_listener(async_check))
+        async_check()
+
+    @callback
+    def async_unload(self) -> None:
+        """Stop polling and release the resources of all stations."""
+        for unsub in self._unsub_listeners:
+            unsub()
+        self._unsub_listeners.clear()
+        self._async_stop_bridges()
+        self._async_stop_exporters()
+        self.burst.async_stop()
+        if self._unsub_discovery:
+            self._unsub_discovery()
+            self._unsub_discovery = None
+        if self.coordinator:
+            self.coordinator.async_unload()
+        for station in self.stations.values():
+            station.async_unload()
+        async_get_fleet(self.hass).async_release(self.entry.entry_id)
+
+    async def async_apply_options(self) -> bool:
+        """Apply updated options to the running stations.
+
+        Returns:
+            False if credentials, the endpoint or an option in RELOAD_OPTIONS
+            changed and the entry has to be reloaded
+        """
+        options = self.entry.options
+        changed = {
+            key
+            for key in self._options.keys() | options.keys()
+            if self._options.get(key) != options.get(key)
+        }
+        if self.entry.data != self._data or not changed.isdisjoint(RELOAD_OPTIONS):
+            return False
+
+        self._options = dict(options)
+        if not changed:
+            return True
+
+        self._async_update_features()
+        for station in self.stations.values():
+            await station.async_apply_options(options)
+        if self.coordinator:
+            self.coordinator.async_set_update_interval(self.update_interval)
+
+        _LOGGER.info(
+            "Applied options %s to %s without reload", sorted(changed), self.entry.title
+        )
+        return True
+
+    async def _async_discovery_interval(self, now: datetime) -> None:
+        """Look for new stations in the project."""
+        try:
+            await self.async_discover_stations()
+        except Exception as err:
+            _LOGGER.error("Error discovering stations of %s: %s", self.entry.title, err)
+
+    async def async_discover_stations(self) -> None:
+        """Add the power stations of the project that are not known yet.
+
+        Stations no longer in the project are removed. Devices configured
+        in their own device entries are left to them.
+        """
+        async with self._discovery_lock:
+            scheduler = async_get_scheduler(self.hass)
+            devices = await scheduler.async_run(
+                Priority.BACKGROUND, self.api.get_all_devices
+            )
+            # The device list is also empty when the request failed
+            if devices:
+                present = {device.get("id") for device in devices}
+                for device_id in [
+                    device_id for device_id in self.stations if device_id not in present
+                ]:
+                    self._async_remove_station(device_id)
+
+            configured = {
+                entry.data.get("device_id")
+                for entry in self.hass.config_entries.async_entries(DOMAIN)
+            }
+            candidates = {
+                device["id"]: device
+                for device in devices
+                if device.get("id")
+                and device["id"] not in self.stations
+                and device["id"] not in self._ignored
+                and device["id"] not in configured
+            }
+            if not candidates:
+                return
+
+            device_ids = list(candidates)
+            for index in range(0, len(device_ids), HUB_BATCH_SIZE):
+                chunk = device_ids[index:index + HUB_BATCH_SIZE]
+                statuses = await scheduler.async_run(
+                    Priority.BACKGROUND, self.api.get_devices_status, chunk
+                )
+                for device_id in chunk:
+                    status = statuses.get(device_id)
+                    if not status:
+                        # Offline or no answer, try again at the next discovery
+                        continue
+                    if not is_power_station(status):
+                        self._ignored.add(device_id)
+                        continue
+                    await self._async_add_station(candidates[device_id], status)
+
+    async def _async_add_station(
+        self, device: dict[str, Any], status: dict[str, Any]
+    ) -> None:
+        """Create the coordinator of a discovered station and announce it."""
+        device_id = device["id"]
+        station = TwoEPowerStationCoordinator(
+            self.hass,
+            self.entry,
+            self.api.for_device(device_id),
+            self.update_interval,
+            polled=False,
+            unique_prefix=f"{self.entry.entry_id}_{device_id}",
+            station_name=device.get("name") or f"Power Station ({device_id[:8]})",
+        )
+        await station.async_load()
+        # Platforms pick the entities from the first snapshot
+        station.async_handle_status(status)
+        self.stations[device_id] = station
+        self._async_watch_platforms(station)
+        self._async_update_features()
+
+        _LOGGER.info("Added power station %s (%s)", station.station_name, device_id)
+        async_dispatcher_send(
+            self.hass, SIGNAL_STATION_ADDED.format(self.entry.entry_id), station
+        )
+
+    @callback
+    def _async_remove_station(self, device_id: str) -> None:
+        """Stop a station that left the project and remove its device."""
+        station = self.stations.pop(device_id)
+        if bridge := self.bridges.pop(device_id, None):
+            bridge.async_stop()
+        if exporter := self.exporters.pop(device_id, None):
+            exporter.async_stop()
+        self.burst.async_cancel(device_id)
+        station.async_unload()
+
+        # Removing the device removes its entities
+        device_registry = dr.async_get(self.hass)
+        if device := device_registry.async_get_device(
+            identifiers={(DOMAIN, station.unique_prefix)}
+        ):
+            device_registry.async_update_device(
+                device.id, remove_config_entry_id=self.entry.entry_id
+            )
+        _LOGGER.info(
+            "Removed power station %s (%s), it left the project",
+            station.station_name, device_id,
+        )
+
+
+class ProjectCoordinator(PhasedRefreshMixin, DataUpdateCoordinator[dict[str, dict[str, Any]]]):
+    """Poll all stations of a project in batches and feed their coordinators."""
+
+    def __init__(
+        self, hass: HomeAssistant, hub: PowerStationHub, update_interval: int
+    ) -> None:
+        """Initialize coordinator.
+
+        Args:
+            hass: Home Assistant instance
+            hub: Hub of the project entry
+            update_interval: Update interval in seconds
+        """
+        self.hub = hub
+        self.scheduler = async_get_scheduler(hass)
+
+        # The project polls at its own phase, like a single station
+        self.phases = async_get_phase_planner(hass)
+        self.phase_key = hub.entry.entry_id
+        self._unregister_phase = self.phases.async_register(self.phase_key)
+
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN} project",
+            update_interval=timedelta(seconds=update_interval),
+        )
+
+        # Only keeps the poll scheduled, the stations are fed by every poll
+        # in _async_update_data: listeners are skipped after repeated failures
+        self._unsub_stations = self.async_add_listener(lambda: None)
+
+    @callback
+    def async_unload(self) -> None:
+        """Stop polling."""
+        self._unsub_stations()
+        self._unregister_phase()
+
+    @callback
+    def async_set_update_interval(self, update_interval: int) -> None:
+        """Change the poll interval of the running project.
+
+        Args:
+            update_interval: Update interval in seconds
+        """
+        interval = timedelta(seconds=update_interval)
+        if interval == self.update_interval:
+            return
+        self.update_interval = interval
+        if self._listeners:
+            self._schedule_refresh()
+
+    async def _async_update_data(self) -> dict[str, dict[str, Any]]:
+        """Fetch the status of all stations and hand it to them.
+
+        Stations are fed on failed polls too, so they count the errors and
+        their stale grace period runs out.
+
+        Returns:
+            Typed data point values by device ID
+
+        Raises:
+            UpdateFailed: If no station could be polled
+        """
+        device_ids = list(self.hub.stations)
+        chunks = [
+            device_ids[index:index + HUB_BATCH_SIZE]
+            for index in range(0, len(device_ids), HUB_BATCH_SIZE)
+        ]
+        results = await asyncio.gather(
+            *(
+                self.scheduler.async_run(
+                    Priority.POLL, self.hub.api.get_devices_status, chunk
+                )
+                for chunk in chunks
+            ),
+            return_exceptions=True,
+        )
+
+        statuses: dict[str, dict[str, Any]] = {}
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning("Batched status of %s failed: %s", chunk, result)
+                continue
+            statuses.update(result)
+
+        if device_ids and not statuses:
+            self._async_feed_stations(None)
+            raise UpdateFailed("No station of the project answered")
+        self._async_feed_stations(statuses)
+        return statuses
+
+    @callback
+    def _async_feed_stations(self, statuses: dict[str, dict[str, Any]] | None) -> None:
+        """Hand every station its status from a poll, None if it failed."""
+        for device_id, station in list(self.hub.stations.items()):
+            # The batch round trip is the latency of every station in it
+            station.api.latency = self.hub.api.latency
+            station.async_handle_status(statuses.get(device_id) if statuses else None)
+
+
+@callback
+def async_setup_stations(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    add_station: Callable[[TwoEPowerStationCoordinator], None],
+) -> None:
+    """Add the entities of every station of an entry, now and when discovered.
+
+    Args:
+        hass: Home Assistant instance
+        entry: Config entry being set up by a platform
+        add_station: Callback adding the platform entities of a station
+    """
+    hub: PowerStationHub = hass.data[DOMAIN][entry.entry_id]
+    for station in list(hub.stations.values()):
+        add_station(station)
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_STATION_ADDED.format(entry.entry_id), add_station
+        )
+    )
@@ -0,0 +1,274 @@
+"""Live high-rate data point stream over the websocket API."""
+import asyncio
+import itertools
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import (
+    DOMAIN,
+    LIVE_DEFAULT_INTERVAL,
+    LIVE_MAX_INTERVAL,
+    LIVE_MIN_INTERVAL,
+    SLOW_DP_CODES,
+    WS_LIVE_SUBSCRIBE,
+)
+from .scheduler import Priority
+
+if TYPE_CHECKING:
+    from .coordinator import TwoEPowerStationCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Receives the Unix time and values of one sample
+SampleCallback = Callable[[float, dict[str, Any]], None]
+# Receives why the sampler ended the subscription
+CloseCallback = Callable[[str], None]
+
+
+@dataclass(slots=True)
+class _Subscriber:
+    """A consumer of live samples."""
+
+    send: SampleCallback
+    close: CloseCallback
+    codes: frozenset[str] | None  # None = all telemetry data points
+    interval: float
+
+
+class LiveSampler:
+    """Sample a station's telemetry at a high rate while someone watches.
+
+    Samples only go to the subscribers, never into the coordinator, so
+    entities, the recorder and the rules keep their regular poll rate.
+    The sampler runs while at least one subscriber is connected, at the
+    shortest interval any of them asked for, and yields to regular polls
+    and commands in the request scheduler. Every request counts against
+    the daily burst request budget of the entry; the subscriptions are
+    closed when it is spent or the station unloads.
+    """
+
+    def __init__(self, station: "TwoEPowerStationCoordinator") -> None:
+        """Initialize sampler.
+
+        Args:
+            station: Coordinator of the station to sample
+        """
+        self.station = station
+        self._subscribers: dict[int, _Subscriber] = {}
+        self._ids = itertools.count()
+        self._task: asyncio.Task | None = None
+
+    @callback
+    def async_subscribe(
+        self,
+        send: SampleCallback,
+        close: CloseCallback,
+        codes: frozenset[str] | None = None,
+        interval: float = LIVE_DEFAULT_INTERVAL,
+    ) -> CALLBACK_TYPE:
+        """Start streaming samples to a subscriber.
+
+        Args:
+            send: Called with every sample
+            close: Called with the reason when the sampler ends the subscription
+            codes: Data points to stream (defaults to all telemetry)
+            interval: Seconds between samples the subscriber wants
+
+        Returns:
+            Callback that ends the subscription
+        """
+        subscriber_id = next(self._ids)
+        self._subscribers[subscriber_id] = _Subscriber(send, close, codes, interval)
+
+        # Start with the values the coordinator already has
+        if self.station.data:
+            send(self.station.data.fetched_at, self._select(self.station.data, codes))
+
+        if self._task is None:
+            _LOGGER.debug("Starting live sampling of %s", self.station.station_name)
+            self._task = self.station.entry.async_create_background_task(
+                self.station.hass,
+                self._async_run(),
+                f"{DOMAIN} live {self.station.api.device_id}",
+            )
+
+        @callback
+        def unsubscribe() -> None:
+            self._subscribers.pop(subscriber_id, None)
+            if not self._subscribers:
+                self.async_stop()
+
+        return unsubscribe
+
+    @callback
+    def async_stop(self, reason: str = "Power station was unloaded") -> None:
+        """Stop sampling and close the remaining subscriptions."""
+        subscribers = list(self._subscribers.values())
+        self._subscribers.clear()
+        if self._task is not None:
+            _LOGGER.debug("Stopping live sampling of %s", self.station.station_name)
+            self._task.cancel()
+            self._task = None
+        for subscriber in subscribers:
+            subscriber.close(reason)
+
+    def _codes(self) -> list[str]:
+        """Return the data points any subscriber wants."""
+        telemetry = [
+            code for code in self.station.data or () if code not in SLOW_DP_CODES
+        ]
+        codes: set[str] = set()
+        for subscriber in self._subscribers.values():
+            codes.update(telemetry if subscriber.codes is None else subscriber.codes)
+        return sorted(codes)
+
+    @staticmethod
+    def _select(values: Any, codes: frozenset[str] | None) -> dict[str, Any]:
+        """Return the values a subscriber asked for."""
+        if codes is None:
+            return {code: value for code, value in values.items() if code not in SLOW_DP_CODES}
+        return {code: value for code, value in values.items() if code in codes}
+
+    async def _async_run(self) -> None:
+        """Sample at the shortest requested interval until nobody listens."""
+        while self._subscribers:
+            started = time.monotonic()
+            if not self._async_use_request():
+                _LOGGER.warning(
+                    "Daily request budget spent, ending live stream of %s",
+                    self.station.station_name,
+                )
+                # Ending normally, the task must not cancel itself
+                self._task = None
+                self.async_stop("Daily request budget spent")
+                return
+            try:
+                await self._async_sample()
+            except Exception as err:
+                _LOGGER.debug("Live sample of %s failed: %s", self.station.station_name, err)
+
+            interval = min(
+                (subscriber.interval for subscriber in self._subscribers.values()),
+                default=LIVE_DEFAULT_INTERVAL,
+            )
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    @callback
+    def _async_use_request(self) -> bool:
+        """Count a request against the entry's daily budget."""
+        hub = self.station.hass.data.get(DOMAIN, {}).get(self.station.entry.entry_id)
+        return hub is not None and hub.burst.async_use_request()
+
+    async def _async_sample(self) -> None:
+        """Fetch the subscribed data points and hand them out."""
+        codes = self._codes()
+        if not codes:
+            return
+
+        station = self.station
+        values = await station.scheduler.async_run(
+            Priority.LIVE, station.api.get_device_properties, codes
+        )
+        if values is None:
+            # Shadow API not available for this project
+            values = await station.scheduler.async_run(
+                Priority.LIVE, station.api.get_device_status
+            )
+        if not values:
+            return
+
+        now = time.time()
+        for subscriber in list(self._subscribers.values()):
+            if sample := self._select(values, subscriber.codes):
+                subscriber.send(now, sample)
+
+
+def _find_stations(
+    hass: HomeAssistant, device_ids: list[str]
+) -> dict[str, "TwoEPowerStationCoordinator"]:
+    """Return the loaded stations by device ID, all of them if none are given."""
+    stations = {
+        device_id: station
+        for hub in hass.data.get(DOMAIN, {}).values()
+        for device_id, station in hub.stations.items()
+    }
+    if not device_ids:
+        return stations
+    return {device_id: stations[device_id] for device_id in device_ids if device_id in stations}
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): WS_LIVE_SUBSCRIBE,
+    vol.Optional("device_ids", default=[]): [str],
+    vol.Optional("codes"): [str],
+    vol.Optional("interval", default=LIVE_DEFAULT_INTERVAL): vol.All(
+        vol.Coerce(float), vol.Range(min=LIVE_MIN_INTERVAL, max=LIVE_MAX_INTERVAL)
+    ),
+})
+@callback
+def ws_subscribe_live(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Stream raw data point samples of stations to a websocket client.
+
+    Events are `{"device_id", "time", "values"}` with the values of the
+    requested data points, or of all telemetry data points. The
+    subscription ends with an error when a station stops sampling.
+    """
+    stations = _find_stations(hass, msg["device_ids"])
+    missing = set(msg["device_ids"]) - stations.keys()
+    if missing or not stations:
+        connection.send_error(
+            msg["id"],
+            websocket_api.ERR_NOT_FOUND,
+            f"Power stations not found: {', '.join(sorted(missing))}"
+            if missing else "No power stations are set up",
+        )
+        return
+
+    codes = frozenset(msg["codes"]) if "codes" in msg else None
+    unsubs: list[CALLBACK_TYPE] = []
+
+    def forward(device_id: str) -> SampleCallback:
+        @callback
+        def send(sampled_at: float, values: dict[str, Any]) -> None:
+            connection.send_message(websocket_api.event_message(
+                msg["id"], {"device_id": device_id, "time": sampled_at, "values": values}
+            ))
+
+        return send
+
+    @callback
+    def unsubscribe() -> None:
+        for unsub in unsubs:
+            unsub()
+        unsubs.clear()
+
+    @callback
+    def close(reason: str) -> None:
+        """End the whole subscription when one of its stations stops."""
+        if connection.subscriptions.pop(msg["id"], None) is None:
+            return
+        unsubscribe()
+        connection.send_error(msg["id"], websocket_api.ERR_HOME_ASSISTANT_ERROR, reason)
+
+    connection.subscriptions[msg["id"]] = unsubscribe
+    connection.send_result(msg["id"])
+    for device_id, station in stations.items():
+        unsubs.append(
+            station.live.async_subscribe(forward(device_id), close, codes, msg["interval"])
+        )
+
+
+@callback
+def async_setup_live(hass: HomeAssistant) -> None:
+    """Register the live stream websocket command."""
+    websocket_api.async_register_command(hass, ws_subscribe_live)
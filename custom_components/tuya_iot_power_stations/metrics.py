@@ -0,0 +1,193 @@
+"""OpenMetrics exporter for Tuya IoT Power Stations."""
+import logging
+from collections.abc import Callable, Iterator
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant, callback
+
+from .const import CONF_METRICS, DATA_METRICS, DEFAULT_METRICS, DOMAIN, METRICS_URL
+
+if TYPE_CHECKING:
+    from .coordinator import TwoEPowerStationCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PREFIX = "tuya_power_station_"
+
+# Port power data points end with this, except the totals
+PORT_POWER_SUFFIX = "_output_power"
+TOTAL_OUTPUT_POWER = "total_output_power"
+
+Getter = Callable[["TwoEPowerStationCoordinator"], Any]
+
+
+def _data(station: "TwoEPowerStationCoordinator", attribute: str) -> Any:
+    """Return a snapshot attribute, None before the first successful poll."""
+    return getattr(station.data, attribute) if station.data else None
+
+
+def _data_point(station: "TwoEPowerStationCoordinator", code: str) -> Any:
+    """Return a data point value, None if not reported."""
+    return station.data.get(code) if station.data else None
+
+
+# (name, type, help, value getter) of the per-station metric families
+METRIC_FAMILIES: tuple[tuple[str, str, str, Getter], ...] = (
+    ("up", "gauge", "Whether the last poll of the station succeeded",
+     lambda station: int(station.last_update_success)),
+    ("battery_percent", "gauge", "Battery level",
+     lambda station: _data(station, "soc")),
+    ("input_power_watts", "gauge", "Total input power",
+     lambda station: _data(station, "input_power")),
+    ("output_power_watts", "gauge", "Total output power",
+     lambda station: _data(station, "output_power")),
+    ("battery_power_watts", "gauge", "Battery power, positive while discharging",
+     lambda station: _data(station, "battery_power")),
+    ("temperature_celsius", "gauge", "Station temperature",
+     lambda station: _data_point(station, "temp_current")),
+    ("charge_energy_kwh", "counter", "Energy charged into the battery",
+     lambda station: _data(station, "charge_energy")),
+    ("discharge_energy_kwh", "counter", "Energy discharged from the battery",
+     lambda station: _data(station, "discharge_energy")),
+    ("api_latency_seconds", "gauge", "Smoothed round-trip time of Tuya Cloud requests",
+     lambda station: station.latency_ms / 1000 if station.latency_ms is not None else None),
+    ("poll_errors", "counter", "Failed polls since the integration started",
+     lambda station: station.poll_errors),
+    ("command_queue_depth", "gauge", "Commands waiting for delivery",
+     lambda station: station.commands.depth),
+)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _is_number(value: Any) -> bool:
+    """Return whether a value can be exported as a sample."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class MetricsExporter:
+    """Render the current state of all exported stations in OpenMetrics format.
+
+    The body is rendered from coordinator memory and cached. It is only
+    rebuilt when a snapshot version, availability or a diagnostic value of
+    an exported station changed since the last scrape, so frequent scrapes
+    cost one tuple comparison.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize exporter."""
+        self.hass = hass
+        self._key: tuple[Any, ...] | None = None
+        self._body = b""
+
+    def _stations(self) -> list["TwoEPowerStationCoordinator"]:
+        """Return the stations of all entries that enable the exporter."""
+        return [
+            station
+            for hub in self.hass.data.get(DOMAIN, {}).values()
+            if hub.entry.options.get(CONF_METRICS, DEFAULT_METRICS)
+            for station in hub.stations.values()
+        ]
+
+    @callback
+    def async_render(self) -> bytes | None:
+        """Return the metrics body, None if no entry enables the exporter."""
+        stations = self._stations()
+        if not stations:
+            return None
+
+        key = tuple(
+            (
+                station.unique_prefix,
+                station.data.version if station.data else 0,
+                station.last_update_success,
+                station.latency_ms,
+                station.poll_errors,
+                station.commands.depth,
+            )
+            for station in stations
+        )
+        if key != self._key:
+            self._body = "".join(self._lines(stations)).encode()
+            self._key = key
+        return self._body
+
+    def _lines(self, stations: list["TwoEPowerStationCoordinator"]) -> Iterator[str]:
+        """Render all metric families, samples of a family kept together."""
+        labels = {
+            station.unique_prefix: (
+                f'station="{_escape(station.station_name)}",'
+                f'device_id="{_escape(station.api.device_id)}"'
+            )
+            for station in stations
+        }
+
+        for name, metric_type, help_text, getter in METRIC_FAMILIES:
+            family = PREFIX + name
+            suffix = "_total" if metric_type == "counter" else ""
+            yield f"# TYPE {family} {metric_type}\n# HELP {family} {help_text}.\n"
+            for station in stations:
+                value = getter(station)
+                if _is_number(value):
+                    yield f"{family}{suffix}{{{labels[station.unique_prefix]}}} {value}\n"
+
+        family = PREFIX + "port_power_watts"
+        yield f"# TYPE {family} gauge\n# HELP {family} Output power per port.\n"
+        for station in stations:
+            if not station.data:
+                continue
+            for code, value in station.data.items():
+                if (
+                    code.endswith(PORT_POWER_SUFFIX)
+                    and code != TOTAL_OUTPUT_POWER
+                    and _is_number(value)
+                ):
+                    port = code[:-len(PORT_POWER_SUFFIX)]
+                    yield (
+                        f'{family}{{{labels[station.unique_prefix]},port="{port}"}} {value}\n'
+                    )
+
+        yield "# EOF\n"
+
+
+class MetricsView(HomeAssistantView):
+    """Serve station metrics for Prometheus and other OpenMetrics scrapers."""
+
+    url = METRICS_URL
+    name = f"api:{DOMAIN}:metrics"
+
+    def __init__(self, exporter: MetricsExporter) -> None:
+        """Initialize view."""
+        self.exporter = exporter
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Return the cached metrics body."""
+        body = self.exporter.async_render()
+        if body is None:
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+        return web.Response(body=body, headers={"Content-Type": CONTENT_TYPE})
+
+
+@callback
+def async_setup_metrics(hass: HomeAssistant) -> None:
+    """Register the metrics view once, when the first entry enables it."""
+    if DATA_METRICS in hass.data:
+        return
+    if "http" not in hass.config.components:
+        _LOGGER.warning(
+            "Station metrics are not served: the http integration is not set up"
+        )
+        return
+
+    exporter = MetricsExporter(hass)
+    hass.data[DATA_METRICS] = exporter
+    hass.http.register_view(MetricsView(exporter))
+    _LOGGER.info("Serving station metrics at %s", METRICS_URL)
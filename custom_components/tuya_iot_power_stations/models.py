@@ -0,0 +1,100 @@
+"""Data models for Tuya IoT Power Stations."""
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+
+
+def _energy_kwh(value: Any) -> float | None:
+    """Convert an energy counter to kWh (some stations report Wh)."""
+    if not isinstance(value, float):
+        return None
+    return value / 1000.0 if value > 100 else value
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class StationSnapshot(Mapping[str, Any]):
+    """Immutable, decoded status of a station at one point in time.
+
+    Values arrive already typed from the decoding layer and derived
+    quantities are computed once per update, so entities only read
+    attributes. The version only increases when a value changed, and
+    `changed` lists the data points that differ from the previous snapshot,
+    so entities can skip unchanged state.
+    """
+
+    version: int
+    data_points: Mapping[str, Any]
+    changed: frozenset[str]
+    fetched_at: float
+    soc: int | None
+    input_power: float
+    output_power: float
+    battery_power: float  # Positive = discharge, negative = charge
+    charge_energy: float | None  # kWh
+    discharge_energy: float | None  # kWh
+
+    @classmethod
+    def build(
+        cls,
+        status: Mapping[str, Any],
+        previous: "StationSnapshot | None",
+        fetched_at: float,
+    ) -> "StationSnapshot":
+        """Compare a decoded status with the previous snapshot.
+
+        Args:
+            status: Typed data point values (see decode.decode_status)
+            previous: Previous snapshot, None on the first poll
+            fetched_at: Unix time of the poll
+
+        Returns:
+            The previous snapshot if nothing changed, otherwise a new one
+        """
+        values = dict(status)
+
+        if previous is None:
+            changed = frozenset(values)
+            version = 1
+        else:
+            old = previous.data_points
+            changed = frozenset(
+                code for code, value in values.items()
+                if code not in old or old[code] != value
+            ) | (old.keys() - values.keys())
+            if not changed:
+                return previous
+            version = previous.version + 1
+
+        input_power = values.get("total_input_power", 0.0)
+        output_power = values.get("total_output_power", 0.0)
+        if not isinstance(input_power, float):
+            input_power = 0.0
+        if not isinstance(output_power, float):
+            output_power = 0.0
+        soc = values.get("battery_percentage")
+
+        return cls(
+            version=version,
+            data_points=MappingProxyType(values),
+            changed=changed,
+            fetched_at=fetched_at,
+            soc=soc if isinstance(soc, int) else None,
+            input_power=input_power,
+            output_power=output_power,
+            battery_power=output_power - input_power,
+            charge_energy=_energy_kwh(values.get("charge_energy")),
+            discharge_energy=_energy_kwh(values.get("discharge_energy")),
+        )
+
+    def __getitem__(self, code: str) -> Any:
+        """Return a decoded data point value."""
+        return self.data_points[code]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over data point codes."""
+        return iter(self.data_points)
+
+    def __len__(self) -> int:
+        """Return the number of data points."""
+        return len(self.data_points)
@@ -0,0 +1,162 @@
+"""Local MQTT bridge for Tuya IoT Power Stations."""
+import json
+import logging
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DOMAIN, MQTT_BASE_TOPIC, MQTT_COMMAND_DP_CODES
+
+if TYPE_CHECKING:
+    from .coordinator import TwoEPowerStationCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+PAYLOAD_ONLINE = "online"
+PAYLOAD_OFFLINE = "offline"
+
+
+def encode_value(value: Any) -> str:
+    """Encode a data point value as an MQTT payload.
+
+    Strings are sent as they are, everything else as JSON (true, 42, 1.5).
+    """
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def decode_value(payload: str) -> Any:
+    """Decode a command payload, plain strings are taken as they are."""
+    try:
+        return json.loads(payload)
+    except ValueError:
+        return payload
+
+
+class MqttBridge:
+    """Publish a station's data points to the MQTT broker of Home Assistant.
+
+    Every data point has a retained topic `<base>/<device id>/<code>` and
+    the station has a retained `<base>/<device id>/availability` topic.
+    Each coordinator update only publishes the data points that changed,
+    and clears the topics of data points the station no longer reports.
+    The station goes offline when the bridge stops.
+    Writes to `<base>/<device id>/<code>/set` are sent to the station
+    through the command queue, for switch and select data points only.
+    Other consumers on the site read the broker instead of Tuya Cloud.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, station: "TwoEPowerStationCoordinator"
+    ) -> None:
+        """Initialize bridge.
+
+        Args:
+            hass: Home Assistant instance
+            station: Coordinator of the station to bridge
+        """
+        self.hass = hass
+        self.station = station
+        self.topic = f"{MQTT_BASE_TOPIC}/{station.api.device_id}"
+        self._version: int | None = None
+        self._available: bool | None = None
+        self._codes: set[str] = set()
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self._stopped = False
+
+    async def async_start(self) -> None:
+        """Subscribe to command topics and publish the full state."""
+        # Imported lazily, MQTT is an optional after-dependency
+        from homeassistant.components import mqtt
+
+        if not await mqtt.async_wait_for_mqtt_client(self.hass):
+            _LOGGER.warning(
+                "MQTT bridge of %s not started: MQTT is not set up", self.station.station_name
+            )
+            return
+        if self._stopped:
+            return
+
+        self._unsubs.append(
+            await mqtt.async_subscribe(
+                self.hass, f"{self.topic}/+/set", self._async_handle_command
+            )
+        )
+        self._unsubs.append(self.station.async_add_listener(self._async_publish_update))
+        self._async_publish_update()
+        _LOGGER.info("Bridging %s to MQTT at %s", self.station.station_name, self.topic)
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop publishing, unsubscribe from command topics and go offline."""
+        self._stopped = True
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs.clear()
+        if self._available is not None:
+            self._available = None
+            # Not an entry task, those are cancelled when the entry unloads
+            self.hass.async_create_task(
+                self._async_publish([(f"{self.topic}/availability", PAYLOAD_OFFLINE)])
+            )
+
+    @callback
+    def _async_publish_update(self) -> None:
+        """Publish availability changes and the data points that changed."""
+        messages: list[tuple[str, str]] = []
+
+        available = self.station.last_update_success
+        if available != self._available:
+            self._available = available
+            messages.append((
+                f"{self.topic}/availability",
+                PAYLOAD_ONLINE if available else PAYLOAD_OFFLINE,
+            ))
+
+        data = self.station.data
+        if data is not None and data.version != self._version:
+            # Changed data points; everything on the first publish or after
+            # a missed snapshot
+            codes = (
+                data.changed
+                if self._version is not None and data.version == self._version + 1
+                else data.keys()
+            )
+            self._version = data.version
+            messages.extend(
+                (f"{self.topic}/{code}", encode_value(data[code]))
+                for code in codes
+                if code in data
+            )
+            # An empty retained message deletes the retained value
+            messages.extend((f"{self.topic}/{code}", "") for code in self._codes - data.keys())
+            self._codes = set(data)
+
+        if messages:
+            self.station.entry.async_create_background_task(
+                self.hass,
+                self._async_publish(messages),
+                f"{DOMAIN} mqtt {self.station.api.device_id}",
+            )
+
+    async def _async_publish(self, messages: list[tuple[str, str]]) -> None:
+        """Publish retained messages."""
+        from homeassistant.components import mqtt
+
+        for topic, payload in messages:
+            await mqtt.async_publish(self.hass, topic, payload, qos=0, retain=True)
+
+    @callback
+    def _async_handle_command(self, message: Any) -> None:
+        """Send a command received on a set topic to the station."""
+        code = message.topic[len(self.topic) + 1:-len("/set")]
+        if code not in MQTT_COMMAND_DP_CODES:
+            _LOGGER.warning("Ignoring MQTT command for unsupported data point %s", code)
+            return
+
+        value = decode_value(message.payload)
+        _LOGGER.debug("MQTT command for %s: %s = %s", self.station.station_name, code, value)
+        self.station.entry.async_create_background_task(
+            self.hass,
+            self.station.async_send_command(code, value),
+            f"{DOMAIN} mqtt command {code}",
+        )
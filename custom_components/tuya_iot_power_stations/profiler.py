@@ -0,0 +1,157 @@
+"""On-demand sampling profiler for Tuya IoT Power Stations."""
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any
+
+# Frames from these files belong to the integration
+PACKAGE_DIR = str(Path(__file__).resolve().parent)
+
+
+def _frame_name(code: CodeType) -> str:
+    """Return a short, stable name for a code object."""
+    path = Path(code.co_filename)
+    return f"{path.parent.name}/{path.stem}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """Sample the stacks of all threads from a background thread.
+
+    Nothing is instrumented: while no profile runs there is no thread and
+    no hook, so the integration runs at full speed. A stack is kept when any
+    of its frames is in this integration, which covers coordinator updates
+    and entity state writes on the event loop as well as Tuya requests in
+    executor threads. Stacks are written in the folded format used by
+    flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, loop_thread_id: int, interval: float) -> None:
+        """Initialize profiler.
+
+        Args:
+            loop_thread_id: Thread ID of the Home Assistant event loop
+            interval: Seconds between samples
+        """
+        self.loop_thread_id = loop_thread_id
+        self.interval = interval
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self.samples = 0
+        self.loop_samples = 0
+        self.loop_integration_samples = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._thread = threading.Thread(
+            target=self._run, name="tuya_iot_power_stations_profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread, blocking."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        """Take samples until stopped."""
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self._sample(own_id)
+
+    def _sample(self, own_id: int) -> None:
+        """Record the stacks of all threads that run integration code."""
+        self.samples += 1
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack, ours = self._walk(frame)
+            if thread_id == self.loop_thread_id:
+                self.loop_samples += 1
+                if ours:
+                    self.loop_integration_samples += 1
+            if ours:
+                thread = "event_loop" if thread_id == self.loop_thread_id else "executor"
+                self.stacks[(thread, *stack)] += 1
+
+    @staticmethod
+    def _walk(frame: FrameType | None) -> tuple[list[str], bool]:
+        """Return the stack from root to leaf and whether it runs our code."""
+        stack: list[str] = []
+        ours = False
+        while frame is not None:
+            code = frame.f_code
+            if not ours and code.co_filename.startswith(PACKAGE_DIR):
+                ours = True
+            stack.append(_frame_name(code))
+            frame = frame.f_back
+        stack.reverse()
+        return stack, ours
+
+    def write_folded(self, path: Path) -> None:
+        """Write the collected stacks in folded format."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{';'.join(stack)} {count}\n")
+
+    def summary(self, top: int) -> dict[str, Any]:
+        """Summarize the profile.
+
+        Args:
+            top: Number of functions to list
+
+        Returns:
+            Sample counts, the share of event loop time spent in this
+            integration and the top functions by own and total samples
+        """
+        own: Counter[str] = Counter()
+        total: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for name in set(stack[1:]):
+                total[name] += count
+
+        kept = sum(self.stacks.values()) or 1
+        prefix = f"{Path(PACKAGE_DIR).name}/"
+
+        def percent(count: int) -> float:
+            return round(100 * count / kept, 1)
+
+        return {
+            "samples": self.samples,
+            "integration_samples": sum(self.stacks.values()),
+            "event_loop_share": round(
+                100 * self.loop_integration_samples / self.loop_samples, 1
+            ) if self.loop_samples else 0.0,
+            "top_self": [
+                {"function": name, "percent": percent(count)}
+                for name, count in own.most_common(top)
+            ],
+            "top_total": [
+                {"function": name, "percent": percent(count)}
+                for name, count in total.most_common()
+                if name.startswith(prefix)
+            ][:top],
+        }
+
+
+def format_summary(summary: dict[str, Any]) -> str:
+    """Render a profile summary as text."""
+    lines = [
+        f"Samples: {summary['samples']} "
+        f"({summary['integration_samples']} stacks in this integration)",
+        f"Event loop time in this integration: {summary['event_loop_share']}%",
+        "",
+        "Top functions by own time:",
+        *(f"  {item['percent']:5.1f}%  {item['function']}" for item in summary["top_self"]),
+        "",
+        "Top integration functions by total time:",
+        *(f"  {item['percent']:5.1f}%  {item['function']}" for item in summary["top_total"]),
+    ]
+    return "\n".join(lines) + "\n"
+
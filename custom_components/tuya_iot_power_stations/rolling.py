@@ -0,0 +1,160 @@
+"""Incremental rolling statistics for Tuya IoT Power Stations."""
+import math
+from collections import deque
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from .const import ROLLING_COLLAPSE_RATIO, ROLLING_RESUM_INTERVAL
+
+
+class RollingWindow:
+    """Count, mean, standard deviation, min and max of a time window.
+
+    Mean and variance are kept with Welford's update, which samples enter
+    and leave again when they fall out of the window. Min and max come
+    from monotonic deques: a sample that can never become the extreme
+    again is dropped when it arrives. Each sample is added and evicted
+    once, so an update costs amortized O(1) however long the window is.
+    The running sums are recomputed from the samples once as many updates
+    as the window holds (at least ROLLING_RESUM_INTERVAL) have run, which
+    keeps floating point drift bounded and still costs amortized O(1).
+    They are also recomputed when evicting an outlier collapses the
+    variance, where the subtraction would cancel catastrophically and
+    leave a spike's trace in the standard deviation.
+    """
+
+    __slots__ = ("window", "_samples", "_lows", "_highs", "_mean", "_m2", "_updates")
+
+    def __init__(self, window: float) -> None:
+        """Initialize window.
+
+        Args:
+            window: Length of the window in seconds
+        """
+        self.window = window
+        self._samples: deque[tuple[float, float]] = deque()
+        # Increasing and decreasing values, the extreme is at the left end
+        self._lows: deque[tuple[float, float]] = deque()
+        self._highs: deque[tuple[float, float]] = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._updates = 0
+
+    @property
+    def count(self) -> int:
+        """Number of samples in the window."""
+        return len(self._samples)
+
+    @property
+    def mean(self) -> float | None:
+        """Mean of the window."""
+        return self._mean if self._samples else None
+
+    @property
+    def std(self) -> float | None:
+        """Sample standard deviation of the window, None below two samples."""
+        if len(self._samples) < 2:
+            return None
+        return math.sqrt(max(self._m2, 0.0) / (len(self._samples) - 1))
+
+    @property
+    def minimum(self) -> float | None:
+        """Smallest value in the window."""
+        return self._lows[0][1] if self._lows else None
+
+    @property
+    def maximum(self) -> float | None:
+        """Largest value in the window."""
+        return self._highs[0][1] if self._highs else None
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Add a sample and evict the ones that left the window.
+
+        Args:
+            timestamp: Sample time (Unix time in seconds)
+            value: Sample value
+        """
+        self.expire(timestamp)
+
+        sample = (timestamp, value)
+        self._samples.append(sample)
+        delta = value - self._mean
+        self._mean += delta / len(self._samples)
+        self._m2 += delta * (value - self._mean)
+
+        while self._lows and self._lows[-1][1] >= value:
+            self._lows.pop()
+        self._lows.append(sample)
+        while self._highs and self._highs[-1][1] <= value:
+            self._highs.pop()
+        self._highs.append(sample)
+
+        self._updates += 1
+        if self._updates >= max(ROLLING_RESUM_INTERVAL, len(self._samples)):
+            self._resum()
+
+    def expire(self, now: float) -> None:
+        """Evict the samples older than the window."""
+        cutoff = now - self.window
+        samples = self._samples
+        while samples and samples[0][0] <= cutoff:
+            sample = samples.popleft()
+            if self._lows[0] is sample:
+                self._lows.popleft()
+            if self._highs[0] is sample:
+                self._highs.popleft()
+
+            if not samples:
+                self._mean = self._m2 = 0.0
+                continue
+            value = sample[1]
+            m2 = self._m2
+            delta = value - self._mean
+            self._mean -= delta / len(samples)
+            self._m2 -= delta * (value - self._mean)
+            if self._m2 < m2 * ROLLING_COLLAPSE_RATIO:
+                self._resum()
+
+    def _resum(self) -> None:
+        """Recompute mean and squared deviations from the samples."""
+        self._updates = 0
+        count = len(self._samples)
+        self._mean = sum(value for _, value in self._samples) / count
+        self._m2 = sum((value - self._mean) ** 2 for _, value in self._samples)
+
+
+class RollingStats:
+    """Rolling windows of several data points of a station."""
+
+    def __init__(self, codes: Iterable[str], window: float) -> None:
+        """Initialize statistics.
+
+        Args:
+            codes: Data points to keep statistics of
+            window: Length of the window in seconds
+        """
+        self.windows = {code: RollingWindow(window) for code in codes}
+
+    def set_window(self, window: float) -> None:
+        """Change the window length, samples outside it go with the next one."""
+        for rolling in self.windows.values():
+            rolling.window = window
+
+    def expire(self, now: float) -> None:
+        """Evict the samples older than the window, after a failed poll."""
+        for rolling in self.windows.values():
+            rolling.expire(now)
+
+    def add_sample(self, timestamp: float, values: Mapping[str, Any]) -> None:
+        """Add the numeric values of a sample.
+
+        Args:
+            timestamp: Sample time (Unix time in seconds)
+            values: Data point values of the sample
+        """
+        for code, rolling in self.windows.items():
+            value = values.get(code)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                rolling.add(timestamp, float(value))
+            else:
+                rolling.expire(timestamp)
@@ -0,0 +1,148 @@
+"""Threshold rules evaluated on every sample for Tuya IoT Power Stations."""
+import logging
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from .const import (
+    CONF_RULE_HYSTERESIS,
+    CONF_RULE_SOC_LOW,
+    CONF_RULE_TEMP_HIGH,
+    CONF_RULE_USB_ON_INPUT,
+    DEFAULT_RULE_HYSTERESIS,
+    OUTPUT_SWITCH_CODES,
+    RULE_INPUT_PRESENT_POWER,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _turn_off(*codes: str) -> Callable[[Mapping[str, Any]], dict[str, Any]]:
+    """Build commands that switch off the given outputs if they are on."""
+    def build(status: Mapping[str, Any]) -> dict[str, Any]:
+        return {code: False for code in codes if status.get(code)}
+    return build
+
+
+def _turn_on(*codes: str) -> Callable[[Mapping[str, Any]], dict[str, Any]]:
+    """Build commands that switch on the given outputs if they are off."""
+    def build(status: Mapping[str, Any]) -> dict[str, Any]:
+        return {code: True for code in codes if code in status and not status[code]}
+    return build
+
+
+@dataclass
+class ThresholdRule:
+    """Fire once when a data point crosses a threshold.
+
+    The rule re-arms only after the value has moved back past the threshold
+    by the hysteresis, so a value hovering around the threshold does not
+    toggle outputs on every sample.
+    """
+
+    name: str
+    code: str
+    threshold: float
+    hysteresis: float
+    above: bool
+    commands: Callable[[Mapping[str, Any]], dict[str, Any]]
+    triggered: bool = False
+
+    def evaluate(self, status: Mapping[str, Any]) -> dict[str, Any] | None:
+        """Evaluate the rule against a sample.
+
+        Returns:
+            Commands to send if the rule has just fired, otherwise None
+        """
+        try:
+            value = float(status[self.code])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+        if self.above:
+            crossed = value > self.threshold
+            rearmed = value <= self.threshold - self.hysteresis
+        else:
+            crossed = value < self.threshold
+            rearmed = value >= self.threshold + self.hysteresis
+
+        if self.triggered:
+            if rearmed:
+                self.triggered = False
+            return None
+
+        if not crossed:
+            return None
+
+        self.triggered = True
+        return self.commands(status)
+
+
+class RuleEngine:
+    """Evaluate load shedding rules on coordinator updates."""
+
+    def __init__(self, rules: list[ThresholdRule]) -> None:
+        """Initialize rule engine."""
+        self.rules = rules
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> "RuleEngine":
+        """Build the rules enabled in the config entry options."""
+        hysteresis = options.get(CONF_RULE_HYSTERESIS, DEFAULT_RULE_HYSTERESIS)
+        rules = []
+
+        if soc_low := options.get(CONF_RULE_SOC_LOW):
+            rules.append(ThresholdRule(
+                name="low_battery",
+                code="battery_percentage",
+                threshold=soc_low,
+                hysteresis=hysteresis,
+                above=False,
+                commands=_turn_off(*OUTPUT_SWITCH_CODES),
+            ))
+
+        if temp_high := options.get(CONF_RULE_TEMP_HIGH):
+            rules.append(ThresholdRule(
+                name="high_temperature",
+                code="temp_current",
+                threshold=temp_high,
+                hysteresis=hysteresis,
+                above=True,
+                commands=_turn_off("switch_ac"),
+            ))
+
+        if options.get(CONF_RULE_USB_ON_INPUT):
+            rules.append(ThresholdRule(
+                name="input_present",
+                code="total_input_power",
+                threshold=RULE_INPUT_PRESENT_POWER,
+                hysteresis=RULE_INPUT_PRESENT_POWER,
+                above=True,
+                commands=_turn_on("switch_usb"),
+            ))
+
+        return cls(rules)
+
+    def restore_state(self, previous: "RuleEngine") -> None:
+        """Keep the fired state of rules that were enabled before.
+
+        A rule that already fired stays disarmed when its threshold is
+        changed, so tuning a rule does not send its commands again.
+        """
+        triggered = {rule.name for rule in previous.rules if rule.triggered}
+        for rule in self.rules:
+            rule.triggered = rule.name in triggered
+
+    def evaluate(self, status: Mapping[str, Any]) -> list[tuple[str, dict[str, Any]]]:
+        """Evaluate all rules against a sample.
+
+        Returns:
+            List of (rule name, commands) for rules that fired with work to do
+        """
+        actions = []
+        for rule in self.rules:
+            commands = rule.evaluate(status)
+            if commands:
+                _LOGGER.info("Rule %s fired, sending %s", rule.name, commands)
+                actions.append((rule.name, commands))
+        return actions
@@ -0,0 +1,263 @@
+"""Priority scheduler for Tuya Cloud requests."""
+import asyncio
+import bisect
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import Callable
+from datetime import timedelta
+from enum import IntEnum
+from functools import partial
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    DATA_PHASES,
+    DATA_SCHEDULER,
+    PHASE_MIN_DELAY,
+    SCHEDULER_BURST,
+    SCHEDULER_CONCURRENCY,
+    SCHEDULER_RATE,
+)
+
+if TYPE_CHECKING:
+    from .watchdog import LoopWatchdog
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class Priority(IntEnum):
+    """Request priorities, lower runs first."""
+
+    COMMAND = 0  # Interactive commands from entities, rules and services
+    VERIFY = 1  # Reads right after a command and config flow validation
+    POLL = 2  # Regular polling
+    LIVE = 3  # High-rate sampling for live stream subscribers and bursts
+    BACKGROUND = 4  # Discovery and backfill
+
+
+class RequestScheduler:
+    """Run blocking Tuya calls in the executor by priority within a rate budget.
+
+    The budget is a token bucket shared by all stations. Lower priorities
+    leave a reserve of tokens and executor slots for the higher ones, so a
+    command never waits behind a poll wave or a backfill; low priority work
+    is deferred until the budget recovers, never dropped.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        rate: float = SCHEDULER_RATE,
+        burst: int = SCHEDULER_BURST,
+        concurrency: int = SCHEDULER_CONCURRENCY,
+    ) -> None:
+        """Initialize scheduler.
+
+        Args:
+            hass: Home Assistant instance
+            rate: Sustained requests per second
+            burst: Maximum requests in a burst
+            concurrency: Maximum requests in flight
+        """
+        self.hass = hass
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self._queue: list[tuple[int, int, asyncio.Future, Callable[..., Any], tuple]] = []
+        self._counter = itertools.count()
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._running = 0
+        self._wakeup: asyncio.TimerHandle | None = None
+
+        # Measures executor queueing while the watchdog runs
+        self.watchdog: "LoopWatchdog | None" = None
+
+        # Tokens and executor slots each priority must leave to higher ones
+        self._token_reserve = {
+            Priority.COMMAND: 0,
+            Priority.VERIFY: 0,
+            Priority.POLL: 1,
+            Priority.LIVE: 2,
+            Priority.BACKGROUND: burst / 2,
+        }
+        self._slot_reserve = {
+            Priority.COMMAND: 0,
+            Priority.VERIFY: 0,
+            Priority.POLL: 1,
+            Priority.LIVE: 1,
+            Priority.BACKGROUND: 1,
+        }
+
+    @property
+    def pending(self) -> int:
+        """Number of requests waiting to run."""
+        return len(self._queue)
+
+    async def async_run(
+        self, priority: Priority, func: Callable[..., _T], *args: Any
+    ) -> _T:
+        """Run a blocking call in the executor when its priority allows.
+
+        Args:
+            priority: Request priority
+            func: Blocking function to call
+            args: Positional arguments for the function
+
+        Returns:
+            Result of the function
+        """
+        future: asyncio.Future = self.hass.loop.create_future()
+        heapq.heappush(self._queue, (priority, next(self._counter), future, func, args))
+        self._dispatch()
+        return await future
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    @callback
+    def _dispatch(self) -> None:
+        """Start as many queued requests as the budget allows."""
+        if self._wakeup:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        while self._queue:
+            priority, _, future, func, args = self._queue[0]
+            if future.done():
+                # Caller gave up waiting
+                heapq.heappop(self._queue)
+                continue
+
+            if self._running >= self.concurrency - self._slot_reserve[priority]:
+                # A running request will dispatch again when it finishes
+                return
+
+            self._refill()
+            missing = self._token_reserve[priority] + 1 - self._tokens
+            if missing > 0:
+                self._wakeup = self.hass.loop.call_later(missing / self.rate, self._dispatch)
+                return
+
+            heapq.heappop(self._queue)
+            self._tokens -= 1
+            self._running += 1
+            if self.watchdog is not None:
+                func = self.watchdog.wrap_job(func)
+            job = self.hass.async_add_executor_job(func, *args)
+            job.add_done_callback(partial(self._job_done, future))
+
+    @callback
+    def _job_done(self, future: asyncio.Future, job: asyncio.Future) -> None:
+        """Hand the result to the caller and start the next request."""
+        self._running -= 1
+        if not future.done():
+            if job.cancelled():
+                future.cancel()
+            elif (err := job.exception()) is not None:
+                future.set_exception(err)
+            else:
+                future.set_result(job.result())
+        self._dispatch()
+
+
+class PollPhasePlanner:
+    """Spread the polls of all stations evenly over the poll interval.
+
+    Every station gets a phase offset of index / count of its interval,
+    with stations ordered by key so the same fleet always gets the same
+    phases, also after reloads. Polls are aligned to wall clock time, so
+    the spacing does not drift with request duration or extra refreshes.
+    """
+
+    def __init__(self) -> None:
+        """Initialize planner."""
+        self._keys: list[str] = []
+
+    @callback
+    def async_register(self, key: str) -> CALLBACK_TYPE:
+        """Add a station and return a callback that removes it again."""
+        if key not in self._keys:
+            bisect.insort(self._keys, key)
+
+        @callback
+        def unregister() -> None:
+            if key in self._keys:
+                self._keys.remove(key)
+
+        return unregister
+
+    def phase(self, key: str) -> float:
+        """Return the phase offset of a station as a fraction of its interval."""
+        if key not in self._keys:
+            return 0.0
+        return self._keys.index(key) / len(self._keys)
+
+    def delay(self, key: str, interval: float, now: float | None = None) -> float:
+        """Return the seconds until the next poll slot of a station.
+
+        Args:
+            key: Station key
+            interval: Poll interval in seconds
+            now: Current Unix time (defaults to the wall clock)
+        """
+        if now is None:
+            now = time.time()
+        delay = (self.phase(key) * interval - now) % interval
+        if delay < PHASE_MIN_DELAY:
+            delay += interval
+        return delay
+
+
+class PhasedRefreshMixin:
+    """Schedule a DataUpdateCoordinator's refreshes at its poll phase.
+
+    Mix in before DataUpdateCoordinator and set `phases` and `phase_key`.
+    There is no public hook for the time of the next refresh, so this
+    replaces the timer through the coordinator internals `_unsub_refresh`
+    and `_handle_refresh_interval` of Home Assistant. Should those change,
+    refreshes stay on the regular, unphased schedule.
+    """
+
+    hass: HomeAssistant
+    update_interval: timedelta | None
+    phases: PollPhasePlanner
+    phase_key: str
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next refresh at the phase of the interval."""
+        super()._schedule_refresh()  # type: ignore[misc]
+        unsub = getattr(self, "_unsub_refresh", None)
+        handler = getattr(self, "_handle_refresh_interval", None)
+        if unsub is None or handler is None or self.update_interval is None:
+            return
+
+        unsub()
+        delay = self.phases.delay(self.phase_key, self.update_interval.total_seconds())
+        self._unsub_refresh = async_call_later(self.hass, delay, handler)
+
+
+@callback
+def async_get_phase_planner(hass: HomeAssistant) -> PollPhasePlanner:
+    """Return the poll phase planner, creating it on first use."""
+    if DATA_PHASES not in hass.data:
+        hass.data[DATA_PHASES] = PollPhasePlanner()
+    return hass.data[DATA_PHASES]
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> RequestScheduler:
+    """Return the request scheduler, creating it on first use."""
+    if DATA_SCHEDULER not in hass.data:
+        hass.data[DATA_SCHEDULER] = RequestScheduler(hass)
+    return hass.data[DATA_SCHEDULER]
@@ -1,14 +1,18 @@
 """Select entities for Tuya IoT Power Stations."""
 import logging
+from functools import partial
 from typing import Any
 
 from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
+from .coordinator import TwoEPowerStationCoordinator
+from .entity import PowerStationCoordinatorEntity, async_add_station_entities
+from .hub import async_setup_stations
+from .models import StationSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -70,32 +74,43 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up select entities from config entry."""
-    coordinator = hass.data[DOMAIN][entry.entry_id]
+    @callback
+    def async_add_station(coordinator: TwoEPowerStationCoordinator) -> None:
+        """Add the select entities of a station, and new ones as data points appear."""
+        async_add_station_entities(
+            coordinator, async_add_entities, partial(_station_selects, coordinator, entry)
+        )
 
+    async_setup_stations(hass, entry, async_add_station)
+
+
+def _station_selects(
+    coordinator: TwoEPowerStationCoordinator, entry: ConfigEntry, data: StationSnapshot
+) -> list[PowerStationCoordinatorEntity]:
+    """Return the select entities the station's data points support."""
     entities = []
 
     # LED Mode
-    if "led_mode" in coordinator.data:
+    if "led_mode" in data:
         entities.append(PowerStationLEDModeSelect(coordinator, entry))
 
     # Timer settings - Send & report type, should be writable
     # Currently getting error 2008, need to verify correct enum values from Tuya platform
-    if "ac_off_time_set" in coordinator.data:
+    if "ac_off_time_set" in data:
         entities.append(PowerStationACOffTimeSelect(coordinator, entry))
-    if "dc_off_time_set" in coordinator.data:
+    if "dc_off_time_set" in data:
         entities.append(PowerStationDCOffTimeSelect(coordinator, entry))
-    if "led_off_time_set" in coordinator.data:
+    if "led_off_time_set" in data:
         entities.append(PowerStationLEDOffTimeSelect(coordinator, entry))
-    if "device_standby_time_set" in coordinator.data:
+    if "device_standby_time_set" in data:
         entities.append(PowerStationStandbyTimeSelect(coordinator, entry))
-    if "display_off_time_set" in coordinator.data:
+    if "display_off_time_set" in data:
         entities.append(PowerStationDisplayOffTimeSelect(coordinator, entry))
 
-    if entities:
-        async_add_entities(entities)
+    return entities
 
 
-class PowerStationSelectBase(CoordinatorEntity, SelectEntity):
+class PowerStationSelectBase(PowerStationCoordinatorEntity, SelectEntity):
     """Base class for Tuya IoT Power Station select entities."""
 
     def __init__(self, coordinator, entry: ConfigEntry) -> None:
@@ -103,11 +118,11 @@ class PowerStationSelectBase(CoordinatorEntity, SelectEntity):
         super().__init__(coordinator)
         self._entry = entry
         
-        # Get device name from entry title
-        device_name = entry.title
+        # Station name, the entry title for device entries
+        device_name = coordinator.station_name
         
         self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
+            "identifiers": {(DOMAIN, coordinator.unique_prefix)},
             "name": device_name,
             "manufacturer": "Tuya",
             "model": "Portable Power Station",
@@ -131,12 +146,13 @@ class PowerStationLEDModeSelect(PowerStationSelectBase):
         super().__init__(coordinator, entry)
         self._attr_options = list(LED_MODE_OPTIONS.values())
         self._dp_code = "led_mode"
+        self._dp_codes = frozenset({"led_mode"})
         self._options_map = LED_MODE_OPTIONS
 
     @property
     def unique_id(self) -> str:
         """Return unique ID."""
-        return f"{self._entry.entry_id}_led_mode_select"
+        return f"{self.coordinator.unique_prefix}_led_mode_select"
 
     @property
     def current_option(self) -> str | None:
@@ -155,12 +171,9 @@ class PowerStationLEDModeSelect(PowerStationSelectBase):
                 break
 
         if tuya_value:
-            success = await self.hass.async_add_executor_job(
-                self.coordinator.api.send_command, self._dp_code, tuya_value
-            )
+            success = await self.coordinator.async_send_command(self._dp_code, tuya_value)
             if not success:
-                _LOGGER.error("Failed to set LED Mode to %s", option)
-            await self.coordinator.async_request_refresh()
+                _LOGGER.warning("LED Mode %s was not applied (queued or rejected)", option)
         else:
             _LOGGER.error("Could not find Tuya value for option: %s", option)
 
@@ -176,12 +189,13 @@ class PowerStationACOffTimeSelect(PowerStationSelectBase):
         super().__init__(coordinator, entry)
         self._attr_options = list(AC_OFF_TIME_OPTIONS.values())
         self._dp_code = "ac_off_time_set"
+        self._dp_codes = frozenset({"ac_off_time_set"})
         self._options_map = AC_OFF_TIME_OPTIONS
 
     @property
     def unique_id(self) -> str:
         """Return unique ID."""
-        return f"{self._entry.entry_id}_ac_off_time"
+        return f"{self.coordinator.unique_prefix}_ac_off_time"
 
     @property
     def current_option(self) -> str | None:
@@ -200,10 +214,7 @@ class PowerStationACOffTimeSelect(PowerStationSelectBase):
                 break
 
         if tuya_value:
-            await self.hass.async_add_executor_job(
-                self.coordinator.api.send_command, self._dp_code, tuya_value
-            )
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.async_send_command(self._dp_code, tuya_value)
 
 
 class PowerStationDCOffTimeSelect(PowerStationSelectBase):
@@ -217,12 +228,13 @@ class PowerStationDCOffTimeSelect(PowerStationSelectBase):
         super().__init__(coordinator, entry)
         self._attr_options = list(DC_OFF_TIME_OPTIONS.values())
         self._dp_code = "dc_off_time_set"
+        self._dp_codes = frozenset({"dc_off_time_set"})
         self._options_map = DC_OFF_TIME_OPTIONS
 
     @property
     def unique_id(self) -> str:
         """Return unique ID."""
-        return f"{self._entry.entry_id}_dc_off_time"
+        return f"{self.coordinator.unique_prefix}_dc_off_time"
 
     @property
     def current_option(self) -> str | None:
@@ -241,10 +253,7 @@ class PowerStationDCOffTimeSelect(PowerStationSelectBase):
                 break
 
         if tuya_value:
-            await self.hass.async_add_executor_job(
-                self.coordinator.api.send_command, self._dp_code, tuya_value
-            )
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.async_send_command(self._dp_code, tuya_value)
 
 
 class PowerStationLEDOffTimeSelect(PowerStationSelectBase):
@@ -258,12 +267,13 @@ class PowerStationLEDOffTimeSelect(PowerStationSelectBase):
         super().__init__(coordinator, entry)
         self._attr_options = list(LED_OFF_TIME_OPTIONS.values())
         self._dp_code = "led_off_time_set"
+        self._dp_codes = frozenset({"led_off_time_set"})
         self._options_map = LED_OFF_TIME_OPTIONS
 
     @property
     def unique_id(self) -> str:
         """Return unique ID."""
-        return f"{self._entry.entry_id}_led_off_time"
+        return f"{self.coordinator.unique_prefix}_led_off_time"
 
     @property
     def current_option(self) -> str | None:
@@ -282,10 +292,7 @@ class PowerStationLEDOffTimeSelect(PowerStationSelectBase):
                 break
 
         if tuya_value:
-            await self.hass.async_add_executor_job(
-                self.coordinator.api.send_command, self._dp_code, tuya_value
-            )
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.async_send_command(self._dp_code, tuya_value)
 
 
 class PowerStationStandbyTimeSelect(PowerStationSelectBase):
@@ -299,12 +306,13 @@ class PowerStationStandbyTimeSelect(PowerStationSelectBase):
         super().__init__(coordinator, entry)
         self._attr_options = list(STANDBY_TIME_OPTIONS.values())
         self._dp_code = "device_standby_time_set"
+        self._dp_codes = frozenset({"device_standby_time_set"})
         self._options_map = STANDBY_TIME_OPTIONS
 
     @property
     def unique_id(self) -> str:
         """Return unique ID."""
-        return f"{self._entry.entry_id}_standby_time"
+        return f"{self.coordinator.unique_prefix}_standby_time"
 
     @property
     def current_option(self) -> str | None:
@@ -323,10 +331,7 @@ class PowerStationStandbyTimeSelect(PowerStationSelectBase):
                 break
 
         if tuya_value:
-            await self.hass.async_add_executor_job(
-                self.coordinator.api.send_command, self._dp_code, tuya_value
-            )
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.async_send_command(self._dp_code, tuya_value)
 
 
 class PowerStationDisplayOffTimeSelect(PowerStationSelectBase):
@@ -340,12 +345,13 @@ class PowerStationDisplayOffTimeSelect(PowerStationSelectBase):
         super().__init__(coordinator, entry)
         self._attr_options = list(DISPLAY_OFF_TIME_OPTIONS.values())
         self._dp_code = "display_off_time_set"
+        self._dp_codes = frozenset({"display_off_time_set"})
         self._options_map = DISPLAY_OFF_TIME_OPTIONS
 
     @property
     def unique_id(self) -> str:
         """Return unique ID."""
-        return f"{self._entry.entry_id}_display_off_time"
+        return f"{self.coordinator.unique_prefix}_display_off_time"
 
     @property
     def current_option(self) -> str | None:
@@ -364,7 +370,4 @@ class PowerStationDisplayOffTimeSelect(PowerStationSelectBase):
                 break
 
         if tuya_value:
-            await self.hass.async_add_executor_job(
-                self.coordinator.api.send_command, self._dp_code, tuya_value
-            )
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.async_send_command(self._dp_code, tuya_value)
@@ -1,5 +1,6 @@
 """Sensors for Tuya IoT Power Stations."""
 import logging
+from functools import partial
 from typing import Any
 
 from homeassistant.components.sensor import (
@@ -16,15 +17,54 @@ from homeassistant.const import (
     UnitOfElectricPotential,
     UnitOfTemperature,
     UnitOfFrequency,
+    UnitOfTime,
+    EntityCategory,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import (
+    CONF_FLEET_DEVICE,
+    CONF_LOOP_WATCHDOG,
+    DEFAULT_FLEET_DEVICE,
+    DEFAULT_LOOP_WATCHDOG,
+    DOMAIN,
+    SIGNAL_FLEET_RELEASED,
+    SIGNAL_FLEET_UPDATED,
+    SIGNAL_QUEUE_UPDATED,
+    SIGNAL_WATCHDOG_UPDATED,
+)
+from .coordinator import TwoEPowerStationCoordinator
+from .entity import PowerStationCoordinatorEntity, async_add_station_entities
+from .hub import async_setup_stations
+from .models import StationSnapshot
+from .fleet import FleetAggregator, async_get_fleet
 
 _LOGGER = logging.getLogger(__name__)
 
+# Rolling statistics: data point -> (unique ID suffix, name, unit, device class)
+ROLLING_SENSORS = {
+    "total_output_power": (
+        "output_power", "Total Out Power", UnitOfPower.WATT, SensorDeviceClass.POWER
+    ),
+    "total_input_power": (
+        "input_power", "Total In Power", UnitOfPower.WATT, SensorDeviceClass.POWER
+    ),
+    "temp_current": (
+        "temperature", "Battery Temperature",
+        UnitOfTemperature.CELSIUS, SensorDeviceClass.TEMPERATURE,
+    ),
+}
+
+# (unique ID suffix, name, RollingWindow attribute) of each statistic
+ROLLING_STATISTICS = (
+    ("min", "Min", "minimum"),
+    ("max", "Max", "maximum"),
+    ("mean", "Mean", "mean"),
+    ("std", "Std Dev", "std"),
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -32,46 +72,103 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up sensors from a config entry."""
-    coordinator = hass.data[DOMAIN][entry.entry_id]
-
+    # Watchdog counters are shared, they go to the first station only
+    add_watchdog_sensors = entry.options.get(CONF_LOOP_WATCHDOG, DEFAULT_LOOP_WATCHDOG)
+
+    @callback
+    def async_add_station(coordinator: TwoEPowerStationCoordinator) -> None:
+        """Add the sensors of a station, and new ones as data points appear."""
+        async_add_station_entities(
+            coordinator, async_add_entities, partial(_station_sensors, coordinator, entry)
+        )
+
+        # Event loop watchdog counters
+        nonlocal add_watchdog_sensors
+        if add_watchdog_sensors:
+            add_watchdog_sensors = False
+            async_add_entities([
+                PowerStationLoopBlocksSensor(coordinator, entry),
+                PowerStationLoopMaxBlockSensor(coordinator, entry),
+                PowerStationSlowCallbacksSensor(coordinator, entry),
+                PowerStationExecutorWaitSensor(coordinator, entry),
+            ])
+
+    async_setup_stations(hass, entry, async_add_station)
+
+    # Fleet aggregate device - created by the first entry that enables it,
+    # and by another one when that entry unloads
+    if not entry.options.get(CONF_FLEET_DEVICE, DEFAULT_FLEET_DEVICE):
+        return
+    fleet = async_get_fleet(hass)
+
+    @callback
+    def async_add_fleet_sensors(released: str | None = None) -> None:
+        """Add the fleet sensors if this entry gets to own them."""
+        if released == entry.entry_id or not fleet.async_claim(entry.entry_id):
+            return
+        async_add_entities([
+            FleetStoredEnergySensor(fleet),
+            FleetBatteryLevelSensor(fleet),
+            FleetInputPowerSensor(fleet),
+            FleetOutputPowerSensor(fleet),
+            FleetOnlineStationsSensor(fleet),
+        ])
+
+    async_add_fleet_sensors()
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_FLEET_RELEASED, async_add_fleet_sensors)
+    )
+
+
+def _station_sensors(
+    coordinator: TwoEPowerStationCoordinator, entry: ConfigEntry, data: StationSnapshot
+) -> list[PowerStationCoordinatorEntity]:
+    """Return the sensors the station's data points support."""
     # Base sensors - always add
     entities = [
         PowerStationBatteryLevelSensor(coordinator, entry),
     ]
 
     # Power sensors - add if available in data
-    if "total_input_power" in coordinator.data:
+    if "total_input_power" in data:
         entities.append(PowerStationInputPowerSensor(coordinator, entry))
-    if "total_output_power" in coordinator.data:
+    if "total_output_power" in data:
         entities.append(PowerStationOutputPowerSensor(coordinator, entry))
-    if "ac_output_power" in coordinator.data:
+    if "ac_output_power" in data:
         entities.append(PowerStationACPowerSensor(coordinator, entry))
-    if "dc_output_power" in coordinator.data:
+    if "dc_output_power" in data:
         entities.append(PowerStationDCPowerSensor(coordinator, entry))
 
     # USB power sensors
-    if "usb1_output_power" in coordinator.data:
+    if "usb1_output_power" in data:
         entities.append(PowerStationUSBPowerSensor(coordinator, entry, 1))
-    if "usb2_output_power" in coordinator.data:
+    if "usb2_output_power" in data:
         entities.append(PowerStationUSBPowerSensor(coordinator, entry, 2))
-    if "usb3_output_power" in coordinator.data:
+    if "usb3_output_power" in data:
         entities.append(PowerStationUSBPowerSensor(coordinator, entry, 3))
-    if "usb4_output_power" in coordinator.data:
+    if "usb4_output_power" in data:
         entities.append(PowerStationUSBPowerSensor(coordinator, entry, 4))
-    if "usb_c1_output_power" in coordinator.data:
+    if "usb_c1_output_power" in data:
         entities.append(PowerStationUSBCPowerSensor(coordinator, entry, 1))
-    if "usb_c2_output_power" in coordinator.data:
+    if "usb_c2_output_power" in data:
         entities.append(PowerStationUSBCPowerSensor(coordinator, entry, 2))
 
     # Battery power sensor (positive = discharge, negative = charge)
     # This sensor is used for Energy Dashboard
-    if "total_input_power" in coordinator.data or "total_output_power" in coordinator.data:
+    if "total_input_power" in data or "total_output_power" in data:
         entities.append(PowerStationBatteryPowerSensor(coordinator, entry))
 
+    # Runtime estimates from battery level and power
+    if "battery_percentage" in data and (
+        "total_input_power" in data or "total_output_power" in data
+    ):
+        entities.append(PowerStationTimeToEmptySensor(coordinator, entry))
+        entities.append(PowerStationTimeToFullSensor(coordinator, entry))
+
     # Energy sensors
-    if "charge_energy" in coordinator.data:
+    if "charge_energy" in data:
         entities.append(PowerStationChargeEnergySensor(coordinator, entry))
-    if "discharge_energy" in coordinator.data:
+    if "discharge_energy" in data:
         entities.append(PowerStationDischargeEnergySensor(coordinator, entry))
 
     # Add Power-to-Energy integration sensors (helpers) if real energy sensors are missing
@@ -79,19 +176,33 @@ async def async_setup_entry(
     # but we can provide the base power sensors with correct attributes.
 
     # Other sensors
-    if "temp_current" in coordinator.data:
+    if "temp_current" in data:
         entities.append(PowerStationTemperatureSensor(coordinator, entry))
-    if "ac_voltage_freq" in coordinator.data:
+    if "ac_voltage_freq" in data:
         entities.append(PowerStationFrequencySensor(coordinator, entry))
-    if "error_code" in coordinator.data:
+    if "error_code" in data:
         entities.append(PowerStationErrorSensor(coordinator, entry))
-    if "input_type" in coordinator.data:
+    if "input_type" in data:
         entities.append(PowerStationInputTypeSensor(coordinator, entry))
 
-    async_add_entities(entities)
+    # Rolling statistics, computed per sample in the coordinator
+    if coordinator.rolling:
+        entities.extend(
+            PowerStationRollingStatSensor(coordinator, entry, code, statistic)
+            for code in ROLLING_SENSORS
+            if code in data
+            for statistic in ROLLING_STATISTICS
+        )
+
+    # Diagnostic sensors
+    entities.append(PowerStationAPILatencySensor(coordinator, entry))
+    entities.append(PowerStationCommandQueueDepthSensor(coordinator, entry))
+    entities.append(PowerStationCommandQueueAgeSensor(coordinator, entry))
+
+    return entities
 
 
-class PowerStationSensorBase(CoordinatorEntity, SensorEntity):
+class PowerStationSensorBase(PowerStationCoordinatorEntity, SensorEntity):
     """Base class for Tuya IoT Power Station sensors."""
 
     def __init__(self, coordinator, entry: ConfigEntry) -> None:
@@ -99,11 +210,11 @@ class PowerStationSensorBase(CoordinatorEntity, SensorEntity):
         super().__init__(coordinator)
         self._entry = entry
         
-        # Get device name from entry title or coordinator data if available
-        device_name = entry.title
+        # Station name, the entry title for device entries
+        device_name = coordinator.station_name
         
         self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
+            "identifiers": {(DOMAIN, coordinator.unique_prefix)},
             "name": device_name,
             "manufacturer": "Tuya",
             "model": "Portable Power Station",
@@ -120,6 +231,7 @@ class PowerStationBatteryLevelSensor(PowerStationSensorBase):
     """Battery level sensor."""
 
     _attr_name = "Battery Level"
+    _dp_codes = frozenset({"battery_percentage"})
     _attr_native_unit_of_measurement = PERCENTAGE
     _attr_device_class = SensorDeviceClass.BATTERY
     _attr_state_class = SensorStateClass.MEASUREMENT
@@ -127,7 +239,7 @@ class PowerStationBatteryLevelSensor(PowerStationSensorBase):
     @property
     def unique_id(self) -> str:
         """Unique ID for sensor."""
-        return f"{self._entry.entry_id}_battery"
+        return f"{self.coordinator.unique_prefix}_battery"
 
     @property
     def native_value(self) -> int | None:
@@ -139,6 +251,7 @@ class PowerStationInputPowerSensor(PowerStationSensorBase):
     """Input power sensor."""
 
     _attr_name = "Total In Power"
+    _dp_codes = frozenset({"total_input_power"})
     _attr_native_unit_of_measurement = UnitOfPower.WATT
     _attr_device_class = SensorDeviceClass.POWER
     _attr_state_class = SensorStateClass.MEASUREMENT
@@ -147,24 +260,27 @@ class PowerStationInputPowerSensor(PowerStationSensorBase):
     @property
     def unique_id(self) -> str:
         """Unique ID for sensor."""
-        return f"{self._entry.entry_id}_input_power"
+        return f"{self.coordinator.unique_prefix}_input_power"
 
     @property
     def native_value(self) -> float | None:
         """Current value of sensor."""
-        power = self.coordinator.data.get("total_input_power", 0)
-        return float(power)
+        return self.coordinator.data.get("total_input_power", 0.0)
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return extra state attributes."""
-        return {"last_reset": "1970-01-01T00:00:00+00:00"}
+        return {
+            **(super().extra_state_attributes or {}),
+            "last_reset": "1970-01-01T00:00:00+00:00",
+        }
 
 
 class PowerStationOutputPowerSensor(PowerStationSensorBase):
     """Output power sensor."""
 
     _attr_name = "Total Out Power"
+    _dp_codes = frozenset({"total_output_power"})
     _attr_native_unit_of_measurement = UnitOfPower.WATT
     _attr_device_class = SensorDeviceClass.POWER
     _attr_state_class = SensorStateClass.MEASUREMENT
@@ -173,24 +289,27 @@ class PowerStationOutputPowerSensor(PowerStationSensorBase):
     @property
     def unique_id(self) -> str:
         """Unique ID for sensor."""
-        return f"{self._entry.entry_id}_output_power"
+        return f"{self.coordinator.unique_prefix}_output_power"
 
     @property
     def native_value(self) -> float | None:
         """Current value of sensor."""
-        power = self.coordinator.data.get("total_output_power", 0)
-        return float(power)
+        return self.coordinator.data.get("total_output_power", 0.0)
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return extra state attributes."""
-        return {"last_reset": "1970-01-01T00:00:00+00:00"}
+        return {
+            **(super().extra_state_attributes or {}),
+            "last_reset": "1970-01-01T00:00:00+00:00",
+        }
 
 
 class PowerStationACPowerSensor(PowerStationSensorBase):
     """AC output power sensor."""
 
     _attr_name = "AC Out Power"
+    _dp_codes = frozenset({"ac_output_power"})
     _attr_native_unit_of_measurement = UnitOfPower.WATT
     _attr_device_class = SensorDeviceClass.POWER
     _attr_state_class = SensorStateClass.MEASUREMENT
@@ -199,19 +318,19 @@ class PowerStationACPowerSensor(PowerStationSensorBase):
     @property
     def unique_id(self) -> str:
         """Unique ID for sensor."""
-        return f"{self._entry.entry_id}_ac_power"
+        return f"{self.coordinator.unique_prefix}_ac_power"
 
     @property
     def native_value(self) -> float | None:
         """Current value of sensor."""
-        power = self.coordinator.data.get("ac_output_power", 0)
-        return float(power)
+        return self.coordinator.data.get("ac_output_power", 0.0)
 
 
 class PowerStationDCPowerSensor(PowerStationSensorBase):
     """DC output power sensor."""
 
     _attr_name = "DC Out Power"
+    _dp_codes = frozenset({"dc_output_power"})
     _attr_native_unit_of_measurement = UnitOfPower.WATT
     _attr_device_class = SensorDeviceClass.POWER
     _attr_state_class = SensorStateClass.MEASUREMENT
@@ -220,13 +339,12 @@ class PowerStationDCPowerSensor(PowerStationSensorBase):
     @property
     def unique_id(self) -> str:
         """Unique ID for sensor."""
-        return f"{self._entry.entry_id}_dc_power"
+        return f"{self.coordinator.unique_prefix}_dc_power"
 
     @property
     def native_value(self) -> float | None:
         """Current value of sensor."""
-        power = self.coordinator.data.get("dc_output_power", 0)
-        return float(power)
+        return self.coordinator.data.get("dc_output_power", 0.0)
 
 
 class PowerStationUSBPowerSensor(PowerStationSensorBase):
@@ -235,6 +353,7 @@ class PowerStationUSBPowerSensor(PowerStationSensorBase):
     def __init__(self, coordinator, entry: ConfigEntry, port_num: int) -> None:
         """Initialize sensor."""
         self._attr_name = f"USB{port_num} Out Power"
+        self._dp_codes = frozenset({f"usb{port_num}_output_power"})
         super().__init__(coordinator, entry)
         self._port_num = port_num
         self._attr_icon = "mdi:usb-port"
@@ -246,13 +365,12 @@ class PowerStationUSBPowerSensor(PowerStationSensorBase):
     @property
     def unique_id(self) -> str:
         """Unique ID for sensor."""
-        return f"{self._entry.entry_id}_usb{self._port_num}_power"
+        return f"{self.coordinator.unique_prefix}_usb{self._port_num}_power"
 
     @property
     def native_value(self) -> float | None:
         """Current value of sensor."""
-        power = self.coordinator.data.get(f"usb{self._port_num}_output_power", 0)
-        return float(power)
+        return self.coordinator.data.get(f"usb{self._port_num}_output_power", 0.0)
 
 
 class PowerStationUSBCPowerSensor(PowerStationSensorBase):
@@ -261,6 +379,7 @@ class PowerStationUSBCPowerSensor(PowerStationSensorBase):
     def __init__(self, coordinator, entry: ConfigEntry, port_num: int) -> None:
         """Initialize sensor."""
         self._attr_name = f"USB-C{port_num} Out Power"
+        self._dp_codes = frozenset({f"usb_c{port_num}_output_power"})
         super().__init__(coordinator, entry)
         self._port_num = port_num
         self._attr_icon = "mdi:usb-port"
@@ -272,19 +391,19 @@ class PowerStationUSBCPowerSensor(PowerStationSensorBase):
     @property
     def unique_id(self) -> str:
         """Unique ID for sensor."""
-        return f"{self._entry.entry_id}_usbc{self._port_num}_power"
+        return f"{self.coordinator.unique_prefix}_usbc{self._port_num}_power"
 
     @property
     def native_value(self) -> float | None:
         """Current value of sensor."""
-        power = self.coordinator.data.get(f"usb_c{self._port_num}_output_power", 0)
-        return float(power)
+        return self.coordinator.data.get(f"usb_c{self._port_num}_output_power", 0.0)
 
 
 class PowerStationTemperatureSensor(PowerStationSensorBase):
     """Temperature sensor."""
 
     _attr_name = "Battery Temperature"
+    _dp_codes = frozenset({"temp_current"})
     _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
     _attr_device_class = SensorDeviceClass.TEMPERATURE
     _attr_state_class = SensorStateClass.MEASUREMENT
@@ -292,25 +411,25 @@ class PowerStationTemperatureSensor(PowerStationSensorBase):
     @property
     def unique_id(self) -> str:
         """Unique ID for sensor."""
-        return f"{self._entry.entry_id}_temperature"
+        return f"{self.coordinator.unique_prefix}_temperature"
 
     @property
     def native_value(self) -> float | None:
         """Current value of sensor."""
-        temp = self.coordinator.data.get("temp_current", 0)
-        return float(temp)
+        return self.coordinator.data.get("temp_current", 0.0)
 
 
 class PowerStationFrequencySensor(PowerStationSensorBase):
     """AC voltage and frequency sensor."""
 
     _attr_name = "AC Voltage/Frequency"
+    _dp_codes = frozenset({"ac_voltage_freq"})
     _attr_icon = "mdi:sine-wave"
 
     @property
     def unique_id(self) -> str:
         """Unique ID for sensor."""
-        return f"{self._entry.entry_id}_ac_voltage_freq"
+        return f"{self.coordinator.unique_prefix}_ac_voltage_freq"
 
     @property
     def native_value(self) -> str | None:
@@ -323,12 +442,13 @@ class PowerStationErrorSensor(PowerStationSensorBase):
     """Error code sensor."""
 
     _attr_name = "Error Code"
+    _dp_codes = frozenset({"error_code"})
     _attr_icon = "mdi:alert-circle-outline"
 
     @property
     def unique_id(self) -> str:
         """Unique ID for sensor."""
-        return f"{self._entry.entry_id}_error_code"
+        return f"{self.coordinator.unique_prefix}_error_code"
 
     @property
     def native_value(self) -> str | None:
@@ -341,12 +461,13 @@ class PowerStationInputTypeSensor(PowerStationSensorBase):
     """Input power type sensor."""
 
     _attr_name = "Input Type"
+    _dp_codes = frozenset({"input_type"})
     _attr_icon = "mdi:power-plug"
 
     @property
     def unique_id(self) -> str:
         """Unique ID for sensor."""
-        return f"{self._entry.entry_id}_input_type"
+        return f"{self.coordinator.unique_prefix}_input_type"
 
     @property
     def native_value(self) -> str | None:
@@ -359,6 +480,7 @@ class PowerStationChargeEnergySensor(PowerStationSensorBase):
     """Battery charge energy sensor (for Energy Dashboard)."""
 
     _attr_name = "Battery Charge Energy"
+    _dp_codes = frozenset({"charge_energy"})
     _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
     _attr_device_class = SensorDeviceClass.ENERGY
     _attr_state_class = SensorStateClass.TOTAL_INCREASING
@@ -367,20 +489,20 @@ class PowerStationChargeEnergySensor(PowerStationSensorBase):
     @property
     def unique_id(self) -> str:
         """Unique ID for sensor."""
-        return f"{self._entry.entry_id}_charge_energy"
+        return f"{self.coordinator.unique_prefix}_charge_energy"
 
     @property
     def native_value(self) -> float | None:
         """Current value of sensor in kWh."""
-        energy = self.coordinator.data.get("charge_energy", 0)
-        # Convert Wh to kWh if needed
-        return float(energy) / 1000.0 if energy > 100 else float(energy)
+        # Converted from Wh to kWh when the snapshot is built
+        return self.coordinator.data.charge_energy
 
 
 class PowerStationDischargeEnergySensor(PowerStationSensorBase):
     """Battery discharge energy sensor (for Energy Dashboard)."""
 
     _attr_name = "Battery Discharge Energy"
+    _dp_codes = frozenset({"discharge_energy"})
     _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
     _attr_device_class = SensorDeviceClass.ENERGY
     _attr_state_class = SensorStateClass.TOTAL_INCREASING
@@ -389,14 +511,13 @@ class PowerStationDischargeEnergySensor(PowerStationSensorBase):
     @property
     def unique_id(self) -> str:
         """Unique ID for sensor."""
-        return f"{self._entry.entry_id}_discharge_energy"
+        return f"{self.coordinator.unique_prefix}_discharge_energy"
 
     @property
     def native_value(self) -> float | None:
         """Current value of sensor in kWh."""
-        energy = self.coordinator.data.get("discharge_energy", 0)
-        # Convert Wh to kWh if needed
-        return float(energy) / 1000.0 if energy > 100 else float(energy)
+        # Converted from Wh to kWh when the snapshot is built
+        return self.coordinator.data.discharge_energy
 
 
 class PowerStationBatteryPowerSensor(PowerStationSensorBase):
@@ -407,6 +528,7 @@ class PowerStationBatteryPowerSensor(PowerStationSensorBase):
     """
 
     _attr_name = "Battery Power"
+    _dp_codes = frozenset({"total_output_power", "total_input_power"})
     _attr_native_unit_of_measurement = UnitOfPower.WATT
     _attr_device_class = SensorDeviceClass.POWER
     _attr_state_class = SensorStateClass.MEASUREMENT
@@ -415,7 +537,7 @@ class PowerStationBatteryPowerSensor(PowerStationSensorBase):
     @property
     def unique_id(self) -> str:
         """Unique ID for sensor."""
-        return f"{self._entry.entry_id}_battery_power"
+        return f"{self.coordinator.unique_prefix}_battery_power"
 
     @property
     def native_value(self) -> float | None:
@@ -423,16 +545,412 @@ class PowerStationBatteryPowerSensor(PowerStationSensorBase):
 
         Positive = discharge, negative = charge
         """
-        output_power = self.coordinator.data.get("total_output_power", 0)
-        input_power = self.coordinator.data.get("total_input_power", 0)
+        # Discharge (positive) - charge (negative), precomputed per snapshot
+        return self.coordinator.data.battery_power
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return extra state attributes."""
+        return {
+            **(super().extra_state_attributes or {}),
+            "last_reset": "1970-01-01T00:00:00+00:00",
+        }
+
+
+class PowerStationTimeToEmptySensor(PowerStationSensorBase):
+    """Estimated remaining runtime sensor."""
+
+    _attr_name = "Time to Empty"
+    _attr_native_unit_of_measurement = UnitOfTime.MINUTES
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:battery-clock-outline"
+
+    @property
+    def unique_id(self) -> str:
+        """Unique ID for sensor."""
+        return f"{self.coordinator.unique_prefix}_time_to_empty"
+
+    @property
+    def native_value(self) -> int | None:
+        """Minutes until empty, unknown while charging or idle."""
+        minutes = self.coordinator.estimator.time_to_empty
+        return round(minutes) if minutes is not None else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return extra state attributes."""
+        capacity = self.coordinator.estimator.capacity
+        return {"estimated_capacity_wh": round(capacity, -1) if capacity else None}
+
+
+class PowerStationTimeToFullSensor(PowerStationSensorBase):
+    """Estimated remaining charge time sensor."""
+
+    _attr_name = "Time to Full"
+    _attr_native_unit_of_measurement = UnitOfTime.MINUTES
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:battery-charging-high"
+
+    @property
+    def unique_id(self) -> str:
+        """Unique ID for sensor."""
+        return f"{self.coordinator.unique_prefix}_time_to_full"
+
+    @property
+    def native_value(self) -> int | None:
+        """Minutes until full, unknown while discharging or idle."""
+        minutes = self.coordinator.estimator.time_to_full
+        return round(minutes) if minutes is not None else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return extra state attributes."""
+        capacity = self.coordinator.estimator.capacity
+        return {"estimated_capacity_wh": round(capacity, -1) if capacity else None}
+
+
+class PowerStationRollingStatSensor(PowerStationSensorBase):
+    """Min, max, mean or standard deviation of a data point over a window.
+
+    Leaves `_dp_codes` unset, so it is written on every poll (the
+    coordinator notifies listeners on every poll, failed ones within the
+    grace period included): old samples leave the window and change the
+    statistic even when the data point itself did not change.
+    """
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:chart-bell-curve-cumulative"
+    _unrecorded_attributes = PowerStationSensorBase._unrecorded_attributes | {
+        "samples", "window_minutes"
+    }
+
+    def __init__(
+        self,
+        coordinator,
+        entry: ConfigEntry,
+        code: str,
+        statistic: tuple[str, str, str],
+    ) -> None:
+        """Initialize sensor.
+
+        Args:
+            coordinator: Station coordinator
+            entry: Config entry
+            code: Data point (key of ROLLING_SENSORS)
+            statistic: Entry of ROLLING_STATISTICS
+        """
+        suffix, name, unit, device_class = ROLLING_SENSORS[code]
+        statistic_suffix, statistic_name, self._statistic = statistic
+        self._code = code
+        self._unique_suffix = f"{suffix}_{statistic_suffix}"
+        self._attr_name = f"{name} {statistic_name}"
+        self._attr_native_unit_of_measurement = unit
+        if statistic_suffix != "std":
+            self._attr_device_class = device_class
+        super().__init__(coordinator, entry)
+
+    @property
+    def unique_id(self) -> str:
+        """Unique ID for sensor."""
+        return f"{self.coordinator.unique_prefix}_{self._unique_suffix}"
+
+    @property
+    def native_value(self) -> float | None:
+        """Statistic of the samples in the window."""
+        value = getattr(self.coordinator.rolling.windows[self._code], self._statistic)
+        return round(value, 2) if value is not None else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return extra state attributes."""
+        window = self.coordinator.rolling.windows[self._code]
+        return {"samples": window.count, "window_minutes": round(window.window / 60)}
+
+
+class PowerStationAPILatencySensor(PowerStationSensorBase):
+    """Tuya Cloud API round-trip time sensor (diagnostic)."""
+
+    _attr_name = "API Latency"
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_icon = "mdi:timer-sand"
+
+    @property
+    def unique_id(self) -> str:
+        """Unique ID for sensor."""
+        return f"{self.coordinator.unique_prefix}_api_latency"
+
+    @property
+    def native_value(self) -> float | None:
+        """Smoothed round-trip time in milliseconds."""
+        latency = self.coordinator.latency_ms
+        return round(latency) if latency is not None else None
+
+
+class PowerStationCommandQueueSensorBase(PowerStationSensorBase):
+    """Base class for command queue diagnostic sensors."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to command queue changes."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_QUEUE_UPDATED.format(self.coordinator.unique_prefix),
+                self.async_write_ha_state,
+            )
+        )
+
+
+class PowerStationCommandQueueDepthSensor(PowerStationCommandQueueSensorBase):
+    """Number of commands waiting for delivery (diagnostic)."""
+
+    _attr_name = "Command Queue Depth"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:tray-full"
+
+    @property
+    def unique_id(self) -> str:
+        """Unique ID for sensor."""
+        return f"{self.coordinator.unique_prefix}_command_queue_depth"
+
+    @property
+    def native_value(self) -> int:
+        """Pending data point writes."""
+        return self.coordinator.commands.depth
+
+
+class PowerStationCommandQueueAgeSensor(PowerStationCommandQueueSensorBase):
+    """Age of the oldest queued command (diagnostic)."""
+
+    _attr_name = "Command Queue Age"
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:tray-alert"
+
+    @property
+    def unique_id(self) -> str:
+        """Unique ID for sensor."""
+        return f"{self.coordinator.unique_prefix}_command_queue_age"
+
+    @property
+    def native_value(self) -> int:
+        """Seconds the oldest pending write has been waiting, 0 if empty."""
+        age = self.coordinator.commands.oldest_age
+        return round(age) if age is not None else 0
+
+
+class PowerStationWatchdogSensorBase(PowerStationSensorBase):
+    """Base class for event loop watchdog diagnostic sensors."""
 
-        # Discharge (positive) - charge (negative)
-        return float(output_power) - float(input_power)
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to watchdog reports."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_WATCHDOG_UPDATED, self.async_write_ha_state
+            )
+        )
+
+
+class PowerStationLoopBlocksSensor(PowerStationWatchdogSensorBase):
+    """Number of times integration code blocked the event loop (diagnostic)."""
+
+    _attr_name = "Event Loop Blocks"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_icon = "mdi:timer-alert-outline"
+
+    @property
+    def unique_id(self) -> str:
+        """Unique ID for sensor."""
+        return f"{self.coordinator.unique_prefix}_loop_blocks"
+
+    @property
+    def native_value(self) -> int:
+        """Blocks above the threshold since the watchdog started."""
+        return self.coordinator.watchdog.blocks
+
+
+class PowerStationLoopMaxBlockSensor(PowerStationWatchdogSensorBase):
+    """Longest event loop block caused by integration code (diagnostic)."""
+
+    _attr_name = "Longest Event Loop Block"
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:timer-alert"
+
+    @property
+    def unique_id(self) -> str:
+        """Unique ID for sensor."""
+        return f"{self.coordinator.unique_prefix}_loop_max_block"
+
+    @property
+    def native_value(self) -> int:
+        """Longest block in milliseconds."""
+        return round(self.coordinator.watchdog.block_max_ms)
+
+
+class PowerStationSlowCallbacksSensor(PowerStationWatchdogSensorBase):
+    """Number of slow entity update callbacks (diagnostic)."""
+
+    _attr_name = "Slow Callbacks"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_icon = "mdi:snail"
+
+    @property
+    def unique_id(self) -> str:
+        """Unique ID for sensor."""
+        return f"{self.coordinator.unique_prefix}_slow_callbacks"
+
+    @property
+    def native_value(self) -> int:
+        """Entity state updates that held the loop above the threshold."""
+        return self.coordinator.watchdog.slow_callbacks
+
+
+class PowerStationExecutorWaitSensor(PowerStationWatchdogSensorBase):
+    """Time Tuya requests wait for an executor thread (diagnostic)."""
+
+    _attr_name = "Executor Wait"
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:timer-sand-paused"
+
+    @property
+    def unique_id(self) -> str:
+        """Unique ID for sensor."""
+        return f"{self.coordinator.unique_prefix}_executor_wait"
+
+    @property
+    def native_value(self) -> float | None:
+        """Smoothed wait in milliseconds."""
+        wait = self.coordinator.watchdog.executor_wait_ms
+        return round(wait, 1) if wait is not None else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return extra state attributes."""
+        return {"max_wait_ms": round(self.coordinator.watchdog.executor_wait_max_ms, 1)}
+
+
+class FleetSensorBase(SensorEntity):
+    """Base class for sensors of the virtual fleet device."""
+
+    _attr_should_poll = False
+    _attr_has_entity_name = True
+
+    def __init__(self, fleet: FleetAggregator) -> None:
+        """Initialize sensor."""
+        self._fleet = fleet
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, "fleet")},
+            "name": "Power Station Fleet",
+            "manufacturer": "Tuya",
+            "model": "Fleet Aggregate",
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to fleet updates."""
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, SIGNAL_FLEET_UPDATED, self.async_write_ha_state
+            )
+        )
+
+
+class FleetStoredEnergySensor(FleetSensorBase):
+    """Energy stored in all online stations with known capacity."""
+
+    _attr_name = "Stored Energy"
+    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _attr_device_class = SensorDeviceClass.ENERGY_STORAGE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_unique_id = "fleet_stored_energy"
+
+    @property
+    def native_value(self) -> float | None:
+        """Stored energy in kWh."""
+        if not self._fleet.capacity:
+            return None
+        return round(self._fleet.stored_energy / 1000, 3)
+
+
+class FleetBatteryLevelSensor(FleetSensorBase):
+    """Capacity-weighted battery level of all online stations."""
+
+    _attr_name = "Battery Level"
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_device_class = SensorDeviceClass.BATTERY
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_unique_id = "fleet_battery"
+
+    @property
+    def native_value(self) -> float | None:
+        """Weighted battery level."""
+        level = self._fleet.battery_level
+        return round(level, 1) if level is not None else None
+
+
+class FleetInputPowerSensor(FleetSensorBase):
+    """Total input power of all online stations."""
+
+    _attr_name = "Total In Power"
+    _attr_native_unit_of_measurement = UnitOfPower.WATT
+    _attr_device_class = SensorDeviceClass.POWER
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:transmission-tower-import"
+    _attr_unique_id = "fleet_input_power"
+
+    @property
+    def native_value(self) -> float:
+        """Total input power."""
+        return round(self._fleet.input_power, 1)
+
+
+class FleetOutputPowerSensor(FleetSensorBase):
+    """Total output power of all online stations."""
+
+    _attr_name = "Total Out Power"
+    _attr_native_unit_of_measurement = UnitOfPower.WATT
+    _attr_device_class = SensorDeviceClass.POWER
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:transmission-tower-export"
+    _attr_unique_id = "fleet_output_power"
+
+    @property
+    def native_value(self) -> float:
+        """Total output power."""
+        return round(self._fleet.output_power, 1)
+
+
+class FleetOnlineStationsSensor(FleetSensorBase):
+    """Number of stations that answered the last poll."""
+
+    _attr_name = "Stations Online"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:lan-connect"
+    _attr_unique_id = "fleet_online_stations"
+
+    @property
+    def native_value(self) -> int:
+        """Online station count."""
+        return self._fleet.online_count
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return extra state attributes."""
-        return {"last_reset": "1970-01-01T00:00:00+00:00"}
+        return {"total_stations": self._fleet.station_count}
 
 
 # Timer sensors (read-only) - cannot be changed via Tuya API
@@ -444,4 +962,4 @@ class PowerStationACOffTimeSensor(PowerStationSensorBase):
 
     @property
     def unique_id(self) -> str:
-        return f"{self._entry.entry_id}_ac_off_time"
+        return f"{self.coordinator.unique_prefix}_ac_off_time"
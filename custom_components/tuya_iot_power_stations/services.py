@@ -0,0 +1,224 @@
+"""Services for Tuya IoT Power Stations."""
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_DEVICE_IDS,
+    ATTR_DURATION,
+    ATTR_END,
+    ATTR_FORMAT,
+    ATTR_INTERVAL,
+    ATTR_START,
+    BACKFILL_MAX_AGE,
+    BURST_MIN_DURATION,
+    DOMAIN,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_PARQUET,
+    PROFILE_DIR,
+    PROFILE_TOP_FUNCTIONS,
+    SERVICE_BURST,
+    SERVICE_EXPORT,
+    SERVICE_PROFILE,
+)
+from .export import async_export_range
+from .profiler import SamplingProfiler, format_summary
+
+if TYPE_CHECKING:
+    from .hub import PowerStationHub
+
+_LOGGER = logging.getLogger(__name__)
+
+PROFILE_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_DURATION, default=30): vol.All(
+        vol.Coerce(float), vol.Range(min=1, max=600)
+    ),
+    # Milliseconds between samples
+    vol.Optional(ATTR_INTERVAL, default=10): vol.All(
+        vol.Coerce(float), vol.Range(min=1, max=1000)
+    ),
+})
+
+EXPORT_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_DEVICE_IDS, default=[]): vol.All(cv.ensure_list, [cv.string]),
+    vol.Required(ATTR_START): cv.datetime,
+    vol.Optional(ATTR_END): cv.datetime,
+    vol.Optional(ATTR_FORMAT, default=EXPORT_FORMAT_PARQUET): vol.In(
+        [EXPORT_FORMAT_PARQUET, EXPORT_FORMAT_CSV]
+    ),
+})
+
+BURST_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_DEVICE_IDS, default=[]): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_DURATION, default=300): vol.All(
+        vol.Coerce(float), vol.Range(min=BURST_MIN_DURATION, max=1800)
+    ),
+    # Seconds between polls
+    vol.Optional(ATTR_INTERVAL, default=5): vol.All(
+        vol.Coerce(float), vol.Range(min=2, max=30)
+    ),
+})
+
+
+def _write_profile(
+    profiler: SamplingProfiler, base: Path
+) -> tuple[Path, Path, dict[str, Any]]:
+    """Write the folded stacks and the text summary of a profile."""
+    folded = base.with_suffix(".folded")
+    summary_file = base.with_suffix(".txt")
+    summary = profiler.summary(PROFILE_TOP_FUNCTIONS)
+    profiler.write_folded(folded)
+    summary_file.write_text(format_summary(summary), encoding="utf-8")
+    return folded, summary_file, summary
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+    if hass.services.has_service(DOMAIN, SERVICE_PROFILE):
+        return
+
+    profile_lock = asyncio.Lock()
+
+    async def async_profile(call: ServiceCall) -> ServiceResponse:
+        """Sample the integration for a while and save the profile."""
+        if profile_lock.locked():
+            raise HomeAssistantError("A profile is already running")
+
+        async with profile_lock:
+            duration = call.data[ATTR_DURATION]
+            _LOGGER.info("Profiling %s for %s seconds", DOMAIN, duration)
+
+            # Service handlers run on the event loop thread
+            profiler = SamplingProfiler(
+                threading.get_ident(), call.data[ATTR_INTERVAL] / 1000
+            )
+            profiler.start()
+            try:
+                await asyncio.sleep(duration)
+            finally:
+                # Joining the sampler thread blocks up to one interval
+                await hass.async_add_executor_job(profiler.stop)
+
+            base = Path(hass.config.path(
+                PROFILE_DIR, f"profile-{dt_util.now():%Y%m%d-%H%M%S}"
+            ))
+            folded, summary_file, summary = await hass.async_add_executor_job(
+                _write_profile, profiler, base
+            )
+
+        _LOGGER.info("Profile saved to %s:\n%s", folded, format_summary(summary))
+        return {"profile": str(folded), "summary_file": str(summary_file), **summary}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    def get_hubs(call: ServiceCall) -> dict[str, "PowerStationHub"]:
+        """Return the hubs of the stations a call targets, by device ID."""
+        hubs = {
+            device_id: hub
+            for hub in hass.data.get(DOMAIN, {}).values()
+            for device_id in hub.stations
+        }
+        device_ids = call.data[ATTR_DEVICE_IDS] or list(hubs)
+        if missing := [device_id for device_id in device_ids if device_id not in hubs]:
+            raise HomeAssistantError(f"Power stations not found: {', '.join(missing)}")
+        return {device_id: hubs[device_id] for device_id in device_ids}
+
+    async def async_export(call: ServiceCall) -> ServiceResponse:
+        """Export the device logs of stations for a time range to files."""
+        hubs = get_hubs(call)
+
+        # Naive times are local, like in automations
+        start = dt_util.as_utc(call.data[ATTR_START])
+        end = dt_util.as_utc(call.data.get(ATTR_END) or dt_util.now())
+        if end <= start:
+            raise HomeAssistantError("The export must end after it starts")
+
+        # Tuya keeps device logs for BACKFILL_MAX_AGE, older samples are gone
+        earliest = dt_util.utcnow() - BACKFILL_MAX_AGE
+        if end <= earliest:
+            raise HomeAssistantError(
+                f"Device logs only go back {BACKFILL_MAX_AGE.days} days, "
+                f"the export must end after {dt_util.as_local(earliest).isoformat()}"
+            )
+        start_clamped = start < earliest
+        if start_clamped:
+            _LOGGER.warning(
+                "Device logs only go back %d days, exporting from %s",
+                BACKFILL_MAX_AGE.days, dt_util.as_local(earliest),
+            )
+            start = earliest
+
+        files = []
+        for device_id, hub in hubs.items():
+            path, rows = await async_export_range(
+                hass, hub.stations[device_id], start, end, call.data[ATTR_FORMAT]
+            )
+            files.append({"device_id": device_id, "file": str(path), "rows": rows})
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "start_clamped": start_clamped,
+            "files": files,
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT,
+        async_export,
+        schema=EXPORT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_burst(call: ServiceCall) -> ServiceResponse:
+        """Poll stations at a high rate for a while, within the request budget."""
+        bursts = []
+        refused = []
+        for device_id, hub in get_hubs(call).items():
+            try:
+                session = hub.burst.async_start(
+                    hub.stations[device_id],
+                    call.data[ATTR_DURATION],
+                    call.data[ATTR_INTERVAL],
+                )
+            except HomeAssistantError as err:
+                refused.append(str(err))
+                continue
+            bursts.append({
+                "device_id": device_id,
+                "interval": session.interval,
+                "until": dt_util.utc_from_timestamp(session.until).isoformat(),
+                "requests": session.planned_requests,
+                "remaining_today": hub.burst.remaining(),
+            })
+
+        if not bursts:
+            raise HomeAssistantError("; ".join(refused))
+        return {"bursts": bursts, "refused": refused}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BURST,
+        async_burst,
+        schema=BURST_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -1,14 +1,18 @@
 """Switches for Tuya IoT Power Stations."""
 import logging
+from functools import partial
 from typing import Any
 
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
+from .coordinator import TwoEPowerStationCoordinator
+from .entity import PowerStationCoordinatorEntity, async_add_station_entities
+from .hub import async_setup_stations
+from .models import StationSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,29 +23,38 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up switches from a config entry."""
-    coordinator = hass.data[DOMAIN][entry.entry_id]
+    @callback
+    def async_add_station(coordinator: TwoEPowerStationCoordinator) -> None:
+        """Add the switches of a station, and new ones as data points appear."""
+        async_add_station_entities(
+            coordinator, async_add_entities, partial(_station_switches, coordinator, entry)
+        )
+
+    async_setup_stations(hass, entry, async_add_station)
+
 
+def _station_switches(
+    coordinator: TwoEPowerStationCoordinator, entry: ConfigEntry, data: StationSnapshot
+) -> list[PowerStationCoordinatorEntity]:
+    """Return the switches the station's data points support."""
     entities = []
 
     # Output switches
-    if "switch_ac" in coordinator.data:
+    if "switch_ac" in data:
         entities.append(PowerStationACOutputSwitch(coordinator, entry))
-    if "switch_dc" in coordinator.data:
+    if "switch_dc" in data:
         entities.append(PowerStationDCOutputSwitch(coordinator, entry))
-    if "switch_usb" in coordinator.data:
+    if "switch_usb" in data:
         entities.append(PowerStationUSBOutputSwitch(coordinator, entry))
 
     # Feature switches
-    if "switch_buzzer" in coordinator.data:
+    if "switch_buzzer" in data:
         entities.append(PowerStationBuzzerSwitch(coordinator, entry))
 
-    if entities:
-        async_add_entities(entities)
-    else:
-        _LOGGER.warning("No switches found in device data")
+    return entities
 
 
-class PowerStationSwitchBase(CoordinatorEntity, SwitchEntity):
+class PowerStationSwitchBase(PowerStationCoordinatorEntity, SwitchEntity):
     """Base class for Tuya IoT Power Station switches."""
 
     def __init__(self, coordinator, entry: ConfigEntry, switch_code: str) -> None:
@@ -49,12 +62,13 @@ class PowerStationSwitchBase(CoordinatorEntity, SwitchEntity):
         super().__init__(coordinator)
         self._entry = entry
         self._switch_code = switch_code
+        self._dp_codes = frozenset({switch_code})
         
-        # Get device name from entry title
-        device_name = entry.title
+        # Station name, the entry title for device entries
+        device_name = coordinator.station_name
         
         self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
+            "identifiers": {(DOMAIN, coordinator.unique_prefix)},
             "name": device_name,
             "manufacturer": "Tuya",
             "model": "Portable Power Station",
@@ -73,17 +87,11 @@ class PowerStationSwitchBase(CoordinatorEntity, SwitchEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the switch on."""
-        await self.hass.async_add_executor_job(
-            self.coordinator.api.send_command, self._switch_code, True
-        )
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_send_command(self._switch_code, True)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the switch off."""
-        await self.hass.async_add_executor_job(
-            self.coordinator.api.send_command, self._switch_code, False
-        )
-        await self.coordinator.async_request_refresh()
+        await self.coordinator.async_send_command(self._switch_code, False)
 
 
 class PowerStationACOutputSwitch(PowerStationSwitchBase):
@@ -98,7 +106,7 @@ class PowerStationACOutputSwitch(PowerStationSwitchBase):
     @property
     def unique_id(self) -> str:
         """Return unique ID."""
-        return f"{self._entry.entry_id}_ac_output"
+        return f"{self.coordinator.unique_prefix}_ac_output"
 
 
 class PowerStationDCOutputSwitch(PowerStationSwitchBase):
@@ -113,7 +121,7 @@ class PowerStationDCOutputSwitch(PowerStationSwitchBase):
     @property
     def unique_id(self) -> str:
         """Return unique ID."""
-        return f"{self._entry.entry_id}_dc_output"
+        return f"{self.coordinator.unique_prefix}_dc_output"
 
 
 class PowerStationUSBOutputSwitch(PowerStationSwitchBase):
@@ -128,7 +136,7 @@ class PowerStationUSBOutputSwitch(PowerStationSwitchBase):
     @property
     def unique_id(self) -> str:
         """Return unique ID."""
-        return f"{self._entry.entry_id}_usb_output"
+        return f"{self.coordinator.unique_prefix}_usb_output"
 
 
 class PowerStationBuzzerSwitch(PowerStationSwitchBase):
@@ -143,4 +151,4 @@ class PowerStationBuzzerSwitch(PowerStationSwitchBase):
     @property
     def unique_id(self) -> str:
         """Return unique ID."""
-        return f"{self._entry.entry_id}_buzzer"
+        return f"{self.coordinator.unique_prefix}_buzzer"
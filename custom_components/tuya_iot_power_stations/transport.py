@@ -0,0 +1,332 @@
+"""Transports for Tuya Cloud requests: live, recording and replay."""
+import gzip
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Protocol
+from urllib.parse import parse_qs, urlsplit
+
+from .decode import CODE_TOKEN_INVALID, TuyaResponse
+
+_LOGGER = logging.getLogger(__name__)
+
+# Endpoint scheme that serves a recording instead of Tuya Cloud,
+# e.g. replay:///config/traffic/station.jsonl.gz?speed=10
+REPLAY_SCHEME = "replay"
+
+
+class Transport(Protocol):
+    """Sends requests to Tuya Cloud, or something that answers like it."""
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+    ) -> TuyaResponse:
+        """Send a request and return the decoded response."""
+
+    def close(self) -> None:
+        """Release resources."""
+
+
+class CloudTransport:
+    """Live Tuya Cloud transport based on the official SDK."""
+
+    def __init__(self, endpoint: str, access_id: str, access_secret: str) -> None:
+        """Initialize transport and request an access token.
+
+        Args:
+            endpoint: Tuya Cloud API endpoint
+            access_id: Tuya Cloud Access ID
+            access_secret: Tuya Cloud Access Secret
+        """
+        # Use official tuya-connector-python SDK. Imported here so the SDK
+        # and requests are only loaded when a live transport is created,
+        # in the executor thread that creates it
+        from tuya_connector import TuyaOpenAPI
+        from tuya_connector.version import VERSION
+
+        self.sdk_version = VERSION
+        self.api = TuyaOpenAPI(endpoint, access_id, access_secret)
+        self.api.connect()
+        # Cleared if the SDK internals used for fast requests changed
+        self._fast = True
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+    ) -> TuyaResponse:
+        """Send a signed request and decode the response in one pass.
+
+        The SDK deep-copies and pretty-prints every response for its debug
+        log, even when debug logging is off. Requests are signed with the SDK
+        and sent on its session, but the body is parsed directly. Token
+        refresh is left to the SDK.
+
+        Signing relies on SDK internals (`_calculate_sign`, `session`,
+        `token_info`), the SDK version is pinned in the manifest. Should
+        they change anyway, requests go through the public SDK methods.
+
+        Args:
+            method: HTTP method
+            path: API path
+            params: Query parameters
+            body: JSON body
+
+        Returns:
+            Decoded response envelope
+        """
+        if self._fast:
+            try:
+                if (response := self._fast_request(method, path, params, body)) is not None:
+                    return response
+            except AttributeError as err:
+                _LOGGER.warning(
+                    "Tuya SDK %s is not supported for fast requests (%s), "
+                    "using its regular requests",
+                    self.sdk_version, err,
+                )
+                self._fast = False
+
+        if method == "GET":
+            return TuyaResponse.from_dict(self.api.get(path, params))
+        return TuyaResponse.from_dict(self.api.post(path, body))
+
+    def _fast_request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None,
+        body: dict[str, Any] | None,
+    ) -> TuyaResponse | None:
+        """Sign and send a request past the SDK's response handling.
+
+        Returns:
+            Decoded response envelope, None if the token must be refreshed
+            by the SDK first
+
+        Raises:
+            AttributeError: If the SDK internals are not what they were
+        """
+        api = self.api
+        token = api.token_info
+        if token is None or not token.access_token or (
+            token.expire_time - 60 * 1000 <= time.time() * 1000
+        ):
+            return None
+
+        sign, t = api._calculate_sign(method, path, params, body)
+        headers = {
+            "client_id": api.access_id,
+            "sign": sign,
+            "sign_method": "HMAC-SHA256",
+            "access_token": token.access_token,
+            "t": str(t),
+            "lang": api.lang,
+            "dev_lang": "python",
+            "dev_version": self.sdk_version,
+            "dev_channel": f"cloud_{api.dev_channel}",
+        }
+        http_response = api.session.request(
+            method, api.endpoint + path, params=params, json=body, headers=headers
+        )
+        if not http_response.ok:
+            return TuyaResponse(
+                False, http_response.status_code, f"HTTP {http_response.status_code}", None
+            )
+
+        response = TuyaResponse.from_json(http_response.content)
+        if response.code == CODE_TOKEN_INVALID:
+            api.token_info = None
+            api.connect()
+        return response
+
+    def close(self) -> None:
+        """Close the HTTP session."""
+        self.api.session.close()
+
+
+class RecordingTransport:
+    """Write every request and response of another transport to a file.
+
+    Each exchange is one JSON line in a gzip file with the request, the
+    decoded response, the time since the recording started and the
+    round-trip time. Credentials and tokens are never part of a line.
+    """
+
+    def __init__(self, inner: Transport, path: Path) -> None:
+        """Initialize recorder.
+
+        Args:
+            inner: Transport that sends the requests
+            path: File to write (.jsonl.gz), created with its directory
+        """
+        self.inner = inner
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = gzip.open(path, "at", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        _LOGGER.info("Recording Tuya traffic to %s", path)
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+    ) -> TuyaResponse:
+        """Send a request through the inner transport and record it."""
+        started = time.monotonic()
+        response = self.inner.request(method, path, params, body)
+        elapsed = time.monotonic() - started
+
+        line = json.dumps({
+            "offset": round(started - self._started, 3),
+            "elapsed": round(elapsed, 3),
+            "time": time.time(),
+            "method": method,
+            "path": path,
+            "params": params,
+            "body": body,
+            "response": response._asdict(),
+        }, separators=(",", ":"))
+
+        # Requests of one station may run in several executor threads
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line + "\n")
+                # Keep the file readable if Home Assistant stops abruptly
+                self._file.flush()
+        return response
+
+    def close(self) -> None:
+        """Finish the recording and close the inner transport."""
+        with self._lock:
+            self._file.close()
+        self.inner.close()
+
+
+class ReplayTransport:
+    """Answer requests from a recording instead of Tuya Cloud.
+
+    Responses are matched by method and path. With a speed above zero the
+    recording plays along a clock running `speed` times faster than real
+    time: a request gets the latest response recorded up to that point of
+    the recording and waits for the recorded round-trip time. With speed 0
+    responses are served one after another without waiting, which makes
+    runs deterministic. When a recording runs out it starts over.
+    """
+
+    def __init__(self, path: Path, speed: float = 1.0) -> None:
+        """Load a recording.
+
+        Args:
+            path: Recording written by RecordingTransport
+            speed: Playback speed, 0 serves responses as fast as possible
+        """
+        self.path = path
+        self.speed = speed
+        self._records: dict[tuple[str, str], list[dict[str, Any]]] = defaultdict(list)
+        self._cursors: dict[tuple[str, str], int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._duration = 0.0
+
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                self._records[(record["method"], record["path"])].append(record)
+                self._duration = max(self._duration, record["offset"])
+
+        self._started = time.monotonic()
+        _LOGGER.info(
+            "Replaying %d Tuya requests from %s at speed %s",
+            sum(map(len, self._records.values())), path, speed,
+        )
+
+    @classmethod
+    def from_url(cls, url: str) -> "ReplayTransport":
+        """Create a transport from a replay:// endpoint URL."""
+        parts = urlsplit(url)
+        query = parse_qs(parts.query)
+        speed = float(query.get("speed", ["1"])[0])
+        return cls(Path(parts.netloc + parts.path), speed)
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+    ) -> TuyaResponse:
+        """Serve the recorded response for a request."""
+        key = (method, path)
+        with self._lock:
+            records = self._records.get(key)
+            if not records:
+                return TuyaResponse(False, None, f"No recorded response for {method} {path}", None)
+            record = records[self._next_index(key, records)]
+
+        if self.speed > 0:
+            time.sleep(record["elapsed"] / self.speed)
+        return TuyaResponse(**record["response"])
+
+    def _next_index(self, key: tuple[str, str], records: list[dict[str, Any]]) -> int:
+        """Pick the record to serve and advance the cursor."""
+        cursor = self._cursors[key]
+        if cursor >= len(records):
+            # Recording ran out, start over
+            cursor = 0
+            if self.speed > 0:
+                self._started = time.monotonic()
+                self._cursors.clear()
+
+        if self.speed > 0:
+            # Skip responses whose time has passed in the recording
+            position = (time.monotonic() - self._started) * self.speed
+            while cursor + 1 < len(records) and records[cursor + 1]["offset"] <= position:
+                cursor += 1
+
+        self._cursors[key] = cursor + 1
+        return cursor
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+def open_transport(
+    endpoint: str,
+    access_id: str,
+    access_secret: str,
+    record_path: Path | None = None,
+) -> Transport:
+    """Create the transport for an endpoint.
+
+    Args:
+        endpoint: Tuya Cloud API endpoint, or a replay:// URL of a recording
+        access_id: Tuya Cloud Access ID
+        access_secret: Tuya Cloud Access Secret
+        record_path: Record all traffic to this file if set
+
+    Returns:
+        Transport to send requests with
+    """
+    transport: Transport
+    if urlsplit(endpoint).scheme == REPLAY_SCHEME:
+        transport = ReplayTransport.from_url(endpoint)
+    else:
+        transport = CloudTransport(endpoint, access_id, access_secret)
+
+    if record_path is not None:
+        transport = RecordingTransport(transport, record_path)
+    return transport
@@ -0,0 +1,204 @@
+"""Event loop and executor watchdog for Tuya IoT Power Stations."""
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from types import FrameType
+from typing import Any, TypeVar
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .const import (
+    DATA_WATCHDOG,
+    DOMAIN,
+    LATENCY_SMOOTHING,
+    SIGNAL_WATCHDOG_UPDATED,
+    WATCHDOG_HEARTBEAT,
+    WATCHDOG_STACK_DEPTH,
+    WATCHDOG_THRESHOLD,
+)
+from .profiler import PACKAGE_DIR
+from .scheduler import async_get_scheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+def _runs_our_code(frame: FrameType | None) -> bool:
+    """Return whether a stack contains a frame of this integration."""
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(PACKAGE_DIR):
+            return True
+        frame = frame.f_back
+    return False
+
+
+class LoopWatchdog:
+    """Detect event loop blocking and executor queueing caused by this integration.
+
+    The event loop stamps a heartbeat every WATCHDOG_HEARTBEAT seconds. A
+    monitor thread notices when the heartbeat is overdue and captures the
+    stack of the event loop thread while it is still blocked; when the loop
+    runs again the heartbeat measures how long it was held. Blocks whose
+    stack runs integration code are counted and logged with a stack snippet.
+    Listener callbacks of the coordinators are timed directly, and the
+    request scheduler reports how long jobs wait for an executor thread.
+    Nothing runs while no config entry enables the watchdog.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize watchdog."""
+        self.hass = hass
+        self.threshold = WATCHDOG_THRESHOLD
+        self.users: set[str] = set()
+
+        # Counters for the diagnostic sensors
+        self.blocks = 0
+        self.block_max_ms = 0.0
+        self.slow_callbacks = 0
+        self.executor_wait_ms: float | None = None
+        self.executor_wait_max_ms = 0.0
+
+        self._loop_thread_id: int | None = None
+        self._beat = 0.0
+        self._captured: tuple[float, list[str]] | None = None
+        self._heartbeat: Any = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the watchdog is active."""
+        return self._thread is not None
+
+    @callback
+    def async_acquire(self, entry_id: str) -> None:
+        """Start watching on behalf of a config entry."""
+        self.users.add(entry_id)
+        if self.running:
+            return
+
+        self._loop_thread_id = threading.get_ident()
+        # A fresh event, a monitor stopped earlier may still be waking up
+        self._stop = threading.Event()
+        self._beat = time.monotonic()
+        self._schedule_heartbeat()
+        self._thread = threading.Thread(
+            target=self._monitor,
+            args=(self._stop,),
+            name="tuya_iot_power_stations_watchdog",
+            daemon=True,
+        )
+        self._thread.start()
+        async_get_scheduler(self.hass).watchdog = self
+        _LOGGER.info("Event loop watchdog started (threshold %s ms)", self.threshold * 1000)
+
+    @callback
+    def async_release(self, entry_id: str) -> None:
+        """Stop watching once no config entry needs the watchdog."""
+        self.users.discard(entry_id)
+        if self.users or not self.running:
+            return
+
+        async_get_scheduler(self.hass).watchdog = None
+        self._stop.set()
+        if self._heartbeat:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        self._thread = None
+        _LOGGER.info("Event loop watchdog stopped")
+
+    def _schedule_heartbeat(self) -> None:
+        """Schedule the next heartbeat."""
+        self._heartbeat = self.hass.loop.call_later(WATCHDOG_HEARTBEAT, self._on_heartbeat)
+
+    @callback
+    def _on_heartbeat(self) -> None:
+        """Measure how late the loop ran the heartbeat."""
+        now = time.monotonic()
+        held = now - self._beat - WATCHDOG_HEARTBEAT
+        captured, self._captured = self._captured, None
+        self._beat = now
+        self._schedule_heartbeat()
+
+        if held < self.threshold or captured is None:
+            # Not blocked, or blocked by code outside this integration
+            return
+
+        held_ms = held * 1000
+        self.blocks += 1
+        self.block_max_ms = max(self.block_max_ms, held_ms)
+        _LOGGER.warning(
+            "Event loop was blocked for %.0f ms by %s code:\n%s",
+            held_ms, DOMAIN, "".join(captured[1]),
+        )
+        async_dispatcher_send(self.hass, SIGNAL_WATCHDOG_UPDATED)
+
+    def _monitor(self, stop: threading.Event) -> None:
+        """Capture the event loop stack while the heartbeat is overdue."""
+        while not stop.wait(self.threshold / 2):
+            beat = self._beat
+            if time.monotonic() - beat < WATCHDOG_HEARTBEAT + self.threshold:
+                continue
+            if self._captured is not None and self._captured[0] == beat:
+                # Already captured this block
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None or not _runs_our_code(frame):
+                continue
+            snippet = traceback.format_stack(frame)[-WATCHDOG_STACK_DEPTH:]
+            self._captured = (beat, snippet)
+
+    @callback
+    def async_record_callback(self, name: str, duration: float) -> None:
+        """Record how long a callback of this integration held the loop.
+
+        Args:
+            name: Description of the callback
+            duration: Seconds the callback ran
+        """
+        if duration < self.threshold:
+            return
+
+        self.slow_callbacks += 1
+        _LOGGER.warning(
+            "Slow callback: %s held the event loop for %.0f ms", name, duration * 1000
+        )
+        async_dispatcher_send(self.hass, SIGNAL_WATCHDOG_UPDATED)
+
+    def wrap_job(self, func: Callable[..., _T]) -> Callable[..., _T]:
+        """Wrap an executor job to measure how long it waits for a thread."""
+        submitted = time.monotonic()
+
+        def timed_job(*args: Any) -> _T:
+            # Runs in an executor thread, the measurement is folded on the loop
+            self.hass.loop.call_soon_threadsafe(
+                self._record_executor_wait, (time.monotonic() - submitted) * 1000
+            )
+            return func(*args)
+
+        return timed_job
+
+    @callback
+    def _record_executor_wait(self, wait_ms: float) -> None:
+        """Fold an executor wait into the smoothed and maximum wait."""
+        self.executor_wait_max_ms = max(self.executor_wait_max_ms, wait_ms)
+        if self.executor_wait_ms is None:
+            self.executor_wait_ms = wait_ms
+        else:
+            self.executor_wait_ms += LATENCY_SMOOTHING * (wait_ms - self.executor_wait_ms)
+        if wait_ms >= self.threshold * 1000:
+            _LOGGER.debug("Tuya request waited %.0f ms for an executor thread", wait_ms)
+
+
+@callback
+def async_get_watchdog(hass: HomeAssistant) -> LoopWatchdog:
+    """Return the watchdog, creating it on first use."""
+    if DATA_WATCHDOG not in hass.data:
+        hass.data[DATA_WATCHDOG] = LoopWatchdog(hass)
+    return hass.data[DATA_WATCHDOG]
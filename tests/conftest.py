@@ -0,0 +1,58 @@
+"""Load modules of the integration without setting up Home Assistant.
+
+The modules under test only import the package's own modules and, for a
+few of them, callback and timer helpers of Home Assistant. They are loaded
+as a bare package, with minimal stand-ins for those helpers when Home
+Assistant is not installed.
+"""
+import importlib.util
+import sys
+import types
+from collections.abc import Callable
+from pathlib import Path
+
+PACKAGE = "tuya_iot_power_stations_under_test"
+PACKAGE_DIR = (
+    Path(__file__).resolve().parent.parent / "custom_components" / "tuya_iot_power_stations"
+)
+
+
+def _stub_homeassistant() -> None:
+    """Register the Home Assistant names the loaded modules import."""
+    try:
+        import homeassistant.core  # noqa: F401
+        import homeassistant.helpers.event  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        return
+
+    core = types.ModuleType("homeassistant.core")
+    core.callback = lambda func: func
+    core.HomeAssistant = object
+    core.CALLBACK_TYPE = Callable[[], None]
+    event = types.ModuleType("homeassistant.helpers.event")
+    event.async_call_later = lambda hass, delay, action: lambda: None
+    helpers = types.ModuleType("homeassistant.helpers")
+    helpers.event = event
+    root = types.ModuleType("homeassistant")
+    root.core = core
+    root.helpers = helpers
+    sys.modules.update({
+        "homeassistant": root,
+        "homeassistant.core": core,
+        "homeassistant.helpers": helpers,
+        "homeassistant.helpers.event": event,
+    })
+
+
+def load_module(name: str) -> types.ModuleType:
+    """Load a module of the integration, once, as part of a bare package."""
+    if PACKAGE not in sys.modules:
+        _stub_homeassistant()
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [str(PACKAGE_DIR)]
+        sys.modules[PACKAGE] = package
+    if (module := sys.modules.get(f"{PACKAGE}.{name}")) is not None:
+        return module
+    return importlib.import_module(f"{PACKAGE}.{name}")
@@ -0,0 +1,83 @@
+"""Tests for decoding Tuya Cloud responses."""
+import pytest
+
+from conftest import load_module
+
+decode = load_module("decode")
+
+
+def test_decode_status_types_known_codes() -> None:
+    """Known data points are typed, everything else is kept as reported."""
+    status = decode.decode_status([
+        {"code": "battery_percentage", "value": "55.0"},
+        {"code": "total_output_power", "value": "123.5"},
+        {"code": "temp_current", "value": 25},
+        {"code": "switch_ac", "value": 1},
+        {"code": "usb_status", "value": False},
+        {"code": "led_mode", "value": "lamp_off"},
+        {"code": "mystery", "value": {"a": 1}},
+    ])
+    assert status == {
+        "battery_percentage": 55,
+        "total_output_power": 123.5,
+        "temp_current": 25.0,
+        "switch_ac": True,
+        "usb_status": False,
+        "led_mode": "lamp_off",
+        "mystery": {"a": 1},
+    }
+    assert type(status["battery_percentage"]) is int
+    assert type(status["temp_current"]) is float
+
+
+@pytest.mark.parametrize(
+    ("code", "raw", "expected"),
+    [
+        ("battery_percentage", "55.0", 55),
+        ("battery_percentage", 55.9, 55),
+        ("battery_percentage", "55", 55),
+        ("battery_percentage", "n/a", "n/a"),  # Undecodable values are kept
+        ("total_input_power", None, None),
+        ("switch_dc", 0, False),
+        ("unknown_code", "7", "7"),
+    ],
+)
+def test_decode_value(code: str, raw, expected) -> None:
+    """Single values decode like status items."""
+    assert decode.decode_value(code, raw) == expected
+    assert decode.decode_status([{"code": code, "value": raw}]) == {code: expected}
+
+
+def test_decode_status_empty() -> None:
+    """A missing result gives an empty status."""
+    assert decode.decode_status(None) == {}
+    assert decode.decode_status([]) == {}
+
+
+def test_response_from_json() -> None:
+    """The envelope is read straight from the body."""
+    response = decode.TuyaResponse.from_json(
+        b'{"success": true, "t": 1, "result": [{"code": "switch_ac", "value": true}]}'
+    )
+    assert response.success
+    assert response.code is None
+    assert response.result == [{"code": "switch_ac", "value": True}]
+    assert not response.offline
+
+
+def test_response_errors() -> None:
+    """Failures carry code and message, offline devices are recognised."""
+    response = decode.TuyaResponse.from_json(
+        b'{"success": false, "code": 2001, "msg": "device is offline"}'
+    )
+    assert not response.success
+    assert response.code == 2001
+    assert response.offline
+
+    assert decode.TuyaResponse.from_json(
+        b'{"success": false, "code": 1234, "msg": "The Device Is Offline"}'
+    ).offline
+    assert decode.TuyaResponse.from_json(b'{"success": false}').msg == "Unknown error"
+    assert decode.TuyaResponse.from_dict(None) == decode.TuyaResponse(
+        False, None, "Empty response", None
+    )
@@ -0,0 +1,113 @@
+"""Tests for the runtime estimator."""
+import pytest
+
+from conftest import load_module
+
+estimator = load_module("estimator")
+
+
+def _discharge(
+    model, capacity: float, power: float, start: float = 0, seconds: int = 3600, soc: float = 100
+) -> tuple[float, float]:
+    """Feed a constant discharge (negative power charges) with whole-percent SOC.
+
+    Returns:
+        Time and exact SOC after the last sample
+    """
+    now = start
+    for _ in range(seconds // 30):
+        model.add_sample(now, round(soc), max(power, 0), max(-power, 0))
+        now += 30
+        soc -= power * 30 / 3600 / capacity * 100
+    return now, soc
+
+
+def test_learns_capacity_from_whole_percent_soc() -> None:
+    """The regression recovers the capacity despite the 1% SOC steps."""
+    model = estimator.RuntimeEstimator()
+    _discharge(model, capacity=1000, power=500)
+    assert model.capacity == pytest.approx(1000, rel=0.05)
+
+
+def test_learns_across_charge_and_discharge() -> None:
+    """Switching direction keeps one consistent energy axis."""
+    model = estimator.RuntimeEstimator()
+    now, soc = _discharge(model, capacity=2000, power=800, seconds=5400)
+    _discharge(model, capacity=2000, power=-600, start=now, seconds=3600, soc=soc)
+    assert model.capacity == pytest.approx(2000, rel=0.05)
+
+
+def test_no_capacity_without_energy_span() -> None:
+    """An idle battery gives no capacity, and so no runtimes."""
+    model = estimator.RuntimeEstimator()
+    for second in range(0, 3600, 30):
+        model.add_sample(second, 80, 2, 0)
+    assert model.capacity is None
+    assert model.time_to_empty is None
+    assert model.time_to_full is None
+
+
+def test_fixed_capacity_and_resume_learning() -> None:
+    """A configured capacity wins, clearing it resumes from the kept sums."""
+    model = estimator.RuntimeEstimator(capacity=500)
+    _discharge(model, capacity=1000, power=500)
+    assert model.capacity == 500
+
+    model.set_capacity(None)
+    assert model.capacity == pytest.approx(1000, rel=0.05)
+
+
+@pytest.mark.parametrize(
+    ("output_power", "input_power", "empty", "full"),
+    [
+        (600, 0, 50 * 10 / 600 * 60, None),  # Discharging
+        (0, 400, None, 50 * 10 / 400 * 60),  # Charging
+        (300, 297, None, None),  # Idle, net power below the threshold
+    ],
+)
+def test_time_to_empty_and_full(
+    output_power: float, input_power: float, empty: float | None, full: float | None
+) -> None:
+    """Only the direction the battery moves in has a runtime."""
+    model = estimator.RuntimeEstimator(capacity=1000)
+    model.add_sample(0, 50, output_power, input_power)
+    assert model.time_to_empty == (pytest.approx(empty) if empty is not None else None)
+    assert model.time_to_full == (pytest.approx(full) if full is not None else None)
+
+
+def test_runtime_at_the_ends() -> None:
+    """An empty battery has no time left, a full one no time to full."""
+    model = estimator.RuntimeEstimator(capacity=1000)
+    model.add_sample(0, 0, 500, 0)
+    assert model.time_to_empty == 0
+
+    model = estimator.RuntimeEstimator(capacity=1000)
+    model.add_sample(0, 100, 0, 500)
+    assert model.time_to_full == 0
+
+
+def test_power_average_resets_on_direction_change() -> None:
+    """Plugging in a charger switches to time to full with the next sample."""
+    model = estimator.RuntimeEstimator(capacity=1000)
+    for second in range(0, 600, 30):
+        model.add_sample(second, 60, 500, 0)
+    assert model.power == pytest.approx(500)
+
+    model.add_sample(600, 60, 0, 300)
+    assert model.power == -300
+    assert model.time_to_empty is None
+    assert model.time_to_full == pytest.approx(40 * 10 / 300 * 60)
+
+    # Same direction again: smoothed, not reset
+    model.add_sample(630, 60, 0, 100)
+    assert -300 < model.power < -100
+
+
+def test_ignores_samples_out_of_order() -> None:
+    """A sample not newer than the last one changes nothing."""
+    model = estimator.RuntimeEstimator(capacity=1000)
+    model.add_sample(100, 50, 500, 0)
+    model.add_sample(100, 10, 0, 900)
+    model.add_sample(90, 10, 0, 900)
+    assert model.soc == 50
+    assert model.power == 500
@@ -0,0 +1,102 @@
+"""Tests for the incremental rolling statistics."""
+import random
+import statistics
+
+import pytest
+
+from conftest import load_module
+
+rolling = load_module("rolling")
+
+
+def _reference(samples: list[tuple[float, float]], now: float, window: float) -> list[float]:
+    """Values of the samples inside the window, computed from scratch."""
+    return [value for timestamp, value in samples if timestamp > now - window]
+
+
+@pytest.mark.parametrize(
+    ("low", "high"),
+    [
+        (0, 2000),  # Output power
+        (24.9, 25.1),  # Temperature: large mean, small spread
+    ],
+)
+def test_window_matches_brute_force(low: float, high: float) -> None:
+    """Every statistic matches a recomputation after every sample."""
+    rng = random.Random(1)
+    window = rolling.RollingWindow(60)
+    samples: list[tuple[float, float]] = []
+    now = 0.0
+
+    for _ in range(5000):
+        now += rng.uniform(0.5, 10)
+        value = rng.uniform(low, high)
+        window.add(now, value)
+        samples.append((now, value))
+
+        values = _reference(samples, now, 60)
+        assert window.count == len(values)
+        assert window.minimum == min(values)
+        assert window.maximum == max(values)
+        assert window.mean == pytest.approx(statistics.fmean(values), rel=1e-9)
+        if len(values) > 1:
+            assert window.std == pytest.approx(
+                statistics.stdev(values), rel=1e-6, abs=1e-9
+            )
+        else:
+            assert window.std is None
+
+
+def test_spike_leaves_window() -> None:
+    """Max and std drop back once a spike is older than the window."""
+    window = rolling.RollingWindow(10)
+    for second in range(5):
+        window.add(second, 100.0)
+    window.add(5, 3000.0)
+    assert window.maximum == 3000.0
+    assert window.std > 0
+
+    for second in range(6, 20):
+        window.add(second, 100.0)
+    assert window.maximum == 100.0
+    assert window.std == pytest.approx(0.0, abs=1e-9)
+
+
+def test_expire_empties_window() -> None:
+    """Samples expire without new ones, e.g. after failed polls."""
+    window = rolling.RollingWindow(10)
+    window.add(0, 5.0)
+    window.add(1, 7.0)
+    window.expire(20)
+    assert window.count == 0
+    assert window.mean is None
+    assert window.minimum is None
+    assert window.maximum is None
+
+    window.add(21, 3.0)
+    assert window.mean == 3.0
+
+
+def test_stats_skip_non_numeric_values() -> None:
+    """Missing, boolean and text values are not samples."""
+    stats = rolling.RollingStats(("total_output_power", "temp_current"), 60)
+    stats.add_sample(0, {"total_output_power": 100.0, "temp_current": "n/a"})
+    stats.add_sample(1, {"total_output_power": True})
+    stats.add_sample(2, {"total_output_power": 300})
+
+    assert stats.windows["total_output_power"].count == 2
+    assert stats.windows["total_output_power"].mean == 200.0
+    assert stats.windows["temp_current"].count == 0
+
+
+def test_set_window_shrinks_on_next_sample() -> None:
+    """A shorter window drops older samples with the next update."""
+    stats = rolling.RollingStats(("total_output_power",), 60)
+    for second in range(30):
+        stats.add_sample(second, {"total_output_power": float(second)})
+
+    stats.set_window(5)
+    stats.add_sample(30, {"total_output_power": 30.0})
+    window = stats.windows["total_output_power"]
+    assert window.count == 5
+    assert window.minimum == 26.0
@@ -0,0 +1,95 @@
+"""Tests for the threshold rules."""
+from conftest import load_module
+
+const = load_module("const")
+rules = load_module("rules")
+
+OUTPUTS_ON = {"switch_ac": True, "switch_dc": True, "switch_usb": True}
+
+
+def _engine(**options) -> "rules.RuleEngine":
+    """Build an engine with a hysteresis of 5."""
+    return rules.RuleEngine.from_options({const.CONF_RULE_HYSTERESIS: 5, **options})
+
+
+def test_low_battery_does_not_flap_around_threshold() -> None:
+    """The rule fires once and re-arms only past threshold + hysteresis."""
+    engine = _engine(**{const.CONF_RULE_SOC_LOW: 20})
+    fired = [
+        bool(engine.evaluate({"battery_percentage": soc, **OUTPUTS_ON}))
+        for soc in (25, 21, 19, 21, 19, 20, 24, 25, 19)
+    ]
+    assert fired == [False, False, True, False, False, False, False, False, True]
+
+
+def test_high_temperature_fires_above_threshold() -> None:
+    """Rules watching for high values mirror the hysteresis."""
+    engine = _engine(**{const.CONF_RULE_TEMP_HIGH: 50})
+    fired = [
+        bool(engine.evaluate({"temp_current": temp, "switch_ac": True}))
+        for temp in (50, 51, 49, 46, 45, 51)
+    ]
+    assert fired == [False, True, False, False, False, True]
+
+
+def test_actions_are_one_batch() -> None:
+    """All outputs a rule switches go out as one set of commands."""
+    engine = _engine(**{const.CONF_RULE_SOC_LOW: 20})
+    actions = engine.evaluate(
+        {"battery_percentage": 10, "switch_ac": True, "switch_dc": False, "switch_usb": True}
+    )
+    assert actions == [("low_battery", {"switch_ac": False, "switch_usb": False})]
+
+
+def test_rule_without_work_fires_silently() -> None:
+    """Outputs already off need no commands, and the rule stays disarmed."""
+    engine = _engine(**{const.CONF_RULE_SOC_LOW: 20})
+    off = {code: False for code in OUTPUTS_ON}
+    assert engine.evaluate({"battery_percentage": 10, **off}) == []
+    assert engine.evaluate({"battery_percentage": 10, **OUTPUTS_ON}) == []
+    assert engine.rules[0].triggered
+
+
+def test_usb_on_input_only_switches_present_outputs() -> None:
+    """Turning on skips outputs the station does not report."""
+    engine = _engine(**{const.CONF_RULE_USB_ON_INPUT: True})
+    assert engine.evaluate({"total_input_power": 100}) == []
+    engine = _engine(**{const.CONF_RULE_USB_ON_INPUT: True})
+    assert engine.evaluate({"total_input_power": 100, "switch_usb": False}) == [
+        ("input_present", {"switch_usb": True})
+    ]
+
+
+def test_missing_and_invalid_values_are_ignored() -> None:
+    """A sample without a usable value neither fires nor re-arms."""
+    engine = _engine(**{const.CONF_RULE_SOC_LOW: 20})
+    assert engine.evaluate(OUTPUTS_ON) == []
+    assert engine.evaluate({"battery_percentage": "n/a", **OUTPUTS_ON}) == []
+    assert not engine.rules[0].triggered
+
+
+def test_disabled_rules_are_not_built() -> None:
+    """Zero thresholds and unset options add no rules."""
+    engine = _engine(**{
+        const.CONF_RULE_SOC_LOW: 0,
+        const.CONF_RULE_TEMP_HIGH: 0,
+        const.CONF_RULE_USB_ON_INPUT: False,
+    })
+    assert engine.rules == []
+
+
+def test_restore_state_keeps_fired_rules_disarmed() -> None:
+    """Tuning a fired rule does not send its commands again."""
+    previous = _engine(**{const.CONF_RULE_SOC_LOW: 20})
+    previous.evaluate({"battery_percentage": 10, **OUTPUTS_ON})
+
+    engine = _engine(**{const.CONF_RULE_SOC_LOW: 15, const.CONF_RULE_TEMP_HIGH: 50})
+    engine.restore_state(previous)
+    assert [rule.triggered for rule in engine.rules] == [True, False]
+    assert engine.evaluate({"battery_percentage": 10, "temp_current": 30, **OUTPUTS_ON}) == []
+
+    # Re-arms at the new threshold plus the hysteresis
+    engine.evaluate({"battery_percentage": 20, **OUTPUTS_ON})
+    assert engine.evaluate({"battery_percentage": 10, **OUTPUTS_ON}) == [
+        ("low_battery", {"switch_ac": False, "switch_dc": False, "switch_usb": False})
+    ]
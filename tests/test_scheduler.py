@@ -0,0 +1,188 @@
+"""Tests for the request scheduler and the poll phase planner."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from conftest import load_module
+
+const = load_module("const")
+scheduler = load_module("scheduler")
+Priority = scheduler.Priority
+
+
+class FakeHass:
+    """Event loop and executor of Home Assistant."""
+
+    def __init__(self) -> None:
+        """Use the running loop."""
+        self.loop = asyncio.get_running_loop()
+
+    def async_add_executor_job(self, func, *args) -> asyncio.Future:
+        """Run a blocking call in the default executor."""
+        return self.loop.run_in_executor(None, func, *args)
+
+
+def _recorder(order: list[str], release: threading.Event | None = None):
+    """Return a blocking call that records its name when it starts."""
+    def call(name: str) -> str:
+        order.append(name)
+        if release is not None:
+            release.wait(5)
+        return name
+    return call
+
+
+async def _wait_for(condition, timeout: float = 2) -> None:
+    """Let the loop run until the condition holds."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_command_runs_ahead_of_queued_work() -> None:
+    """Queued requests start by priority, not by arrival."""
+    async def run() -> list[str]:
+        order: list[str] = []
+        release = threading.Event()
+        sched = scheduler.RequestScheduler(FakeHass(), rate=100, burst=10, concurrency=2)
+        blocking = _recorder(order, release)
+        call = _recorder(order)
+
+        blockers = [
+            asyncio.ensure_future(sched.async_run(Priority.COMMAND, blocking, "blocker"))
+            for _ in range(2)
+        ]
+        await _wait_for(lambda: len(order) == 2)
+
+        queued = [
+            asyncio.ensure_future(sched.async_run(priority, call, priority.name))
+            for priority in (Priority.BACKGROUND, Priority.POLL, Priority.COMMAND)
+        ]
+        await asyncio.sleep(0.05)
+        assert sched.pending == 3
+
+        release.set()
+        results = await asyncio.gather(*blockers, *queued)
+        assert results[2:] == ["BACKGROUND", "POLL", "COMMAND"]
+        return order[2:]
+
+    assert asyncio.run(run()) == ["COMMAND", "POLL", "BACKGROUND"]
+
+
+def test_slot_reserve_holds_back_polls() -> None:
+    """A poll leaves the last slot to commands and runs once one is free."""
+    async def run() -> None:
+        order: list[str] = []
+        release = threading.Event()
+        sched = scheduler.RequestScheduler(FakeHass(), rate=100, burst=10, concurrency=2)
+
+        first = asyncio.ensure_future(
+            sched.async_run(Priority.POLL, _recorder(order, release), "poll 1")
+        )
+        await _wait_for(lambda: order == ["poll 1"])
+        second = asyncio.ensure_future(
+            sched.async_run(Priority.POLL, _recorder(order), "poll 2")
+        )
+        await asyncio.sleep(0.05)
+        assert order == ["poll 1"]
+
+        assert await sched.async_run(Priority.COMMAND, _recorder(order), "command") == "command"
+        assert order == ["poll 1", "command"]
+
+        release.set()
+        assert await asyncio.gather(first, second) == ["poll 1", "poll 2"]
+
+    asyncio.run(run())
+
+
+def test_token_reserve_defers_background_work() -> None:
+    """Background requests wait for tokens a command may take right away."""
+    async def run() -> None:
+        order: list[str] = []
+        call = _recorder(order)
+        # Background work has to leave burst / 2 = 1 token
+        sched = scheduler.RequestScheduler(FakeHass(), rate=10, burst=2, concurrency=4)
+
+        assert await sched.async_run(Priority.BACKGROUND, call, "background 1") == "background 1"
+
+        started = time.monotonic()
+        background = asyncio.ensure_future(
+            sched.async_run(Priority.BACKGROUND, call, "background 2")
+        )
+        await asyncio.sleep(0)
+        assert await sched.async_run(Priority.COMMAND, call, "command") == "command"
+        assert await background == "background 2"
+
+        assert order == ["background 1", "command", "background 2"]
+        # Two tokens had to be earned back at 10 per second
+        assert time.monotonic() - started >= 0.15
+
+    asyncio.run(run())
+
+
+def test_cancelled_request_is_skipped() -> None:
+    """A caller that gave up does not hold up the queue."""
+    async def run() -> None:
+        order: list[str] = []
+        release = threading.Event()
+        sched = scheduler.RequestScheduler(FakeHass(), rate=100, burst=10, concurrency=1)
+
+        blocker = asyncio.ensure_future(
+            sched.async_run(Priority.COMMAND, _recorder(order, release), "blocker")
+        )
+        await _wait_for(lambda: order == ["blocker"])
+        gave_up = asyncio.ensure_future(sched.async_run(Priority.COMMAND, _recorder(order), "x"))
+        waiting = asyncio.ensure_future(sched.async_run(Priority.COMMAND, _recorder(order), "y"))
+        await asyncio.sleep(0)
+        gave_up.cancel()
+
+        release.set()
+        assert await blocker == "blocker"
+        assert await waiting == "y"
+        assert order == ["blocker", "y"]
+
+    asyncio.run(run())
+
+
+def test_phases_are_evenly_spaced_and_deterministic() -> None:
+    """Phases follow the key order, whatever order stations register in."""
+    planner = scheduler.PollPhasePlanner()
+    for key in ("c", "a", "b"):
+        planner.async_register(key)
+
+    assert [planner.phase(key) for key in ("a", "b", "c")] == pytest.approx([0, 1 / 3, 2 / 3])
+    # Slots at 0 s, 20 s and 40 s of every minute
+    assert planner.delay("a", 60, now=6000 + 5) == pytest.approx(55)
+    assert planner.delay("b", 60, now=6000 + 5) == pytest.approx(15)
+    assert planner.delay("c", 60, now=6000 + 5) == pytest.approx(35)
+
+    other = scheduler.PollPhasePlanner()
+    for key in ("b", "c", "a"):
+        other.async_register(key)
+    assert [other.phase(key) for key in "abc"] == [planner.phase(key) for key in "abc"]
+
+
+def test_unregister_respaces_phases() -> None:
+    """Removing a station spreads the others over the interval again."""
+    planner = scheduler.PollPhasePlanner()
+    unregister = planner.async_register("a")
+    planner.async_register("b")
+    assert planner.phase("b") == 0.5
+
+    unregister()
+    assert planner.phase("b") == 0
+    assert planner.phase("a") == 0
+
+
+def test_delay_skips_slots_closer_than_min_delay() -> None:
+    """A slot that is about to pass moves to the next interval."""
+    planner = scheduler.PollPhasePlanner()
+    planner.async_register("a")
+    now = 6000 - const.PHASE_MIN_DELAY / 2
+    assert planner.delay("a", 60, now=now) == pytest.approx(60 + const.PHASE_MIN_DELAY / 2)
+    assert planner.delay("a", 60, now=6000 - const.PHASE_MIN_DELAY * 2) == pytest.approx(
+        const.PHASE_MIN_DELAY * 2
+    )
@@ -0,0 +1,97 @@
+"""Tests for recording and replaying Tuya traffic."""
+import gzip
+import json
+from pathlib import Path
+
+from conftest import load_module
+
+decode = load_module("decode")
+transport = load_module("transport")
+
+STATUS_PATH = "/v1.0/devices/abc/status"
+
+
+class FakeTransport:
+    """Answers every request with a counter, like a changing device."""
+
+    def __init__(self) -> None:
+        """Start counting."""
+        self.calls = 0
+        self.closed = False
+
+    def request(self, method, path, params=None, body=None) -> "decode.TuyaResponse":
+        """Return the number of the call as the result."""
+        self.calls += 1
+        return decode.TuyaResponse(True, None, "", {"path": path, "call": self.calls})
+
+    def close(self) -> None:
+        """Remember being closed."""
+        self.closed = True
+
+
+def _record(path: Path) -> FakeTransport:
+    """Record two status polls and a command."""
+    inner = FakeTransport()
+    recorder = transport.RecordingTransport(inner, path)
+    recorder.request("GET", STATUS_PATH)
+    recorder.request("POST", "/v1.0/devices/abc/commands", body={"commands": []})
+    recorder.request("GET", STATUS_PATH, params={"codes": "switch_ac"})
+    recorder.close()
+    assert inner.closed
+    return inner
+
+
+def test_recording_lines(tmp_path: Path) -> None:
+    """Each exchange is one JSON line with request and response."""
+    path = tmp_path / "traffic" / "station.jsonl.gz"
+    _record(path)
+
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        lines = [json.loads(line) for line in file]
+    assert [(line["method"], line["path"]) for line in lines] == [
+        ("GET", STATUS_PATH),
+        ("POST", "/v1.0/devices/abc/commands"),
+        ("GET", STATUS_PATH),
+    ]
+    assert lines[2]["params"] == {"codes": "switch_ac"}
+    assert lines[1]["response"]["result"]["call"] == 2
+    assert all(line["elapsed"] >= 0 for line in lines)
+
+
+def test_replay_round_trip_wraps_around(tmp_path: Path) -> None:
+    """At speed 0 responses come back in recorded order, then start over."""
+    path = tmp_path / "station.jsonl.gz"
+    _record(path)
+    replay = transport.ReplayTransport(path, speed=0)
+
+    results = [replay.request("GET", STATUS_PATH).result["call"] for _ in range(5)]
+    assert results == [1, 3, 1, 3, 1]
+
+    command = replay.request("POST", "/v1.0/devices/abc/commands", body={"commands": []})
+    assert command == decode.TuyaResponse(
+        True, None, "", {"path": "/v1.0/devices/abc/commands", "call": 2}
+    )
+
+
+def test_replay_unknown_request(tmp_path: Path) -> None:
+    """Requests that were never recorded fail like a Tuya error."""
+    path = tmp_path / "station.jsonl.gz"
+    _record(path)
+    replay = transport.ReplayTransport(path, speed=0)
+
+    response = replay.request("GET", "/v1.0/devices/other/status")
+    assert not response.success
+    assert response.msg == "No recorded response for GET /v1.0/devices/other/status"
+    assert replay.request("DELETE", STATUS_PATH).msg.startswith("No recorded response")
+
+
+def test_open_transport_replay_url(tmp_path: Path) -> None:
+    """A replay:// endpoint opens the recording with its speed."""
+    path = tmp_path / "station.jsonl.gz"
+    _record(path)
+
+    replay = transport.open_transport(f"replay://{path}?speed=0", "id", "secret")
+    assert isinstance(replay, transport.ReplayTransport)
+    assert replay.path == path
+    assert replay.speed == 0
+    assert replay.request("GET", STATUS_PATH).result["call"] == 1